@@ -3,22 +3,27 @@ Article implementation
 """
 import json
 import os
-import datetime
 
 from constants import ASSETS_PATH
+from dates import format_meta_date, parse_meta_date
+from metadata_index import open_metadata_index
+from metrics import METRICS
+from storage import open_storage
 
 
-def date_from_meta(date_txt):
+def date_from_meta(date_txt, strict=False):
     """
     Converts text date to datetime object
     """
-    return datetime.datetime.strptime(date_txt, "%Y-%m-%d %H:%M:%S")
+    return parse_meta_date(date_txt, strict)
 
 
 class Article:
     """
     Article class implementation.
-    Stores article metadata and knows how to work with articles
+    Stores article metadata and knows how to work with articles.
+    Files are read and written through the storage of ASSETS_PATH, separate or packed,
+    saved meta data is added to the metadata index of ASSETS_PATH
     """
     def __init__(self, url, article_id):
         self.url = url
@@ -34,26 +39,39 @@ class Article:
         """
         Saves raw text and article meta data
         """
-        article_meta_name = "{}_meta.json".format(self.article_id)
+        with METRICS.timer('save_raw'):
+            open_storage(ASSETS_PATH).write_text(self._get_name('_raw.txt'), self.text)
 
-        with open(self._get_raw_text_path(), 'w', encoding='utf-8') as file:
-            file.write(self.text)
+            self._write_meta(self._get_meta())
+        METRICS.increment('articles_saved')
 
-        with open(os.path.join(ASSETS_PATH, article_meta_name), "w", encoding='utf-8') as file:
-            json.dump(self._get_meta(),
-                      file,
-                      sort_keys=False,
-                      indent=4,
-                      ensure_ascii=False,
-                      separators=(',', ': '))
+    def update_meta(self, fields: dict):
+        """
+        Adds fields to saved article meta data
+        """
+        meta = self.read_meta()
+        meta.update(fields)
+        self._write_meta(meta)
+
+    def read_meta(self) -> dict:
+        """
+        Reads saved article meta data
+        """
+        return json.loads(open_storage(ASSETS_PATH).read_text(self._get_name('_meta.json')))
+
+    def get_image_path(self):
+        """
+        Returns path for image of article statistics
+        """
+        return os.path.join(ASSETS_PATH, f'{self.article_id}_image.png')
 
     @staticmethod
     def from_meta_json(json_path: str):
         """
         Loads meta.json file and writes its data
         """
-        with open(json_path, encoding='utf-8') as meta_file:
-            meta = json.load(meta_file)
+        storage = open_storage(os.path.dirname(json_path))
+        meta = json.loads(storage.read_text(os.path.basename(json_path)))
 
         url = meta.get('url', None)
         article_id = meta.get('id', None)
@@ -72,16 +90,72 @@ class Article:
         """
         Gets a raw text for requested article
         """
-        with open(self._get_raw_text_path(), encoding='utf-8') as file:
-            return file.read()
+        return open_storage(ASSETS_PATH).read_text(self._get_name('_raw.txt'))
+
+    def get_raw_size(self):
+        """
+        Returns size of raw text file in bytes
+        """
+        return open_storage(ASSETS_PATH).get_size(self._get_name('_raw.txt'))
+
+    def iter_raw_lines(self):
+        """
+        Reads raw text line by line
+        """
+        with open_storage(ASSETS_PATH).open_reader(self._get_name('_raw.txt')) as file:
+            yield from file
+
+    def iter_processed_chunks(self, chunk_size):
+        """
+        Reads processed text by chunks of chunk_size characters
+        """
+        with open_storage(ASSETS_PATH).open_reader(self._get_name('_processed.txt')) as file:
+            yield from iter(lambda: file.read(chunk_size), '')
 
     def save_processed(self, processed_text):
         """
         Saves processed article text
         """
-        with open(self._get_processed_text_path(), 'w', encoding='utf-8') as file:
+        with METRICS.timer('save_processed'), self.open_processed_writer() as file:
             file.write(processed_text)
 
+    def open_processed_writer(self):
+        """
+        Opens buffered writer of processed text, the text replaces
+        the previous version atomically once the writer is closed
+        """
+        return open_storage(ASSETS_PATH).open_writer(self._get_name('_processed.txt'))
+
+    def has_processed(self):
+        """
+        Checks that processed text is saved for the article
+        """
+        return open_storage(ASSETS_PATH).exists(self._get_name('_processed.txt'))
+
+    def remove_raw(self):
+        """
+        Removes raw article text if it exists
+        """
+        storage = open_storage(ASSETS_PATH)
+        if storage.exists(self._get_name('_raw.txt')):
+            storage.remove(self._get_name('_raw.txt'))
+
+    def remove_processed(self):
+        """
+        Removes processed article text if it exists
+        """
+        if self.has_processed():
+            open_storage(ASSETS_PATH).remove(self._get_name('_processed.txt'))
+
+    def remove_meta(self):
+        """
+        Removes article meta data from the storage and the meta data index if it exists
+        """
+        storage = open_storage(ASSETS_PATH)
+        if storage.exists(self._get_name('_meta.json')):
+            storage.remove(self._get_name('_meta.json'))
+        open_metadata_index(ASSETS_PATH).remove(self.article_id)
+
     def _get_meta(self):
         """
         Gets all article params
@@ -95,23 +169,27 @@ class Article:
             'topics': self.topics
         }
 
-    def _date_to_text(self):
+    def _write_meta(self, meta):
         """
-        Converts datetime object to text
+        Writes article meta data
         """
-        return self.date.strftime("%Y-%m-%d %H:%M:%S")
+        with open_storage(ASSETS_PATH).open_writer(self._get_name('_meta.json')) as file:
+            json.dump(meta,
+                      file,
+                      sort_keys=False,
+                      indent=4,
+                      ensure_ascii=False,
+                      separators=(',', ': '))
+        open_metadata_index(ASSETS_PATH).update(meta)
 
-    def _get_raw_text_path(self):
+    def _date_to_text(self):
         """
-        Returns path for requested raw article
+        Converts datetime object to text
         """
-        article_txt_name = "{}_raw.txt".format(self.article_id)
-        return os.path.join(ASSETS_PATH, article_txt_name)
+        return format_meta_date(self.date)
 
-    def _get_processed_text_path(self):
+    def _get_name(self, suffix):
         """
-        Returns path for requested processed article
+        Returns name of article file in the storage
         """
-        article_txt_name = "{}_processed.txt".format(self.article_id)
-        return os.path.join(ASSETS_PATH, article_txt_name)
-
+        return f'{self.article_id}{suffix}'
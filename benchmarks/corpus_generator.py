@@ -0,0 +1,69 @@
+"""
+Generates synthetic Russian news corpora in the N_raw.txt and N_meta.json layout
+"""
+
+import argparse
+import datetime
+import os
+import random
+from contextlib import contextmanager
+from unittest import mock
+
+import article as article_module
+from article import Article
+from benchmarks.pages import TOPICS, make_sentence, make_text
+from metadata_index import remove_metadata_index
+from storage import close_storage
+
+AUTHORS = ('Иванов И.', 'Петрова А.', 'Сидоров П.', 'NOT FOUND')
+
+
+@contextmanager
+def use_assets_path(path: str):
+    """
+    Makes articles read and write their files in the folder instead of ASSETS_PATH,
+    the storage of the folder is closed and its meta data index removed afterwards
+    """
+    os.makedirs(path, exist_ok=True)
+    try:
+        with mock.patch.object(article_module, 'ASSETS_PATH', path):
+            yield path
+    finally:
+        remove_metadata_index(path)
+        close_storage(path)
+
+
+def make_article(article_id: int, sentences: tuple = (10, 60)) -> Article:
+    """
+    Returns an article with random text, title, date, author and topic derived from article_id
+    """
+    rng = random.Random(article_id)
+    article = Article(url=f'https://mordovia-news.ru/news-{article_id}-1.htm', article_id=article_id)
+    article.title = make_sentence(rng)
+    article.date = datetime.datetime(2015, 1, 1) + datetime.timedelta(seconds=rng.randrange(7 * 365 * 24 * 3600))
+    article.author = rng.choice(AUTHORS)
+    article.topics = [rng.choice(TOPICS)]
+    article.text = make_text(rng, rng.randint(*sentences))
+    return article
+
+
+def generate_corpus(path: str, number_of_articles: int, sentences: tuple = (10, 60), first_id: int = 1) -> list:
+    """
+    Saves number_of_articles articles to the folder, returns their ids
+    """
+    article_ids = list(range(first_id, first_id + number_of_articles))
+    with use_assets_path(path):
+        for article_id in article_ids:
+            make_article(article_id, sentences).save_raw()
+    return article_ids
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generates a synthetic corpus of raw articles')
+    parser.add_argument('path', type=str)
+    parser.add_argument('--articles', type=int, default=1000)
+    parser.add_argument('--min-sentences', type=int, default=10)
+    parser.add_argument('--max-sentences', type=int, default=60)
+    args = parser.parse_args()
+    generate_corpus(args.path, args.articles, (args.min_sentences, args.max_sentences))
+    print(f'Generated {args.articles} articles in {args.path}')
@@ -0,0 +1,50 @@
+"""
+Compares strptime and strftime with the date codec of dates module
+"""
+
+import argparse
+import datetime
+import random
+import time
+
+from dates import META_DATE_FORMAT, PAGE_DATE_FORMAT, format_meta_date, parse_meta_date, parse_page_date, \
+    to_datetime64
+
+
+def _measure(function, values) -> float:
+    start = time.perf_counter()
+    for value in values:
+        function(value)
+    return (time.perf_counter() - start) / len(values) * 1e9
+
+
+def main(number_of_dates: int) -> dict:
+    """
+    Prints nanoseconds per date for every way of conversion
+    """
+    rng = random.Random(number_of_dates)
+    dates = [datetime.datetime(2000, 1, 1) + datetime.timedelta(seconds=rng.randrange(10 ** 9))
+             for _ in range(number_of_dates)]
+    meta_texts = [date.strftime(META_DATE_FORMAT) for date in dates]
+    page_texts = [date.strftime(PAGE_DATE_FORMAT) for date in dates]
+    results = {
+        'strptime meta': _measure(lambda text: datetime.datetime.strptime(text, META_DATE_FORMAT), meta_texts),
+        'parse_meta_date': _measure(parse_meta_date, meta_texts),
+        'parse_meta_date strict': _measure(lambda text: parse_meta_date(text, strict=True), meta_texts),
+        'strptime page': _measure(lambda text: datetime.datetime.strptime(text, PAGE_DATE_FORMAT), page_texts),
+        'parse_page_date': _measure(parse_page_date, page_texts),
+        'strftime meta': _measure(lambda date: date.strftime(META_DATE_FORMAT), dates),
+        'format_meta_date': _measure(format_meta_date, dates),
+    }
+    start = time.perf_counter()
+    to_datetime64(meta_texts)
+    results['to_datetime64'] = (time.perf_counter() - start) / number_of_dates * 1e9
+    for name, nanoseconds in results.items():
+        print(f'{name}: {nanoseconds:.0f} ns per date')
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measures date conversions')
+    parser.add_argument('--dates', type=int, default=200_000)
+    main(parser.parse_args().dates)
@@ -0,0 +1,73 @@
+"""
+Compares per-page parse time and peak memory of full and strained HTML parsing
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from scrapper import ARTICLE_STRAINER, LINKS_STRAINER, ArticleParser, Crawler, parse_html
+from benchmarks.pages import article_page, seed_page
+
+
+def _article_fields(page: bytes, parse_only):
+    parser = ArticleParser(full_url='https://mordovia-news.ru/news-1-1.htm', article_id=1)
+    parser.parse_only = parse_only
+    parser._fill_article(page)  # pylint: disable=protected-access
+    article = parser.article
+    return article.title, article.author, article.topics, article.date, article.text
+
+
+def _links(page: bytes, parse_only):
+    return _CRAWLER._extract_url(parse_html(page, parse_only))  # pylint: disable=protected-access
+
+
+_CRAWLER = Crawler(seed_urls=[], max_articles=0)
+
+
+def measure(extract, pages, parse_only):
+    """
+    Returns extracted results, seconds per page and peak memory of parsing one page in bytes
+    """
+    start = time.perf_counter()
+    results = [extract(page, parse_only) for page in pages]
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    extract(pages[0], parse_only)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return results, elapsed / len(pages), peak
+
+
+def compare(name, extract, pages, strainer):
+    """
+    Prints full and strained parsing figures and checks that results are the same
+    """
+    full_results, full_time, full_peak = measure(extract, pages, None)
+    fast_results, fast_time, fast_peak = measure(extract, pages, strainer)
+    if full_results != fast_results:
+        raise AssertionError(f'{name}: strained parsing gives different results')
+    print(f'{name}: full {full_time * 1000:.2f} ms/page, peak {full_peak / 1024:.0f} KiB; '
+          f'strained {fast_time * 1000:.2f} ms/page, peak {fast_peak / 1024:.0f} KiB; '
+          f'speedup {full_time / fast_time:.1f}x')
+    return {'full_seconds': full_time, 'strained_seconds': fast_time,
+            'full_peak': full_peak, 'strained_peak': fast_peak}
+
+
+def main(number_of_pages: int):
+    """
+    Runs benchmark for article and seed pages
+    """
+    articles = [article_page(article_id).encode('utf-8') for article_id in range(1, number_of_pages + 1)]
+    seeds = [seed_page(range(page * 20, page * 20 + 20), page).encode('utf-8') for page in range(number_of_pages)]
+    return {
+        'article_parse': compare('ArticleParser', _article_fields, articles, ARTICLE_STRAINER),
+        'link_extraction': compare('Crawler links', _links, seeds, LINKS_STRAINER)
+    }
+
+
+if __name__ == '__main__':
+    arguments_parser = argparse.ArgumentParser(description='Compares full and strained HTML parsing')
+    arguments_parser.add_argument('--pages', type=int, default=50)
+    main(arguments_parser.parse_args().pages)
@@ -0,0 +1,69 @@
+"""
+Measures import time of project modules with python -X importtime
+and checks it against the startup budget
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+from constants import PROJECT_ROOT
+
+# cumulative import time budget in microseconds
+IMPORT_TIME_BUDGETS = {
+    'article': 50_000,
+    'pipeline': 100_000,
+    'pos_frequency_pipeline': 100_000,
+    'scrapper': 100_000,
+}
+HEAVY_MODULES = ('pymystem3', 'pymorphy2', 'requests', 'bs4', 'matplotlib', 'numpy')
+
+
+def _run_python(*args) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], cwd=PROJECT_ROOT, capture_output=True,
+                          text=True, check=True)
+
+
+def measure_import_time(module: str, repeats: int = 5) -> int:
+    """
+    Returns median cumulative import time of the module in microseconds, every import runs in a new interpreter
+    """
+    times = []
+    for _ in range(repeats):
+        stderr = _run_python('-X', 'importtime', '-c', f'import {module}').stderr
+        # lines look like "import time: self | cumulative | name", nested imports are indented
+        for line in stderr.splitlines():
+            columns = line.split('|')
+            if len(columns) == 3 and columns[2] == f' {module}':
+                times.append(int(columns[1]))
+    return int(statistics.median(times))
+
+
+def get_imported_heavy_modules(module: str) -> list:
+    """
+    Returns heavy dependencies loaded by importing the module
+    """
+    code = f'import sys, {module}; print(" ".join(sorted(set(sys.modules) & set({HEAVY_MODULES!r}))))'
+    return _run_python('-c', code).stdout.split()
+
+
+def check_budgets(budgets: dict = None, repeats: int = 5) -> dict:
+    """
+    Returns modules which import time is over the budget with their times
+    """
+    budgets = IMPORT_TIME_BUDGETS if budgets is None else budgets
+    over_budget = {}
+    for module, budget in budgets.items():
+        import_time = measure_import_time(module, repeats)
+        print(f'{module}: {import_time / 1000:.1f} ms, budget {budget / 1000:.1f} ms')
+        if import_time > budget:
+            over_budget[module] = import_time
+    return over_budget
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Checks import time of project modules')
+    parser.add_argument('--repeats', type=int, default=5)
+    if check_budgets(repeats=parser.parse_args().repeats):
+        sys.exit(1)
@@ -0,0 +1,100 @@
+"""
+Local HTTP server with mordovia-news.ru shaped seed and article pages for offline crawling
+"""
+
+import re
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.pages import article_page, seed_page
+
+ARTICLE_PATH = re.compile(r'news-(\d+)-(\d+)\.htm$')
+SEED_PATH = re.compile(r'^/page-(\d+)/$')
+
+
+@lru_cache(maxsize=4096)
+def _render_article(article_id: int, sentences: int) -> bytes:
+    return article_page(article_id, sentences).encode('utf-8')
+
+
+@lru_cache(maxsize=1024)
+def _render_seed(first_id: int, last_id: int, page_number: int) -> bytes:
+    return seed_page(range(first_id, last_id), page_number).encode('utf-8')
+
+
+class NewsSiteHandler(BaseHTTPRequestHandler):
+    """
+    Serves /page-N/ seed pages listing articles_per_page articles and their /news-ID-N.htm pages
+    """
+    def do_GET(self):
+        # pylint: disable=invalid-name
+        site = self.server.site
+        if site.latency:
+            time.sleep(site.latency)
+        path = self.path.split('?', 1)[0]
+        article_match = ARTICLE_PATH.search(path)
+        seed_match = SEED_PATH.match(path)
+        if article_match and 1 <= int(article_match.group(1)) <= site.number_of_articles:
+            body = _render_article(int(article_match.group(1)), site.sentences)
+        elif seed_match and int(seed_match.group(1)) < site.number_of_seeds:
+            page_number = int(seed_match.group(1))
+            first_id = page_number * site.articles_per_page + 1
+            body = _render_seed(first_id, min(first_id + site.articles_per_page, site.number_of_articles + 1),
+                                page_number)
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class NewsSite:
+    """
+    Runs the news site in a background thread while used as a context manager
+    """
+    def __init__(self, number_of_articles: int = 100, articles_per_page: int = 20, sentences: int = 30,
+                 latency: float = 0.0):
+        self.number_of_articles = number_of_articles
+        self.articles_per_page = articles_per_page
+        self.number_of_seeds = -(-number_of_articles // articles_per_page)
+        self.sentences = sentences
+        self.latency = latency
+        self._server = None
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), NewsSiteHandler)
+        self._server.daemon_threads = True
+        self._server.site = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def url(self) -> str:
+        """
+        Returns root URL of the running site
+        """
+        return f'http://127.0.0.1:{self._server.server_port}/'
+
+    def get_seed_urls(self) -> list:
+        """
+        Returns URLs of all seed pages
+        """
+        return [f'{self.url}page-{page_number}/' for page_number in range(self.number_of_seeds)]
+
+    def get_article_urls(self) -> list:
+        """
+        Returns URLs of all article pages
+        """
+        return [f'{self.url}news-{article_id}-1.htm' for article_id in range(1, self.number_of_articles + 1)]
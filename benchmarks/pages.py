@@ -0,0 +1,72 @@
+"""
+Generates synthetic pages shaped like mordovia-news.ru seed and article pages
+"""
+
+import random
+
+WORDS = ('республика', 'мордовия', 'саранск', 'глава', 'региона', 'новый', 'проект', 'жители', 'города',
+         'район', 'школа', 'больница', 'дорога', 'ремонт', 'строительство', 'открыли', 'провели', 'встреча',
+         'правительство', 'министерство', 'культура', 'спорт', 'команда', 'победила', 'чемпионат', 'работа',
+         'предприятие', 'завод', 'выпуск', 'продукции', 'урожай', 'сельское', 'хозяйство', 'погода', 'снег',
+         'мороз', 'весна', 'праздник', 'концерт', 'театр', 'выставка', 'музей', 'студенты', 'университет',
+         'конкурс', 'победители', 'награда', 'ветераны', 'память', 'история', 'в', 'на', 'и', 'по', 'с',
+         'для', 'о', 'за', 'году', 'году', 'этом', 'был', 'была', 'будет', 'стали', 'очень', 'также')
+TOPICS = ('Политика', 'Экономика', 'Общество', 'Культура', 'Спорт', 'Происшествия')
+
+
+def make_sentence(rng: random.Random) -> str:
+    """
+    Returns a random Russian-like sentence
+    """
+    words = [rng.choice(WORDS) for _ in range(rng.randint(6, 16))]
+    return ' '.join(words).capitalize() + rng.choice(('.', '.', '.', '!', '?'))
+
+
+def make_text(rng: random.Random, sentences: int) -> str:
+    """
+    Returns a random article text of several paragraphs
+    """
+    paragraphs = []
+    while sentences > 0:
+        size = min(sentences, rng.randint(2, 5))
+        paragraphs.append(' '.join(make_sentence(rng) for _ in range(size)))
+        sentences -= size
+    return '\n'.join(paragraphs)
+
+
+def _navigation(rng: random.Random, links: int) -> str:
+    return ''.join(f'<li><a href="/section-{rng.randint(1, 50)}.htm" title="{rng.choice(WORDS)}">'
+                   f'{rng.choice(WORDS)}</a></li>' for _ in range(links))
+
+
+def seed_page(article_ids, page_number: int = 0) -> str:
+    """
+    Returns a news list page linking to articles with the given ids
+    """
+    rng = random.Random(page_number)
+    items = ''.join(f'<div class="news_item"><a href="/news-{article_id}-{page_number}.htm">'
+                    f'<img src="/img/{article_id}.jpg"></a><p>{make_sentence(rng)}</p>'
+                    f'<a href="/news-{article_id}-{page_number}.htm">Подробнее</a></div>'
+                    for article_id in article_ids)
+    return (f'<html><head><title>Новости Мордовии</title></head><body>'
+            f'<ul class="menu">{_navigation(rng, 80)}</ul>'
+            f'<div class="news_list">{items}</div>'
+            f'<ul class="footer">{_navigation(rng, 40)}</ul></body></html>')
+
+
+def article_page(article_id: int, sentences: int = 30) -> str:
+    """
+    Returns an article page, its title, topic, date and text are derived from article_id
+    """
+    rng = random.Random(article_id)
+    title = make_sentence(rng)
+    date = f'{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.{rng.randint(2015, 2021)}'
+    paragraphs = ''.join(f'<p>{paragraph}</p>' for paragraph in make_text(rng, sentences).split('\n'))
+    return (f'<html><head><title>{title}</title><script>var counter = {article_id};</script></head><body>'
+            f'<ul class="menu">{_navigation(rng, 120)}</ul>'
+            f'<table class="content"><tr><td><span class="title_text"><a href="/">Главная</a> / '
+            f'<a href="/rubric-{article_id % len(TOPICS)}.htm">{TOPICS[article_id % len(TOPICS)]}</a></span>'
+            f'<span class="title_data">Опубликовано {date}</span>'
+            f'<dl><dd class="title"> {title} </dd><dd class="text">{paragraphs}</dd></dl></td>'
+            f'<td class="sidebar">{_navigation(rng, 60)}</td></tr></table>'
+            f'<ul class="footer">{_navigation(rng, 40)}</ul></body></html>')
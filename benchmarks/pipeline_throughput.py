@@ -0,0 +1,36 @@
+"""
+Measures TextProcessingPipeline throughput over articles of ASSETS_PATH for different numbers of workers
+"""
+
+import argparse
+import time
+
+from constants import ASSETS_PATH
+from pipeline import CorpusManager, TextProcessingPipeline, validate_dataset
+
+
+def measure_throughput(workers_options: list) -> dict:
+    """
+    Runs the pipeline over the dataset once per number of workers,
+    returns processed articles per second for each of them
+    """
+    validate_dataset(ASSETS_PATH)
+    throughput = {}
+    for workers in workers_options:
+        corpus_manager = CorpusManager(path_to_raw_txt_data=ASSETS_PATH)
+        number_of_articles = len(corpus_manager.get_article_ids())
+        start = time.perf_counter()
+        with TextProcessingPipeline(corpus_manager, workers=workers) as pipeline:
+            pipeline.run()
+        elapsed = time.perf_counter() - start
+        throughput[workers] = number_of_articles / elapsed
+        print(f'{workers} workers: {number_of_articles} articles in {elapsed:.2f} s, '
+              f'{throughput[workers]:.2f} articles/s')
+    return throughput
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measures pipeline throughput per number of workers')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    measure_throughput(args.workers)
@@ -0,0 +1,195 @@
+"""
+Offline benchmark suite: crawling and parsing of the local news site, text processing
+of a synthetic corpus and visualization. Results are compared with baselines.json,
+a benchmark regresses when it is slower than its baseline times the threshold.
+Results and baselines are kept relative to a fixed calibration loop timed in the same run,
+so baselines recorded on one machine hold on faster or slower ones
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus_generator import generate_corpus, use_assets_path
+from benchmarks.news_site import NewsSite
+from pipeline import POS_TAGS, CorpusManager, MorphAnalyzers, TextProcessingPipeline
+from scrapper import ArticleParser, Crawler, HTTPFetcher
+from visualizer import visualize
+
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+REGRESSION_THRESHOLD = 1.3
+CALIBRATION_SIZE = 200_000
+
+
+def _calibration_loop(size: int) -> int:
+    """
+    Fixed pure Python work of the kind the benchmarks do: string building, dict updates and arithmetic
+    """
+    counts = {}
+    total = 0
+    for number in range(size):
+        key = f'w{number % 1000}'
+        counts[key] = counts.get(key, 0) + 1
+        total += len(key) * (number & 7)
+    return total + len(counts)
+
+
+def calibrate(repeats: int = 5) -> float:
+    """
+    Returns seconds of the calibration loop, the best of repeats
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        _calibration_loop(CALIBRATION_SIZE)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def crawler_find_articles(size: int) -> float:
+    """
+    Returns seconds per seed page of Crawler.find_articles
+    """
+    with NewsSite(number_of_articles=size * 20, articles_per_page=20) as site:
+        seed_urls = site.get_seed_urls()
+        fetcher = HTTPFetcher()
+        Crawler(seed_urls[:1], max_articles=1, fetcher=fetcher).find_articles()
+        crawler = Crawler(seed_urls, max_articles=size * 20, fetcher=fetcher)
+        start = time.perf_counter()
+        crawler.find_articles()
+        elapsed = time.perf_counter() - start
+        fetcher.close()
+    return elapsed / len(seed_urls)
+
+
+def article_parser_parse(size: int) -> float:
+    """
+    Returns seconds per article of ArticleParser.parse including download and saving
+    """
+    with NewsSite(number_of_articles=size) as site, tempfile.TemporaryDirectory() as path, use_assets_path(path):
+        fetcher = HTTPFetcher()
+        urls = site.get_article_urls()
+        ArticleParser(urls[0], 1, fetcher).parse()
+        start = time.perf_counter()
+        for article_id, url in enumerate(urls, 1):
+            ArticleParser(url, article_id, fetcher).parse()
+        elapsed = time.perf_counter() - start
+        fetcher.close()
+    return elapsed / size
+
+
+def text_processing_pipeline_run(size: int) -> float:
+    """
+    Returns seconds per article of TextProcessingPipeline.run with already started analyzers
+    """
+    with tempfile.TemporaryDirectory() as path, use_assets_path(path), MorphAnalyzers() as analyzers:
+        generate_corpus(path, size)
+        analyzers.mystem.analyze('мама мыла раму')
+        analyzers.get_morphy_tag('мама')
+        start = time.perf_counter()
+        TextProcessingPipeline(CorpusManager(path_to_raw_txt_data=path), analyzers).run()
+        elapsed = time.perf_counter() - start
+    return elapsed / size
+
+
+def visualize_images(size: int) -> float:
+    """
+    Returns seconds per image of visualize
+    """
+    rng = random.Random(size)
+    statistics = [{tag: rng.randint(1, 500) for tag in rng.sample(POS_TAGS, 10)} for _ in range(size)]
+    with tempfile.TemporaryDirectory() as path:
+        start = time.perf_counter()
+        for index, article_statistics in enumerate(statistics):
+            visualize(article_statistics, os.path.join(path, f'{index}_image.png'))
+        elapsed = time.perf_counter() - start
+    return elapsed / size
+
+
+BENCHMARKS = {
+    'crawler_find_articles': (crawler_find_articles, 10),
+    'article_parser_parse': (article_parser_parse, 50),
+    'text_processing_pipeline_run': (text_processing_pipeline_run, 50),
+    'visualize': (visualize_images, 20),
+}
+
+
+def load_baselines(path: str = BASELINES_PATH) -> dict:
+    """
+    Returns stored baselines, empty if there are none
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_baselines(baselines: dict, path: str = BASELINES_PATH):
+    """
+    Writes baselines to disk
+    """
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(baselines, file, indent=4, sort_keys=True)
+        file.write('\n')
+
+
+def find_regressions(results: dict, baselines: dict, calibration: float) -> dict:
+    """
+    Returns benchmarks slower than their baselines times the threshold with their slowdown.
+    Seconds of results are divided by seconds of the calibration loop to be compared with relative baselines
+    """
+    regressions = {}
+    for name, seconds in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+        slowdown = seconds / calibration / baseline['relative']
+        if slowdown > baseline.get('threshold', REGRESSION_THRESHOLD):
+            regressions[name] = slowdown
+    return regressions
+
+
+def run(names: list, repeats: int = 3) -> dict:
+    """
+    Runs benchmarks, the best of repeats is taken as the result
+    """
+    results = {}
+    for name in names:
+        benchmark, size = BENCHMARKS[name]
+        results[name] = min(benchmark(size) for _ in range(repeats))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs offline benchmarks and checks them against baselines')
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--update-baselines', action='store_true')
+    args = parser.parse_args()
+
+    calibration = calibrate()
+    results = run(args.only, args.repeats)
+    baselines = load_baselines()
+    regressions = find_regressions(results, baselines, calibration)
+    print(f'calibration loop: {calibration * 1000:.2f} ms')
+    for name, seconds in results.items():
+        baseline = baselines.get(name)
+        compared = f', baseline {baseline["relative"]:.4f}' if baseline else ', no baseline'
+        status = ' REGRESSION' if name in regressions else ''
+        print(f'{name}: {seconds * 1000:.2f} ms per item, {seconds / calibration:.4f} of calibration loop'
+              f'{compared}{status}')
+
+    if args.update_baselines:
+        for name, seconds in results.items():
+            baselines[name] = {**baselines.get(name, {}), 'relative': round(seconds / calibration, 6)}
+        save_baselines(baselines)
+        return 0
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+Compares memory used by a list of MorphologicalToken objects and by ArticleTokens
+"""
+
+import argparse
+import random
+import tracemalloc
+
+from pipeline import ArticleTokens, MorphologicalToken
+from benchmarks.pages import WORDS
+
+TAGS = ('S,жен,неод=им,ед', 'V,несов,пе=прош,ед,изъяв,жен', 'A=им,ед,полн,жен', 'PR=', 'CONJ=', 'ADV=')
+MORPHY_TAGS = ('NOUN,inan,femn sing,nomn', 'VERB,impf,tran femn,sing,past,indc', 'ADJF,Qual femn,sing,nomn',
+               'PREP', 'CONJ', 'ADVB')
+
+
+def _features(number_of_tokens: int):
+    rng = random.Random(number_of_tokens)
+    for _ in range(number_of_tokens):
+        word = rng.choice(WORDS)
+        # mystem and pymorphy2 return new string objects for every token
+        yield ''.join(word), ''.join(word), ''.join(rng.choice(TAGS)), ''.join(rng.choice(MORPHY_TAGS))
+
+
+def _token_list(number_of_tokens: int):
+    tokens = []
+    for original_word, normalized_form, tags, morphy_tags in _features(number_of_tokens):
+        token = MorphologicalToken(original_word, normalized_form)
+        token.tags = tags
+        token.morphy_tags = morphy_tags
+        tokens.append(token)
+    return tokens
+
+
+def _article_tokens(number_of_tokens: int):
+    tokens = ArticleTokens()
+    for features in _features(number_of_tokens):
+        tokens.append(*features)
+    return tokens
+
+
+def measure(build, number_of_tokens: int):
+    """
+    Returns memory in bytes held by the structure built for number_of_tokens
+    """
+    tracemalloc.start()
+    tokens = build(number_of_tokens)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del tokens
+    return size
+
+
+def main(number_of_tokens: int):
+    """
+    Prints memory per million tokens for both representations
+    """
+    scale = 1_000_000 / number_of_tokens / 2 ** 20
+    objects = measure(_token_list, number_of_tokens) * scale
+    columns = measure(_article_tokens, number_of_tokens) * scale
+    print(f'list of MorphologicalToken: {objects:.1f} MiB per million tokens')
+    print(f'ArticleTokens: {columns:.1f} MiB per million tokens, {objects / columns:.1f}x less')
+    return {'objects_mib_per_million': objects, 'columns_mib_per_million': columns}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compares memory of token representations')
+    parser.add_argument('--tokens', type=int, default=1_000_000)
+    main(parser.parse_args().tokens)
@@ -0,0 +1,47 @@
+"""
+Measures images per second rendered by visualizer for different numbers of workers
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from pipeline import POS_TAGS
+from visualizer import visualize, visualize_batch
+
+
+def _statistics(number_of_images: int):
+    rng = random.Random(number_of_images)
+    return [{tag: rng.randint(1, 500) for tag in rng.sample(POS_TAGS, 10)} for _ in range(number_of_images)]
+
+
+def measure(number_of_images: int, workers_options: list) -> dict:
+    """
+    Renders number_of_images one by one with visualize and in batches per number of workers,
+    returns images per second for each way
+    """
+    statistics = _statistics(number_of_images)
+    throughput = {}
+    with tempfile.TemporaryDirectory() as path:
+        paths = [os.path.join(path, f'{index}_image.png') for index in range(number_of_images)]
+        start = time.perf_counter()
+        for article_statistics, path_to_save in zip(statistics, paths):
+            visualize(article_statistics, path_to_save)
+        throughput['visualize'] = number_of_images / (time.perf_counter() - start)
+        for workers in workers_options:
+            start = time.perf_counter()
+            visualize_batch(zip(statistics, paths), workers)
+            throughput[workers] = number_of_images / (time.perf_counter() - start)
+    for way, images_per_second in throughput.items():
+        print(f'{way}: {images_per_second:.1f} images/s')
+    return throughput
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measures visualizer throughput')
+    parser.add_argument('--images', type=int, default=200)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+    measure(args.images, args.workers)
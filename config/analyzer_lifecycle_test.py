@@ -0,0 +1,27 @@
+import unittest
+from pipeline import CorpusManager, MorphAnalyzers, TextProcessingPipeline
+from constants import ASSETS_PATH
+
+
+class AnalyzerLifecycleTest(unittest.TestCase):
+    def test_analyzers_are_started_once(self):
+        with MorphAnalyzers() as analyzers:
+            pipe = TextProcessingPipeline(CorpusManager(path_to_raw_txt_data=ASSETS_PATH), analyzers)
+            for text in ('мама мыла раму', 'красивая мама', 'во второй реке'):
+                pipe._process(text)
+            self.assertEqual({'mystem': 1, 'morph': 1}, analyzers.startups,
+                             msg="Mystem and MorphAnalyzer should be created once per run")
+
+    def test_owned_analyzers_are_closed(self):
+        with TextProcessingPipeline(CorpusManager(path_to_raw_txt_data=ASSETS_PATH)) as pipe:
+            pipe._process('мама мыла раму')
+            analyzers = pipe.analyzers
+        self.assertEqual({'mystem': 1, 'morph': 1}, analyzers.startups)
+        pipe._process('мама мыла раму')
+        self.assertEqual({'mystem': 2, 'morph': 2}, analyzers.startups,
+                         msg="Analyzers should be released when the pipeline is closed")
+        pipe.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+from pipeline import ArticleTokens, MorphologicalToken
+
+FEATURES = [('мама', 'мама', 'S,жен,од=им,ед', 'NOUN,anim,femn sing,nomn'),
+            ('мыла', 'мыть', 'V,несов,пе=прош,ед,изъяв,жен', 'VERB,impf,tran femn,sing,past,indc'),
+            ('маму', 'мама', 'S,жен,од=вин,ед', 'NOUN,anim,femn sing,accs')]
+
+
+class ArticleTokensTest(unittest.TestCase):
+    def test_output_is_the_same_as_for_tokens(self):
+        tokens = []
+        article_tokens = ArticleTokens()
+        for original_word, normalized_form, tags, morphy_tags in FEATURES:
+            token = MorphologicalToken(original_word, normalized_form)
+            token.tags = tags
+            token.morphy_tags = morphy_tags
+            tokens.append(token)
+            article_tokens.append(original_word, normalized_form, tags, morphy_tags)
+
+        self.assertEqual(' '.join([str(token) for token in tokens]), str(article_tokens))
+        self.assertEqual([str(token) for token in tokens], [str(token) for token in article_tokens])
+        self.assertEqual('мыла', article_tokens[1].original_word)
+        self.assertEqual(3, len(article_tokens))
+
+    def test_tokens_have_no_dict(self):
+        self.assertFalse(hasattr(MorphologicalToken('мама', 'мама'), '__dict__'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import shutil
+import unittest
+
+import numpy as np
+from matplotlib.image import imread
+
+from visualizer import visualize, visualize_articles, visualize_batch
+from config.test_articles import get_test_corpus_manager, remove_test_articles, save_test_articles
+from config.test_params import TEST_PATH
+
+STATISTICS = [
+    {'S': 120, 'V': 64, 'A': 30, 'PR': 28, 'CONJ': 17, 'ADV': 12, 'NUM': 3},
+    {'S': 50, 'V': 20, 'A': 9},
+    {'S': 7, 'SPRO': 2},
+]
+
+
+class BatchVisualizerTest(unittest.TestCase):
+    def setUp(self):
+        os.makedirs(TEST_PATH, exist_ok=True)
+        self.paths = [os.path.join(TEST_PATH, f'{index}_image.png') for index in range(len(STATISTICS))]
+
+    def tearDown(self):
+        shutil.rmtree(TEST_PATH)
+
+    def test_batch_images_are_the_same_as_single_ones(self):
+        self.assertEqual(len(STATISTICS), visualize_batch(zip(STATISTICS, self.paths)))
+        single_path = os.path.join(TEST_PATH, 'single_image.png')
+        for statistics, path in zip(STATISTICS, self.paths):
+            visualize(statistics, single_path)
+            self.assertTrue(np.array_equal(imread(single_path), imread(path)),
+                            msg="Reused figure should not keep anything from previous images")
+
+    def test_parallel_rendering(self):
+        self.assertEqual(len(STATISTICS), visualize_batch(zip(STATISTICS, self.paths), workers=2))
+        for path in self.paths:
+            self.assertTrue(os.path.getsize(path) > 0)
+
+
+class VisualizeArticlesTest(unittest.TestCase):
+    def setUp(self):
+        self.articles = save_test_articles(dict.fromkeys((-2202, -2201), 'Мама мыла раму.'),
+                                           dict.fromkeys((-2202, -2201), 'мама_S мыть_V рама_S'))
+        self.articles[1].update_meta({'pos_frequencies': {'S': 2, 'V': 1}})
+        self.articles[0].remove_meta()
+
+    def tearDown(self):
+        remove_test_articles(self.articles)
+
+    def test_article_without_meta_is_skipped(self):
+        self.assertEqual(1, visualize_articles(get_test_corpus_manager(self.articles), workers=1),
+                         msg="Article without meta data should not stop rendering of other articles")
+        self.assertFalse(os.path.exists(self.articles[0].get_image_path()))
+        self.assertTrue(os.path.exists(self.articles[1].get_image_path()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import shutil
+import unittest
+
+from article import Article
+from benchmarks.corpus_generator import generate_corpus, use_assets_path
+from benchmarks.news_site import NewsSite
+from benchmarks.suite import calibrate, find_regressions
+from pipeline import CorpusManager
+from scrapper import ArticleParser, Crawler, HTTPFetcher
+
+TEST_PATH = os.path.join(os.path.dirname(__file__), 'test_tmp')
+
+
+class CorpusGeneratorTest(unittest.TestCase):
+    def setUp(self):
+        os.makedirs(TEST_PATH, exist_ok=True)
+
+    def tearDown(self):
+        shutil.rmtree(TEST_PATH, ignore_errors=True)
+
+    def test_generated_corpus_is_loaded_by_corpus_manager(self):
+        with use_assets_path(TEST_PATH):
+            generate_corpus(TEST_PATH, 5, sentences=(2, 4))
+            articles = CorpusManager(path_to_raw_txt_data=TEST_PATH).get_articles()
+            self.assertEqual([1, 2, 3, 4, 5], sorted(articles))
+            meta = articles[3].read_meta()
+        self.assertTrue(meta['title'])
+        self.assertTrue(meta['topics'])
+        self.assertTrue(os.path.exists(os.path.join(TEST_PATH, '3_raw.txt')))
+
+    def test_generated_corpus_is_reproducible(self):
+        with use_assets_path(TEST_PATH):
+            generate_corpus(TEST_PATH, 2, sentences=(2, 4))
+            first = Article(url=None, article_id=2).get_raw_text()
+            generate_corpus(TEST_PATH, 2, sentences=(2, 4))
+            self.assertEqual(first, Article(url=None, article_id=2).get_raw_text())
+
+
+class NewsSiteTest(unittest.TestCase):
+    def tearDown(self):
+        shutil.rmtree(TEST_PATH, ignore_errors=True)
+
+    def test_crawler_finds_all_articles(self):
+        with NewsSite(number_of_articles=30, articles_per_page=10) as site:
+            fetcher = HTTPFetcher()
+            crawler = Crawler(site.get_seed_urls(), max_articles=30, fetcher=fetcher)
+            crawler.find_articles()
+            fetcher.close()
+            self.assertEqual(30, len(crawler.get_search_urls()))
+
+    def test_parser_parses_served_article(self):
+        with NewsSite(number_of_articles=3) as site, use_assets_path(TEST_PATH):
+            fetcher = HTTPFetcher()
+            parser = ArticleParser(site.get_article_urls()[1], 2, fetcher)
+            parser.parse()
+            fetcher.close()
+        article = parser.article
+        self.assertTrue(article.title)
+        self.assertTrue(article.text)
+        self.assertIsNotNone(article.date)
+        self.assertTrue(os.path.exists(os.path.join(TEST_PATH, '2_raw.txt')))
+
+
+class RegressionTest(unittest.TestCase):
+    def test_slower_benchmark_is_regression(self):
+        baselines = {'fast': {'relative': 1.0}, 'loose': {'relative': 1.0, 'threshold': 3.0}}
+        results = {'fast': 2.0, 'loose': 2.0, 'new': 5.0}
+        self.assertEqual({'fast': 2.0}, find_regressions(results, baselines, calibration=1.0))
+
+    def test_benchmark_within_threshold_is_not_regression(self):
+        self.assertEqual({}, find_regressions({'fast': 1.1}, {'fast': {'relative': 1.0}}, calibration=1.0))
+
+    def test_slower_machine_is_not_regression(self):
+        baselines = {'fast': {'relative': 0.5}}
+        self.assertEqual({}, find_regressions({'fast': 2.0}, baselines, calibration=4.0))
+        self.assertEqual({'fast': 2.0}, find_regressions({'fast': 2.0}, baselines, calibration=2.0))
+
+    def test_calibration_takes_time(self):
+        self.assertGreater(calibrate(repeats=1), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import datetime
+import gzip
+import os
+import shutil
+import unittest
+from importlib.util import find_spec
+from unittest import mock
+
+import article as article_module
+from article import Article
+from metadata_index import remove_metadata_index
+from pipeline import CorpusManager
+from storage import CompressedStorage, DirectoryStorage, PackedStorage, StorageError, close_storage, \
+    compress_articles
+from config.test_params import TEST_PATH
+
+ASSETS_PATH = os.path.join(TEST_PATH, 'compressed')
+TEXT = 'Мама мыла раму.\nКрасивая мама красиво мыла раму во второй реке.\n' * 50
+
+
+class CompressedStorageTest(unittest.TestCase):
+    def setUp(self):
+        os.makedirs(ASSETS_PATH, exist_ok=True)
+
+    def tearDown(self):
+        close_storage(ASSETS_PATH)
+        remove_metadata_index(ASSETS_PATH)
+        shutil.rmtree(TEST_PATH)
+
+    @staticmethod
+    def _list_article_files():
+        return sorted(name for name in os.listdir(ASSETS_PATH) if name.startswith('1_'))
+
+    def _check_compression(self, storage: CompressedStorage, suffix: str):
+        storage.write_text('1_raw.txt', TEXT)
+        with storage.open_writer('1_processed.txt') as file:
+            file.write('мама<S>(NOUN)')
+        storage.write_text('1_meta.json', '{}')
+
+        self.assertEqual(['1_meta.json', '1_processed.txt', '1_raw.txt'], sorted(storage.list_names()))
+        self.assertEqual(['1_meta.json', f'1_processed.txt{suffix}', f'1_raw.txt{suffix}'],
+                         sorted(storage.storage.list_names()))
+        self.assertEqual(TEXT, storage.read_text('1_raw.txt'))
+        with storage.open_reader('1_raw.txt') as file:
+            self.assertEqual(TEXT.splitlines(keepends=True), list(file))
+        self.assertEqual('мама<S>(NOUN)', storage.read_text('1_processed.txt'))
+        self.assertEqual(len(TEXT.encode('utf-8')), storage.get_size('1_raw.txt'),
+                         msg="Size of compressed file should be its uncompressed size")
+        self.assertEqual(len('мама<S>(NOUN)'.encode('utf-8')), storage.get_size('1_processed.txt'))
+
+        storage.remove('1_processed.txt')
+        self.assertFalse(storage.exists('1_processed.txt'))
+        with self.assertRaises(FileNotFoundError):
+            storage.read_text('1_processed.txt')
+
+    def test_gzip_directory(self):
+        self._check_compression(CompressedStorage(DirectoryStorage(ASSETS_PATH), 'gzip'), '.gz')
+        with gzip.open(os.path.join(ASSETS_PATH, '1_raw.txt.gz'), 'rt', encoding='utf-8') as file:
+            self.assertEqual(TEXT, file.read())
+
+    def test_gzip_packed(self):
+        self._check_compression(CompressedStorage(PackedStorage(ASSETS_PATH), 'gzip'), '.gz')
+
+    @unittest.skipIf(find_spec('zstandard') is None, 'zstandard is not installed')
+    def test_zstd_directory(self):
+        self._check_compression(CompressedStorage(DirectoryStorage(ASSETS_PATH), 'zstd'), '.zst')
+
+    def test_new_version_replaces_other_compressions(self):
+        CompressedStorage(DirectoryStorage(ASSETS_PATH), 'gzip').write_text('1_raw.txt', 'old')
+        plain = CompressedStorage(DirectoryStorage(ASSETS_PATH), None)
+        self.assertEqual('old', plain.read_text('1_raw.txt'))
+        plain.write_text('1_raw.txt', 'new')
+        self.assertEqual(['1_raw.txt'], os.listdir(ASSETS_PATH))
+
+    def test_unknown_compression(self):
+        with self.assertRaises(StorageError):
+            CompressedStorage(DirectoryStorage(ASSETS_PATH), 'lzma')
+
+    def test_dataset_is_compressed_in_place(self):
+        with mock.patch.object(article_module, 'ASSETS_PATH', ASSETS_PATH):
+            article = Article(url='https://example.com/1', article_id=1)
+            article.date = datetime.datetime(2021, 1, 1)
+            article.text = TEXT
+            article.save_raw()
+            article.save_processed('мама<S>(NOUN)')
+
+            self.assertEqual(2, compress_articles(ASSETS_PATH, 'gzip'))
+            self.assertEqual(['1_meta.json', '1_processed.txt.gz', '1_raw.txt.gz'], self._list_article_files())
+            self.assertEqual(TEXT, article.get_raw_text())
+            self.assertEqual(TEXT.splitlines(keepends=True), list(article.iter_raw_lines()))
+            self.assertEqual(['мама<S>(NOUN)'], list(article.iter_processed_chunks(1024)))
+            self.assertEqual([1], list(CorpusManager(path_to_raw_txt_data=ASSETS_PATH).get_article_ids()))
+            self.assertEqual(0, compress_articles(ASSETS_PATH, 'gzip'))
+
+            self.assertEqual(2, compress_articles(ASSETS_PATH, None))
+            self.assertEqual(['1_meta.json', '1_processed.txt', '1_raw.txt'], self._list_article_files())
+            self.assertEqual(TEXT, article.get_raw_text())
+
+
+if __name__ == "__main__":
+    unittest.main()
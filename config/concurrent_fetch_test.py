@@ -0,0 +1,100 @@
+import time
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from scrapper import Crawler, HTTPFetcher
+
+DELAY = 0.2
+
+
+class SlowPageHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with SlowPageHandler.lock:
+            SlowPageHandler.active += 1
+            SlowPageHandler.max_active = max(SlowPageHandler.max_active, SlowPageHandler.active)
+        time.sleep(DELAY)
+        body = f'<html><body>{self.path}</body></html>'.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with SlowPageHandler.lock:
+            SlowPageHandler.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+class ConcurrentFetchTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), SlowPageHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.urls = [f'http://127.0.0.1:{cls.server.server_port}/news-{i}-1.htm' for i in range(12)]
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        SlowPageHandler.max_active = 0
+
+    def test_pages_are_in_order(self):
+        fetcher = HTTPFetcher(max_workers=6, per_host_limit=6)
+        pages = list(fetcher.fetch_all(self.urls))
+        fetcher.close()
+        for url, page in zip(self.urls, pages):
+            self.assertIn(url[url.rindex('/'):].encode('utf-8'), page)
+
+    def test_pages_are_fetched_concurrently(self):
+        serial_fetcher = HTTPFetcher(max_workers=1, per_host_limit=1)
+        list(serial_fetcher.fetch_all(self.urls))
+        serial_fetcher.close()
+        self.assertEqual(1, SlowPageHandler.max_active)
+
+        SlowPageHandler.max_active = 0
+        fetcher = HTTPFetcher(max_workers=6, per_host_limit=6)
+        list(fetcher.fetch_all(self.urls))
+        fetcher.close()
+        self.assertEqual(6, SlowPageHandler.max_active,
+                         msg="Every worker should have a request in flight at the same time")
+
+    def test_per_host_limit(self):
+        fetcher = HTTPFetcher(max_workers=8, per_host_limit=2)
+        list(fetcher.fetch_all(self.urls))
+        fetcher.close()
+        self.assertLessEqual(SlowPageHandler.max_active, 2)
+
+    def test_rate_limit(self):
+        fetcher = HTTPFetcher(max_workers=4, per_host_limit=4, min_interval=0.1)
+        start = time.perf_counter()
+        list(fetcher.fetch_all(self.urls[:5]))
+        fetcher.close()
+        self.assertGreaterEqual(time.perf_counter() - start, 0.4)
+
+
+
+class CrawlerFetcherTest(unittest.TestCase):
+    def test_own_fetcher_is_closed(self):
+        with mock.patch('scrapper.HTTPFetcher') as fetcher_class:
+            with Crawler(seed_urls=[], max_articles=1) as crawler:
+                self.assertIs(fetcher_class.return_value, crawler.fetcher)
+        fetcher_class.return_value.close.assert_called_once_with()
+
+    def test_given_fetcher_is_not_closed(self):
+        fetcher = mock.Mock()
+        with Crawler(seed_urls=[], max_articles=1, fetcher=fetcher) as crawler:
+            self.assertIs(fetcher, crawler.fetcher)
+        fetcher.close.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
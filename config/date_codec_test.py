@@ -0,0 +1,47 @@
+import datetime
+import random
+import unittest
+
+import numpy as np
+
+from dates import DateFormatError, META_DATE_FORMAT, PAGE_DATE_FORMAT, format_meta_date, parse_meta_date, \
+    parse_page_date, to_datetime64
+
+
+def _random_dates(number):
+    rng = random.Random(number)
+    start = datetime.datetime(1990, 1, 1)
+    return [start + datetime.timedelta(seconds=rng.randrange(40 * 365 * 24 * 3600)) for _ in range(number)]
+
+
+class DateCodecTest(unittest.TestCase):
+    def test_same_as_strptime_and_strftime(self):
+        for date in _random_dates(1000):
+            meta_txt = date.strftime(META_DATE_FORMAT)
+            page_txt = date.strftime(PAGE_DATE_FORMAT)
+            self.assertEqual(meta_txt, format_meta_date(date))
+            self.assertEqual(datetime.datetime.strptime(meta_txt, META_DATE_FORMAT), parse_meta_date(meta_txt, True))
+            self.assertEqual(datetime.datetime.strptime(page_txt, PAGE_DATE_FORMAT), parse_page_date(page_txt, True))
+
+    def test_strict_mode(self):
+        for date_txt in ('2021-03-01T00:00:00', '2021-03-01', '2021-02-30 00:00:00', None):
+            with self.assertRaises(DateFormatError):
+                parse_meta_date(date_txt, strict=True)
+        for date_txt in ('1.3.2021', '30.02.2021', '01/03/2021'):
+            with self.assertRaises(DateFormatError):
+                parse_page_date(date_txt, strict=True)
+        self.assertEqual(datetime.datetime(2021, 3, 1), parse_meta_date('2021-03-01T00:00:00'))
+        self.assertEqual(datetime.datetime(2021, 3, 1), parse_page_date('1.3.2021'))
+        with self.assertRaises(ValueError):
+            parse_page_date('30.02.2021')
+
+    def test_bulk_conversion(self):
+        dates = to_datetime64(['2021-03-01 12:30:00', None, '1999-12-31 23:59:59'])
+        self.assertEqual(np.dtype('datetime64[s]'), dates.dtype)
+        self.assertEqual(np.datetime64('2021-03-01T12:30:00'), dates[0])
+        self.assertTrue(np.isnat(dates[1]))
+        self.assertEqual(np.datetime64('2021-03-01'), to_datetime64(['01.03.2021'], PAGE_DATE_FORMAT)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import shutil
+import unittest
+
+from benchmarks.corpus_generator import use_assets_path
+from benchmarks.news_site import NewsSite
+from http_cache import CacheMissError, CachedResponse, HTTPCache, HTTPCacheError, cached_get
+from scrapper import ArticleParser, Crawler, HTTPFetcher
+from config.test_params import TEST_PATH
+
+CACHE_PATH = os.path.join(TEST_PATH, 'http_cache.sqlite')
+ASSETS_PATH = os.path.join(TEST_PATH, 'articles')
+
+
+class CountingSender:
+    def __init__(self, content=b'<html>page</html>', headers=None):
+        self.calls = 0
+        self.content = content
+        self.headers = headers or {'Content-Type': 'text/html; charset=utf-8'}
+
+    def __call__(self):
+        self.calls += 1
+        return CachedResponse('', 200, self.headers, self.content)
+
+
+class HTTPCacheTest(unittest.TestCase):
+    def setUp(self):
+        os.makedirs(TEST_PATH, exist_ok=True)
+
+    def tearDown(self):
+        shutil.rmtree(TEST_PATH)
+
+    def test_recorded_response_is_reused(self):
+        cache = HTTPCache(CACHE_PATH, mode='record')
+        send = CountingSender('<html>Мама</html>'.encode('utf-8'))
+        for _ in range(3):
+            response = cache.fetch('http://site/news-1-1.htm', send)
+        self.assertEqual(1, send.calls)
+        self.assertTrue(response)
+        self.assertEqual('<html>Мама</html>', response.text)
+        self.assertEqual('text/html; charset=utf-8', response.headers['content-type'])
+        cache.close()
+
+    def test_expired_response_is_downloaded_again(self):
+        cache = HTTPCache(CACHE_PATH, mode='record', ttl=0)
+        send = CountingSender()
+        cache.fetch('http://site/news-1-1.htm', send)
+        cache.fetch('http://site/news-1-1.htm', send)
+        self.assertEqual(2, send.calls)
+        self.assertEqual(1, cache.purge_expired())
+        cache.close()
+
+    def test_least_recently_used_responses_are_evicted(self):
+        cache = HTTPCache(CACHE_PATH, mode='record', max_size=25)
+        send = CountingSender(b'0123456789')
+        for url in ('http://site/1', 'http://site/2'):
+            cache.fetch(url, send)
+        cache.lookup('http://site/1')
+        cache.fetch('http://site/3', send)
+        self.assertIsNotNone(cache.lookup('http://site/1'))
+        self.assertIsNone(cache.lookup('http://site/2'))
+        self.assertEqual({'responses': 2, 'size': 20}, cache.stats())
+        cache.close()
+
+    def test_replay_serves_only_recorded_responses(self):
+        recorder = HTTPCache(CACHE_PATH, mode='record')
+        recorder.fetch('http://site/1', CountingSender(headers={'ETag': '"v1"'}))
+        recorder.close()
+
+        replayer = HTTPCache(CACHE_PATH, mode='replay', ttl=0)
+        send = CountingSender()
+        self.assertEqual(200, replayer.fetch('http://site/1', send).status_code)
+        self.assertEqual(304, replayer.fetch('http://site/1', send, {'If-None-Match': '"v1"'}).status_code)
+        self.assertEqual(200, replayer.fetch('http://site/1', send, {'If-None-Match': '"v0"'}).status_code)
+        with self.assertRaises(CacheMissError):
+            replayer.fetch('http://site/2', send)
+        self.assertEqual(0, send.calls)
+        replayer.close()
+
+    def test_unknown_mode(self):
+        with self.assertRaises(HTTPCacheError):
+            HTTPCache(CACHE_PATH, mode='offline')
+
+    def test_scraping_and_validation_are_replayed_offline(self):
+        with NewsSite(number_of_articles=6, articles_per_page=3) as site:
+            seed_urls = site.get_seed_urls()
+            recorder = HTTPCache(CACHE_PATH, mode='record')
+            self._scrape(seed_urls, recorder)
+            recorder.close()
+
+        cache = HTTPCache(CACHE_PATH, mode='replay')
+        articles = self._scrape(seed_urls, cache)
+        self.assertEqual(6, len(articles))
+        for article in articles:
+            self.assertIn(article.title, cached_get(article.url, cache).text)
+        cache.close()
+
+    def _scrape(self, seed_urls, cache):
+        fetcher = HTTPFetcher(max_workers=2, cache=cache)
+        crawler = Crawler(seed_urls, max_articles=6, fetcher=fetcher)
+        crawler.find_articles()
+        articles = []
+        with use_assets_path(ASSETS_PATH):
+            for article_id, url in enumerate(crawler.get_search_urls(), 1):
+                parser = ArticleParser(url, article_id, fetcher)
+                parser.parse()
+                articles.append(parser.article)
+        fetcher.close()
+        return articles
+
+
+if __name__ == "__main__":
+    unittest.main()
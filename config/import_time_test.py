@@ -0,0 +1,18 @@
+import unittest
+
+from benchmarks.import_time_benchmark import IMPORT_TIME_BUDGETS, check_budgets, get_imported_heavy_modules
+
+
+class ImportTimeTest(unittest.TestCase):
+    def test_heavy_dependencies_are_not_imported(self):
+        for module in IMPORT_TIME_BUDGETS:
+            self.assertEqual([], get_imported_heavy_modules(module),
+                             msg=f"Importing {module} should not load NLP, HTTP or plotting libraries")
+
+    def test_import_time_is_within_budget(self):
+        self.assertEqual({}, check_budgets(repeats=3),
+                         msg="Modules are imported slower than IMPORT_TIME_BUDGETS allow")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import shutil
+import threading
+import unittest
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from scrapper import ArticlesIndex, HTTPFetcher, scrape_articles
+from constants import ASSETS_PATH
+from config.test_params import TEST_PATH
+
+ARTICLE = '''<html><body>
+<span class="title_text"><a href="/">Главная</a><a href="/politics">Политика</a></span>
+<span class="title_data">Опубликовано 01.03.2021</span>
+<dd class="title"> Статья {path} </dd>
+<dd class="text">Текст статьи {path} о событиях в Мордовии, версия {version}.</dd>
+</body></html>'''
+
+
+class ArticleHandler(BaseHTTPRequestHandler):
+    requests = Counter()
+    downloads = Counter()
+    versions = Counter()
+
+    def do_GET(self):
+        ArticleHandler.requests[self.path] += 1
+        etag = f'"{self.path}-{ArticleHandler.versions[self.path]}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        ArticleHandler.downloads[self.path] += 1
+        body = ARTICLE.format(path=self.path, version=ArticleHandler.versions[self.path]).encode('utf-8')
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class IncrementalScrapingTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), ArticleHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f'http://127.0.0.1:{cls.server.server_port}'
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        os.makedirs(ASSETS_PATH, exist_ok=True)
+        os.makedirs(TEST_PATH, exist_ok=True)
+        self.index_path = os.path.join(TEST_PATH, 'articles_index.json')
+        self.fetcher = HTTPFetcher(max_workers=2)
+        self.created_ids = set()
+
+    def tearDown(self) -> None:
+        self.fetcher.close()
+        for article_id in self.created_ids:
+            for suffix in ('_raw.txt', '_meta.json'):
+                os.remove(os.path.join(ASSETS_PATH, f'{article_id}{suffix}'))
+        shutil.rmtree(TEST_PATH, ignore_errors=True)
+
+    def scrape(self, paths):
+        index = ArticlesIndex(self.index_path, ASSETS_PATH)
+        saved = scrape_articles([self.base + path for path in paths], self.fetcher, index)
+        ids = {path: index.get_id(self.base + path) for path in paths}
+        self.created_ids.update(ids.values())
+        return saved, ids
+
+    def test_only_delta_is_downloaded(self):
+        saved, first_ids = self.scrape(['/news-1-1.htm', '/news-2-1.htm'])
+        self.assertEqual(2, saved)
+        self.assertEqual(first_ids['/news-1-1.htm'] + 1, first_ids['/news-2-1.htm'])
+        ArticleHandler.versions['/news-2-1.htm'] += 1
+        ArticleHandler.downloads.clear()
+
+        saved, ids = self.scrape(['/news-1-1.htm', '/news-2-1.htm', '/news-3-1.htm'])
+        self.assertEqual(2, saved)
+        self.assertEqual({'/news-2-1.htm': 1, '/news-3-1.htm': 1}, ArticleHandler.downloads)
+        self.assertEqual(first_ids['/news-2-1.htm'] + 1, ids['/news-3-1.htm'],
+                         msg="New article should get the next id")
+
+        with open(os.path.join(ASSETS_PATH, f'{ids["/news-2-1.htm"]}_raw.txt'), encoding='utf-8') as f:
+            self.assertIn('версия 1', f.read(), msg="Changed article should keep its id")
+
+    def test_index_is_rebuilt_from_meta(self):
+        self.scrape(['/news-4-1.htm', '/news-5-1.htm'])
+        os.remove(self.index_path)
+        ArticleHandler.requests.clear()
+
+        saved, _ = self.scrape(['/news-5-1.htm', '/news-6-1.htm'])
+        self.assertEqual(1, saved)
+        self.assertEqual({'/news-6-1.htm': 1}, ArticleHandler.requests,
+                         msg="Articles saved before should be skipped without requests")
+
+    def test_files_unknown_to_index_are_not_overwritten(self):
+        self.scrape(['/news-7-1.htm'])
+        unknown_id = max(self.created_ids) + 10
+        self.created_ids.add(unknown_id)
+        for suffix in ('_raw.txt', '_meta.json'):
+            with open(os.path.join(ASSETS_PATH, f'{unknown_id}{suffix}'), 'w', encoding='utf-8') as f:
+                f.write('{}' if suffix == '_meta.json' else 'Статья, скачанная без индекса')
+
+        _, ids = self.scrape(['/news-8-1.htm'])
+        self.assertEqual(unknown_id + 1, ids['/news-8-1.htm'],
+                         msg="New article should get an id after files of the assets folder")
+        with open(os.path.join(ASSETS_PATH, f'{unknown_id}_raw.txt'), encoding='utf-8') as f:
+            self.assertEqual('Статья, скачанная без индекса', f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
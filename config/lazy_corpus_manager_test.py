@@ -0,0 +1,37 @@
+import os
+import shutil
+import unittest
+from pipeline import CorpusManager
+from config.test_params import TEST_PATH
+
+
+class LazyCorpusManagerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        os.makedirs(TEST_PATH, exist_ok=True)
+        for article_id in (10, 2, 7, 1, 3):
+            with open(os.path.join(TEST_PATH, f'{article_id}_raw.txt'), 'w', encoding='utf-8') as f:
+                f.write('текст')
+            with open(os.path.join(TEST_PATH, f'{article_id}_meta.json'), 'w', encoding='utf-8') as f:
+                f.write('{}')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(TEST_PATH, ignore_errors=True)
+
+    def test_articles_are_yielded_in_id_order(self):
+        for lazy in (False, True):
+            corpus_manager = CorpusManager(path_to_raw_txt_data=TEST_PATH, lazy=lazy)
+            self.assertEqual([1, 2, 3, 7, 10], [article.article_id for article in corpus_manager.iter_articles()])
+            self.assertEqual([1, 2, 3, 7, 10], sorted(corpus_manager.get_articles()))
+
+    def test_id_range_and_shards(self):
+        corpus_manager = CorpusManager(path_to_raw_txt_data=TEST_PATH, lazy=True, id_range=(2, 7))
+        self.assertEqual([2, 3, 7], list(corpus_manager.get_article_ids()))
+
+        shards = [list(CorpusManager(path_to_raw_txt_data=TEST_PATH, lazy=True, shard=(k, 3)).get_article_ids())
+                  for k in range(3)]
+        self.assertEqual([[3], [1, 7, 10], [2]], shards)
+        self.assertFalse(CorpusManager(path_to_raw_txt_data=TEST_PATH, shard=(0, 3)).is_selected(7))
+
+
+if __name__ == "__main__":
+    unittest.main()
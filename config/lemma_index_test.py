@@ -0,0 +1,80 @@
+import os
+import shutil
+import unittest
+
+from lemma_index import LemmaIndex, LemmaIndexObserver, iter_processed_tokens
+from pipeline import TextProcessingPipeline
+from config.test_articles import get_test_corpus_manager, remove_test_articles, save_test_articles
+from config.test_params import TEST_PATH
+PROCESSED_TEXT = ('красивый<A=им,ед,полн,жен>(ADJF,Qual femn,sing,nomn) мама<S,жен,од=им,ед>(NOUN,anim,femn sing,nomn) '
+                  'второй<ANUM=(пр,ед,жен|дат,ед,жен)>(ADJF,Anum femn,sing,loct)')
+RAW_TEXTS = {
+    -1702: 'Мама мыла раму.',
+    -1701: 'Красивая мама красиво мыла раму во второй реке.',
+}
+
+
+class LemmaIndexTest(unittest.TestCase):
+    def setUp(self):
+        os.makedirs(TEST_PATH, exist_ok=True)
+        self.index = LemmaIndex(os.path.join(TEST_PATH, 'lemma_index.sqlite'))
+        self.index.update(1, [('мама', 'S'), ('мыть', 'V'), ('рама', 'S')])
+        self.index.update(2, [('рама', 'S'), ('мама', 'S'), ('мыть', 'V'), ('мама', 'S')])
+        self.index.update(3, [('стать', 'V'), ('сталь', 'S'), ('мыть', 'A')])
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(TEST_PATH, ignore_errors=True)
+
+    def test_processed_tokens_are_parsed(self):
+        self.assertEqual([('красивый', 'A'), ('мама', 'S'), ('второй', 'ANUM')],
+                         list(iter_processed_tokens(PROCESSED_TEXT)))
+
+    def test_lemma_and_pos_are_found(self):
+        self.assertEqual([1, 2, 3], self.index.find('мыть'))
+        self.assertEqual([1, 2], self.index.find('мыть', 'V'))
+        self.assertEqual([1, 2], self.index.find_all(['мама', ('мыть', 'V')]))
+        self.assertEqual([], self.index.find_all(['мама', 'сталь']))
+        self.assertEqual([1, 3], self.index.get_positions(2, 'мама'))
+
+    def test_phrase_is_found(self):
+        self.assertEqual([1, 2], self.index.find_phrase(['мама', 'мыть']))
+        self.assertEqual([1], self.index.find_phrase(['мыть', 'рама']))
+        self.assertEqual([], self.index.find_phrase(['рама', 'мыть']))
+
+    def test_update_replaces_postings(self):
+        self.index.update(2, [('сталь', 'S')])
+        self.assertEqual([1], self.index.find('мама'))
+        self.assertEqual([2, 3], self.index.find('сталь'))
+        self.index.remove(3)
+        self.assertEqual([2], self.index.find('сталь'))
+
+    def test_observer_removes_deleted_article(self):
+        LemmaIndexObserver(self.index).remove_article(2)
+        self.assertEqual([1], self.index.find('мама'))
+
+
+class LemmaIndexObserverTest(unittest.TestCase):
+    def setUp(self):
+        self.articles = save_test_articles(RAW_TEXTS)
+        self.corpus_manager = get_test_corpus_manager(self.articles)
+
+    def tearDown(self):
+        remove_test_articles(self.articles)
+        shutil.rmtree(TEST_PATH, ignore_errors=True)
+
+    def test_index_is_updated_by_pipeline(self):
+        with LemmaIndex(os.path.join(TEST_PATH, 'observed.sqlite')) as observed:
+            with TextProcessingPipeline(self.corpus_manager) as pipe:
+                pipe.add_observer(LemmaIndexObserver(observed))
+                pipe.run()
+            with LemmaIndex(os.path.join(TEST_PATH, 'rebuilt.sqlite')) as rebuilt:
+                self.assertEqual(2, rebuilt.rebuild(self.corpus_manager))
+                for lemma in ('мама', 'рама', 'река'):
+                    self.assertEqual(rebuilt.find(lemma), observed.find(lemma))
+            self.assertEqual([-1702, -1701], observed.find('мама'))
+            self.assertEqual([-1701], observed.find('река'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import datetime
+import os
+import shutil
+import sqlite3
+import unittest
+from contextlib import closing
+from unittest import mock
+
+import article as article_module
+from article import Article
+from metadata_index import (MetadataIndex, UnknownFilterError, close_metadata_index, get_index_path,
+                            open_metadata_index, remove_metadata_index)
+from pipeline import CorpusManager
+from storage import close_storage
+from config.test_params import TEST_PATH
+
+ARTICLES = (
+    (1, datetime.datetime(2021, 2, 28, 23, 59, 59), 'Иванов', ['Спорт']),
+    (2, datetime.datetime(2021, 3, 1), 'Петров', ['Спорт', 'Футбол']),
+    (3, datetime.datetime(2021, 3, 31, 12, 0), 'Иванов', ['Политика']),
+    (4, datetime.datetime(2021, 4, 1), 'Иванов', ['Спорт']),
+)
+
+
+class MetadataIndexTest(unittest.TestCase):
+    def setUp(self):
+        os.makedirs(TEST_PATH, exist_ok=True)
+        self.patch = mock.patch.object(article_module, 'ASSETS_PATH', TEST_PATH)
+        self.patch.start()
+        for article_id, date, author, topics in ARTICLES:
+            article = Article(url=f'https://example.com/{article_id}', article_id=article_id)
+            article.date = date
+            article.author = author
+            article.topics = topics
+            article.text = 'мама мыла раму'
+            article.save_raw()
+
+    def tearDown(self):
+        self.patch.stop()
+        remove_metadata_index(TEST_PATH)
+        close_storage(TEST_PATH)
+        shutil.rmtree(TEST_PATH)
+
+    def test_saved_articles_are_indexed(self):
+        index = open_metadata_index(TEST_PATH)
+        self.assertEqual([2, 3], index.query(date_from=datetime.datetime(2021, 3, 1),
+                                             date_to=datetime.datetime(2021, 4, 1)))
+        self.assertEqual([1, 2, 4], index.query(topic='Спорт'))
+        self.assertEqual([4], index.query(date_from='2021-04-01', topic='Спорт', author='Иванов'))
+        self.assertEqual([3], index.query(url='https://example.com/3'))
+
+    def test_corpus_manager_filters(self):
+        corpus_manager = CorpusManager(path_to_raw_txt_data=TEST_PATH, lazy=True,
+                                       filters={'date_from': '2021-03-01', 'date_to': '2021-04-01',
+                                                'topic': 'Спорт'})
+        self.assertEqual([2], list(corpus_manager.get_article_ids()))
+        self.assertFalse(corpus_manager.is_selected(4),
+                         msg="Articles not matching filters should not be treated as deleted")
+        with self.assertRaises(UnknownFilterError):
+            CorpusManager(path_to_raw_txt_data=TEST_PATH, filters={'title': 'x'})
+
+    def test_missing_index_is_rebuilt(self):
+        remove_metadata_index(TEST_PATH)
+        self.assertEqual([1, 3, 4], open_metadata_index(TEST_PATH).query(author='Иванов'))
+
+    def test_removed_articles_are_forgotten(self):
+        Article(url=None, article_id=1).remove_meta()
+        self.assertEqual([3, 4], open_metadata_index(TEST_PATH).query(author='Иванов'))
+
+        close_metadata_index(TEST_PATH)
+        os.remove(os.path.join(TEST_PATH, '3_meta.json'))
+        self.assertEqual([4], open_metadata_index(TEST_PATH).query(author='Иванов'),
+                         msg="Articles which meta files were removed meanwhile should be dropped on open")
+        self.assertEqual([2], open_metadata_index(TEST_PATH).query(topic='Футбол'))
+
+    def test_string_topic_is_indexed_whole(self):
+        article = Article(url='https://example.com/5', article_id=5)
+        article.date = datetime.datetime(2021, 5, 1)
+        article.topics = 'Спорт'
+        article.text = 'мама мыла раму'
+        article.save_raw()
+        index = open_metadata_index(TEST_PATH)
+        self.assertEqual([1, 2, 4, 5], index.query(topic='Спорт'))
+        self.assertEqual([], index.query(topic='С'), msg="String topic should not be split into characters")
+
+    def test_index_is_not_kept_in_assets(self):
+        open_metadata_index(TEST_PATH)
+        article_files = ('1_', '2_', '3_', '4_', '5_')
+        self.assertEqual([], [name for name in os.listdir(TEST_PATH) if not name.startswith(article_files)],
+                         msg="Index should not make an empty assets folder look non-empty")
+
+    def test_changes_are_committed_in_batches(self):
+        path = os.path.join(TEST_PATH, 'batch.sqlite')
+        index = MetadataIndex(path, commit_interval=2)
+
+        def count_committed():
+            with closing(sqlite3.connect(path)) as connection:
+                return connection.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+
+        index.update({'id': 1})
+        self.assertEqual(0, count_committed(), msg="Single update should not be committed")
+        index.update({'id': 2})
+        self.assertEqual(2, count_committed())
+        index.remove(1)
+        self.assertEqual([2], index.query(), msg="Uncommitted changes should be seen by the same index")
+        index.close()
+        self.assertEqual(1, count_committed(), msg="Changes should be committed on close")
+
+    def test_indexes_of_removed_folders_are_deleted(self):
+        old_path, new_path = os.path.join(TEST_PATH, 'old'), os.path.join(TEST_PATH, 'new')
+        os.makedirs(old_path)
+        open_metadata_index(old_path)
+        close_metadata_index(old_path)
+        shutil.rmtree(old_path)
+
+        os.makedirs(new_path)
+        open_metadata_index(new_path)
+        self.assertFalse(os.path.exists(get_index_path(old_path)),
+                         msg="Index of a removed folder should be deleted when an index of a new folder is created")
+        self.assertTrue(os.path.exists(get_index_path(TEST_PATH)))
+        remove_metadata_index(new_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
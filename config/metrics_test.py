@@ -0,0 +1,100 @@
+import json
+import os
+import shutil
+import unittest
+
+from metrics import METRICS, Histogram, Metrics
+from pipeline import TextProcessingPipeline
+from config.test_articles import get_test_corpus_manager, remove_test_articles, save_test_articles
+from config.test_params import TEST_PATH
+RAW_TEXTS = {
+    -1602: 'Мама мыла раму.',
+    -1601: 'Красивая мама красиво мыла раму во второй реке.',
+}
+
+
+class MetricsTest(unittest.TestCase):
+    def tearDown(self):
+        shutil.rmtree(TEST_PATH, ignore_errors=True)
+
+    def test_disabled_metrics_record_nothing(self):
+        metrics = Metrics(enabled=False)
+        with metrics.timer('stage'):
+            metrics.increment('tokens', 10)
+        self.assertEqual({}, metrics.counters)
+        self.assertEqual({}, metrics.histograms)
+        self.assertIsNone(metrics.collect())
+        metrics.save('run', TEST_PATH)
+        self.assertFalse(os.path.exists(TEST_PATH))
+
+    def test_histogram_counts_cumulative_buckets(self):
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+        self.assertEqual([1, 2], histogram.counts)
+        self.assertEqual(3, histogram.count)
+        self.assertAlmostEqual(5.55, histogram.sum)
+
+    def test_collected_metrics_are_merged(self):
+        worker = Metrics(enabled=True)
+        worker.increment('tokens', 3)
+        worker.observe('mystem_analyze', 0.2)
+        main = Metrics(enabled=True)
+        main.increment('tokens', 2)
+        main.merge(worker.collect())
+        self.assertEqual({'tokens': 5}, main.counters)
+        self.assertEqual(1, main.histograms['mystem_analyze'].count)
+        self.assertEqual({}, worker.counters)
+
+    def test_reports_are_saved(self):
+        metrics = Metrics(enabled=True)
+        metrics.increment('tokens', 7)
+        with metrics.timer('save_raw'):
+            pass
+        metrics.save('run', TEST_PATH)
+        with open(os.path.join(TEST_PATH, 'run.json'), encoding='utf-8') as file:
+            report = json.load(file)
+        self.assertEqual({'tokens': 7}, report['counters'])
+        self.assertIn('tokens_per_second', report['rates'])
+        self.assertEqual(1, report['stages']['save_raw']['count'])
+        with open(os.path.join(TEST_PATH, 'run.prom'), encoding='utf-8') as file:
+            lines = file.read().splitlines()
+        self.assertIn('corpus_tokens_total 7', lines)
+        self.assertIn('corpus_stage_duration_seconds_bucket{stage="save_raw",le="+Inf"} 1', lines)
+        self.assertIn('corpus_stage_duration_seconds_count{stage="save_raw"} 1', lines)
+
+
+class PipelineMetricsTest(unittest.TestCase):
+    def setUp(self):
+        METRICS.enable()
+        METRICS.reset()
+        self.articles = save_test_articles(RAW_TEXTS)
+        self.corpus_manager = get_test_corpus_manager(self.articles)
+
+    def tearDown(self):
+        METRICS.enable(False)
+        METRICS.reset()
+        remove_test_articles(self.articles)
+
+    def _run(self, workers):
+        METRICS.reset()
+        with TextProcessingPipeline(self.corpus_manager, workers=workers) as pipe:
+            self.assertEqual(2, pipe.run())
+        return dict(METRICS.counters)
+
+    def test_pipeline_stages_are_measured(self):
+        self.assertEqual(2, METRICS.counters['articles_saved'])
+        self.assertEqual(2, METRICS.histograms['save_raw'].count)
+        counters = self._run(workers=1)
+        self.assertEqual(2, counters['articles_processed'])
+        self.assertGreater(counters['tokens'], 0)
+        self.assertGreater(METRICS.histograms['mystem_analyze'].count, 0)
+        self.assertEqual(2, METRICS.histograms['save_processed'].count)
+
+    def test_metrics_of_workers_are_merged(self):
+        self.assertEqual(self._run(workers=1), self._run(workers=2))
+        self.assertEqual(2, METRICS.histograms['save_processed'].count)
+
+
+if __name__ == "__main__":
+    unittest.main()
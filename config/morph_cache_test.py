@@ -0,0 +1,105 @@
+import json
+import os
+import shutil
+import unittest
+from unittest import mock
+from pymorphy2 import MorphAnalyzer
+from pipeline import MorphTagCache, get_analyzer_versions
+from config.test_params import TEST_PATH
+
+
+class MorphTagCacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.morph = MorphAnalyzer()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(TEST_PATH, ignore_errors=True)
+
+    def test_tags_are_the_same_as_morph(self):
+        cache = MorphTagCache(max_size=10)
+        for word in ('мама', 'мыла', 'раму', 'мама', 'мыла'):
+            self.assertEqual(str(self.morph.parse(word)[0].tag), cache.get_tag(word, self.morph))
+        self.assertEqual((2, 3), (cache.hits, cache.misses))
+
+    def test_least_recently_used_is_evicted(self):
+        cache = MorphTagCache(max_size=2)
+        for word in ('мама', 'мыла', 'мама', 'раму', 'мама', 'мыла'):
+            cache.get_tag(word, self.morph)
+        self.assertEqual({'hits': 2, 'misses': 4, 'size': 2, 'hit_rate': 2 / 6}, cache.stats())
+
+    def test_cache_is_persisted(self):
+        path = os.path.join(TEST_PATH, 'morph_cache.json')
+        cache = MorphTagCache(max_size=10, path=path)
+        cache.get_tag('раму', self.morph)
+        cache.save()
+
+        warm_cache = MorphTagCache(max_size=10, path=path)
+        warm_cache.get_tag('раму', self.morph)
+        self.assertEqual((1, 0), (warm_cache.hits, warm_cache.misses),
+                         msg="Word forms saved by the previous run should be loaded")
+
+    def test_cache_of_other_analyzers_is_discarded(self):
+        path = os.path.join(TEST_PATH, 'morph_cache.json')
+        cache = MorphTagCache(max_size=10, path=path)
+        cache.get_tag('раму', self.morph)
+        cache.save()
+
+        with mock.patch('pipeline.get_analyzer_versions', return_value={'pymorphy2': 'upgraded'}):
+            upgraded_cache = MorphTagCache(max_size=10, path=path)
+        self.assertEqual(0, upgraded_cache.stats()['size'],
+                         msg="Tags cached by other analyzer versions should not be loaded")
+
+    def test_broken_cache_is_ignored(self):
+        path = os.path.join(TEST_PATH, 'morph_cache.json')
+        os.makedirs(TEST_PATH, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write('[["мама", "NOUN')
+        self.assertEqual(0, MorphTagCache(max_size=10, path=path).stats()['size'])
+
+        cache = MorphTagCache(max_size=10, path=path)
+        cache.get_tag('мама', self.morph)
+        cache.save()
+        with open(path, encoding='utf-8') as file:
+            self.assertEqual([['мама', str(self.morph.parse('мама')[0].tag)]], json.load(file)['tags'])
+        self.assertEqual(['morph_cache.json'], os.listdir(TEST_PATH))
+
+    def test_malformed_cache_is_ignored(self):
+        path = os.path.join(TEST_PATH, 'morph_cache.json')
+        os.makedirs(TEST_PATH, exist_ok=True)
+        versions = get_analyzer_versions()
+        for saved in ({}, {'versions': versions}, {'versions': versions, 'tags': {'мама': 'NOUN'}},
+                      {'versions': versions, 'tags': [['мама']]}, {'versions': versions, 'tags': [[['мама'], 'NOUN']]},
+                      {'versions': versions, 'tags': [['мама', 'NOUN'], 'мыла']}):
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump(saved, file)
+            self.assertEqual(0, MorphTagCache(max_size=10, path=path).stats()['size'],
+                             msg=f"Malformed cache {saved} should be treated as empty")
+
+    def test_cache_without_parsed_words_is_not_saved(self):
+        path = os.path.join(TEST_PATH, 'morph_cache.json')
+        cache = MorphTagCache(max_size=10, path=path)
+        cache.save()
+        self.assertFalse(os.path.exists(path),
+                         msg="A cache that parsed nothing should not overwrite tags saved by workers")
+
+    def test_parsed_tags_are_added_to_other_cache(self):
+        path = os.path.join(TEST_PATH, 'morph_cache.json')
+        worker_cache = MorphTagCache(max_size=10, keep_parsed=True)
+        for word in ('мама', 'мыла', 'мама'):
+            worker_cache.get_tag(word, self.morph)
+        parsed = worker_cache.pop_parsed()
+        self.assertEqual(['мама', 'мыла'], [word for word, _ in parsed])
+        self.assertEqual([], worker_cache.pop_parsed())
+
+        cache = MorphTagCache(max_size=10, path=path)
+        cache.add_parsed(parsed)
+        cache.save()
+        warm_cache = MorphTagCache(max_size=10, path=path)
+        warm_cache.get_tag('мыла', self.morph)
+        self.assertEqual((1, 0), (warm_cache.hits, warm_cache.misses),
+                         msg="Tags parsed by another process should be saved with the cache")
+
+
+if __name__ == "__main__":
+    unittest.main()
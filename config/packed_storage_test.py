@@ -0,0 +1,119 @@
+import datetime
+import os
+import shutil
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+import article as article_module
+from article import Article
+from metadata_index import remove_metadata_index
+from pipeline import CorpusManager
+from storage import PackedStorage, Storage, close_storage, export_directory, import_directory, is_packed
+from config.test_params import TEST_PATH
+
+PACKED_PATH = os.path.join(TEST_PATH, 'packed')
+DIRECTORY_PATH = os.path.join(TEST_PATH, 'articles')
+
+
+def _write_in_process(number):
+    storage = PackedStorage(PACKED_PATH, segment_size=64)
+    for index in range(20):
+        storage.write_bytes(f'{number}_{index}', f'{number} {index} '.encode('utf-8') * 5)
+
+
+class PackedStorageTest(unittest.TestCase):
+    def setUp(self):
+        os.makedirs(TEST_PATH, exist_ok=True)
+
+    def tearDown(self):
+        close_storage(PACKED_PATH)
+        remove_metadata_index(PACKED_PATH)
+        shutil.rmtree(TEST_PATH)
+
+    def test_files_are_kept_in_segments(self):
+        storage = PackedStorage(PACKED_PATH, segment_size=16)
+        storage.write_text('1_raw.txt', 'мама мыла раму')
+        storage.write_text('2_raw.txt', 'красивая мама')
+        storage.write_text('1_raw.txt', 'мама мыла раму\nво второй реке')
+        storage.remove('2_raw.txt')
+        storage.close()
+
+        storage = PackedStorage(PACKED_PATH, segment_size=16)
+        self.assertEqual(['1_raw.txt'], storage.list_names())
+        self.assertEqual('мама мыла раму\nво второй реке', storage.read_text('1_raw.txt'))
+        self.assertFalse(storage.exists('2_raw.txt'))
+        self.assertTrue(len([name for name in os.listdir(PACKED_PATH) if name.startswith('segment')]) > 1,
+                        msg="Segment should not grow over segment_size")
+        with self.assertRaises(FileNotFoundError):
+            storage.read_text('2_raw.txt')
+        storage.close()
+
+    def test_storage_without_file_operations_is_not_created(self):
+        class ReadOnlyStorage(Storage):  # pylint: disable=abstract-method
+            def read_bytes(self, name):
+                return b''
+
+        with self.assertRaises(TypeError):
+            ReadOnlyStorage()
+
+    def test_failed_writer_keeps_previous_text(self):
+        storage = PackedStorage(PACKED_PATH)
+        storage.write_text('1_processed.txt', 'previous')
+        with self.assertRaises(RuntimeError):
+            with storage.open_writer('1_processed.txt') as file:
+                file.write('partial')
+                raise RuntimeError
+        self.assertEqual('previous', storage.read_text('1_processed.txt'))
+        storage.close()
+
+    def test_writer_appends_to_segment(self):
+        storage = PackedStorage(PACKED_PATH)
+        segment_path = os.path.join(PACKED_PATH, 'segment_00000.bin')
+        with storage.open_writer('1_processed.txt') as file:
+            for _ in range(1000):
+                file.write('мама<S>(NOUN) ' * 100)
+            self.assertGreater(os.path.getsize(segment_path), 1000 * 1000,
+                               msg="Written text should be appended to the segment instead of kept in memory")
+            self.assertFalse(storage.exists('1_processed.txt'))
+        self.assertEqual('мама<S>(NOUN) ' * 100 * 1000, storage.read_text('1_processed.txt'))
+        storage.close()
+
+    def test_writes_of_several_processes(self):
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            list(executor.map(_write_in_process, range(4)))
+        storage = PackedStorage(PACKED_PATH)
+        self.assertEqual(80, len(storage.list_names()))
+        for number in range(4):
+            for index in range(20):
+                self.assertEqual(f'{number} {index} ' * 5, storage.read_text(f'{number}_{index}'))
+        storage.close()
+
+    def test_articles_work_with_packed_storage(self):
+        with mock.patch.object(article_module, 'ASSETS_PATH', PACKED_PATH):
+            PackedStorage(PACKED_PATH).close()
+            article = Article(url='https://example.com/1', article_id=1)
+            article.date = datetime.datetime(2021, 1, 1)
+            article.text = 'Мама мыла раму.\nКрасивая мама'
+            article.save_raw()
+            article.save_processed('мама<S>(NOUN)')
+
+            self.assertEqual(article.text, article.get_raw_text())
+            self.assertEqual(article.text.splitlines(keepends=True), list(article.iter_raw_lines()))
+            self.assertTrue(article.has_processed())
+            self.assertEqual('https://example.com/1',
+                             Article.from_meta_json(os.path.join(PACKED_PATH, '1_meta.json')).url)
+            self.assertEqual([1], list(CorpusManager(path_to_raw_txt_data=PACKED_PATH, lazy=True).get_article_ids()))
+
+        self.assertEqual(3, export_directory(PACKED_PATH, DIRECTORY_PATH))
+        self.assertFalse(is_packed(DIRECTORY_PATH))
+        with open(os.path.join(DIRECTORY_PATH, '1_raw.txt'), encoding='utf-8') as file:
+            self.assertEqual(article.text, file.read())
+
+        shutil.rmtree(PACKED_PATH)
+        self.assertEqual(3, import_directory(DIRECTORY_PATH, PACKED_PATH))
+        self.assertEqual(sorted(os.listdir(DIRECTORY_PATH)), sorted(PackedStorage(PACKED_PATH).list_names()))
+
+
+if __name__ == "__main__":
+    unittest.main()
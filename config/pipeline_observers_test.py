@@ -0,0 +1,90 @@
+import unittest
+
+from pipeline import POS_INDEX, LemmaFrequencyObserver, MorphologicalToken, PipelineObserver, POSFrequencyObserver, \
+    TextProcessingPipeline, TokenRecorder
+from pos_frequency_pipeline import POSFrequencyPipeline
+from config.test_articles import get_test_corpus_manager, remove_test_articles, save_test_articles
+
+RAW_TEXTS = {
+    -1502: 'Мама мыла раму.',
+    -1501: 'Красивая мама красиво мыла раму во второй реке.',
+}
+
+
+class TextObserver(PipelineObserver):
+    def __init__(self):
+        self.texts = {}
+        self._tokens = []
+
+    def start_article(self, article):
+        self._tokens = []
+
+    def consume(self, token):
+        self._tokens.append(str(token))
+
+    def finish_article(self, article):
+        self.texts[article.article_id] = ' '.join(self._tokens)
+
+
+class PipelineObserversTest(unittest.TestCase):
+    def setUp(self):
+        self.articles = save_test_articles(RAW_TEXTS)
+        self.corpus_manager = get_test_corpus_manager(self.articles)
+
+    def tearDown(self):
+        remove_test_articles(self.articles)
+
+    def _run(self, workers):
+        observers = (TextObserver(), LemmaFrequencyObserver(), POSFrequencyObserver())
+        with TextProcessingPipeline(self.corpus_manager, workers=workers) as pipe:
+            for observer in observers:
+                pipe.add_observer(observer)
+            self.assertEqual(2, pipe.run())
+        return observers
+
+    def test_observers_get_saved_tokens(self):
+        text_observer, lemma_observer, pos_observer = self._run(workers=1)
+        for article in self.articles:
+            self.assertEqual(''.join(article.iter_processed_chunks(4096)), text_observer.texts[article.article_id])
+        self.assertEqual(2, lemma_observer.frequencies['мама'])
+        self.assertEqual(POSFrequencyPipeline(self.corpus_manager).run(), pos_observer.get_frequencies())
+        self.assertEqual({'S': 2, 'V': 1}, self.articles[0].read_meta()['pos_frequencies'])
+
+    def test_observers_get_tokens_from_workers(self):
+        serial_observers = self._run(workers=1)
+        worker_observers = self._run(workers=2)
+        self.assertEqual([observer.__dict__ for observer in serial_observers[:2]],
+                         [observer.__dict__ for observer in worker_observers[:2]],
+                         msg="Tokens processed by workers should be passed to observers of the pipeline")
+        self.assertEqual(serial_observers[2].get_frequencies(), worker_observers[2].get_frequencies())
+
+    def test_corpus_frequencies_are_read_from_meta(self):
+        pos_observer = self._run(workers=1)[2]
+        self.assertEqual(pos_observer.get_frequencies(),
+                         POSFrequencyObserver().get_corpus_frequencies(self.corpus_manager),
+                         msg="Frequencies of articles processed earlier should be summed from their meta data")
+
+    def test_recorder_keeps_only_extracted_values(self):
+        recorder = TokenRecorder([POSFrequencyObserver.extract, LemmaFrequencyObserver.extract])
+        article = self.articles[0]
+        recorder.start_article(article)
+        for word, lemma, tags in (('мама', 'мама', 'S,жен,од=им,ед'), ('мыла', 'мыть', 'V,несов=прош')):
+            token = MorphologicalToken(word, lemma)
+            token.tags = tags
+            recorder.consume(token)
+        recorder.finish_article(article)
+        self.assertEqual([(article.article_id, [[POS_INDEX['S'], POS_INDEX['V']], ['мама', 'мыть']])],
+                         recorder.pop_finished())
+
+    def test_articles_without_meta_are_processed(self):
+        self.articles[0].remove_meta()
+        with TextProcessingPipeline(self.corpus_manager) as pipe:
+            pos_observer = POSFrequencyObserver()
+            pipe.add_observer(pos_observer)
+            self.assertEqual(2, pipe.run())
+        self.assertEqual({}, pipe.failed_articles)
+        self.assertIn('V', pos_observer.get_frequencies())
+
+
+if __name__ == "__main__":
+    unittest.main()
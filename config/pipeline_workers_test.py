@@ -0,0 +1,93 @@
+import os
+import json
+import shutil
+import unittest
+from unittest import mock
+import pipeline
+from article import Article
+from pipeline import MorphAnalyzers, TextProcessingPipeline
+from config.test_articles import get_test_corpus_manager, remove_test_articles, save_test_articles
+from config.test_params import TEST_PATH
+
+PROCESS_IN_WORKER = pipeline._process_in_worker  # pylint: disable=protected-access
+GET_RAW_TEXT = Article.get_raw_text
+
+
+def _crash_on_second_article(articles):
+    if articles[0].article_id == -1801:
+        os._exit(1)  # pylint: disable=protected-access
+    return PROCESS_IN_WORKER(articles)
+
+
+def _malformed_second_article(article):
+    if article.article_id == -1801:
+        raise KeyError('malformed article')
+    return GET_RAW_TEXT(article)
+
+
+class PipelineWorkersTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.articles = save_test_articles({-1901: 'Красивая - мама красиво, мыла раму во второй реке.'})
+        cls.pipe = TextProcessingPipeline(get_test_corpus_manager(cls.articles), batch_size=1, workers=2)
+        cls.pipe.run()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        remove_test_articles(cls.articles)
+
+    def test_workers_produce_reference_output(self):
+        with open('config/test_files/reference_score_eight_test.txt', 'r', encoding='utf-8') as rf:
+            reference = rf.read()
+        processed = ''.join(self.articles[0].iter_processed_chunks(4096))
+        self.assertEqual(reference.split(), processed.split(),
+                         msg="Pipeline with several workers should produce the same output as a serial one")
+
+    def test_no_failed_articles(self):
+        self.assertEqual({}, self.pipe.failed_articles)
+
+
+class PipelineWorkersFailureTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.articles = save_test_articles(dict.fromkeys((-1802, -1801), 'Мама мыла раму.'))
+
+    def tearDown(self) -> None:
+        remove_test_articles(self.articles)
+        shutil.rmtree(TEST_PATH, ignore_errors=True)
+
+    def test_crashed_worker_fails_its_articles(self):
+        pipe = TextProcessingPipeline(get_test_corpus_manager(self.articles), batch_size=1, workers=2)
+        with mock.patch('pipeline._process_in_worker', _crash_on_second_article):
+            pipe.run()
+        self.assertIn(-1801, pipe.failed_articles,
+                      msg="Articles of a crashed worker should be reported failed instead of aborting the run")
+
+    def test_failing_article_does_not_stop_run(self):
+        pipe = TextProcessingPipeline(get_test_corpus_manager(self.articles), batch_size=2)
+        with mock.patch.object(Article, 'get_raw_text', _malformed_second_article):
+            self.assertEqual(1, pipe.run())
+        self.assertEqual([-1801], list(pipe.failed_articles),
+                         msg="Any error of an article should fail only the article")
+        self.assertTrue(self.articles[0].has_processed())
+
+
+class PipelineWorkersCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.articles = save_test_articles({-2102: 'Мама мыла раму.', -2101: 'Папа читал газету.'})
+
+    def tearDown(self) -> None:
+        remove_test_articles(self.articles)
+        shutil.rmtree(TEST_PATH, ignore_errors=True)
+
+    def test_workers_save_tag_cache(self):
+        cache_path = os.path.join(TEST_PATH, 'morph_cache.json')
+        with MorphAnalyzers(cache_path=cache_path) as analyzers:
+            TextProcessingPipeline(get_test_corpus_manager(self.articles), analyzers, batch_size=1, workers=2).run()
+        with open(cache_path, encoding='utf-8') as file:
+            words = {word for word, _ in json.load(file)['tags']}
+        self.assertTrue({'раму', 'газету'} <= words,
+                        msg="Tags parsed by every worker should be saved to the cache of the pipeline")
+
+
+if __name__ == "__main__":
+    unittest.main()
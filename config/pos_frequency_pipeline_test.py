@@ -0,0 +1,31 @@
+import unittest
+
+from pos_frequency_pipeline import POSFrequencyPipeline
+from config.test_articles import get_test_corpus_manager, remove_test_articles, save_test_articles
+
+PROCESSED_TEXTS = {
+    -1402: 'мама<S,жен,од=им,ед>(NOUN) мыть<V,несов,пе=прош,ед,изъяв,жен>(VERB) '
+           'рама<S,жен,неод=вин,ед>(NOUN)',
+    -1401: 'красивый<A=им,ед,полн,жен>(ADJF) мама<S,жен,од=им,ед>(NOUN) '
+           'во<PR=>(PREP) второй<ANUM=пр,ед,жен>(ADJF) река<S,жен,неод=пр,ед>(NOUN)',
+}
+
+
+class POSFrequencyPipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.articles = save_test_articles(dict.fromkeys(PROCESSED_TEXTS, ''), PROCESSED_TEXTS)
+        self.corpus_manager = get_test_corpus_manager(self.articles, lazy=True)
+
+    def tearDown(self):
+        remove_test_articles(self.articles)
+
+    def test_frequencies_are_saved_to_meta(self):
+        total = POSFrequencyPipeline(self.corpus_manager, chunk_size=7).run()
+        self.assertEqual({'A': 1, 'ANUM': 1, 'PR': 1, 'S': 4, 'V': 1}, total)
+        meta = self.articles[0].read_meta()
+        self.assertEqual({'S': 2, 'V': 1}, meta['pos_frequencies'])
+        self.assertEqual(-1402, meta['id'], msg="Other meta data should be kept")
+
+
+if __name__ == "__main__":
+    unittest.main()
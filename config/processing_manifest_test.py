@@ -0,0 +1,82 @@
+import json
+import os
+import shutil
+import unittest
+from unittest import mock
+from article import Article
+from pipeline import PipelineObserver, ProcessingManifest, TextProcessingPipeline
+from config.test_articles import get_test_corpus_manager, remove_test_articles, save_test_articles
+from config.test_params import TEST_PATH
+
+
+class RemovalRecorder(PipelineObserver):
+    def __init__(self):
+        self.removed = []
+
+    def remove_article(self, article_id):
+        self.removed.append(article_id)
+
+
+class ProcessingManifestTest(unittest.TestCase):
+    def setUp(self) -> None:
+        os.makedirs(TEST_PATH, exist_ok=True)
+        self.manifest_path = os.path.join(TEST_PATH, 'processing_manifest.json')
+        self.articles = save_test_articles({-2001: 'Красивая - мама красиво, мыла раму во второй реке.'})
+        self.article = self.articles[0]
+
+    def tearDown(self) -> None:
+        remove_test_articles(self.articles)
+        shutil.rmtree(TEST_PATH, ignore_errors=True)
+
+    def write_raw(self, text):
+        self.article.text = text
+        self.article.save_raw()
+
+    def run_pipeline(self, observer=None):
+        manifest = ProcessingManifest(self.manifest_path)
+        with TextProcessingPipeline(get_test_corpus_manager(self.articles), manifest=manifest) as pipe:
+            if observer is not None:
+                pipe.add_observer(observer)
+            return pipe.run()
+
+    def test_only_changed_articles_are_processed(self):
+        self.assertEqual(1, self.run_pipeline())
+        self.assertEqual(0, self.run_pipeline(), msg="Unchanged articles should be skipped")
+
+        self.write_raw('Мама мыла раму.')
+        self.assertEqual(1, self.run_pipeline(), msg="Changed article should be processed again")
+        self.assertNotIn('красивый', ''.join(self.article.iter_processed_chunks(4096)))
+
+        self.article.remove_processed()
+        self.assertEqual(1, self.run_pipeline(), msg="Article without processed text should be processed")
+
+    def test_outputs_of_deleted_articles_are_removed(self):
+        self.run_pipeline()
+        self.article.remove_raw()
+        self.run_pipeline()
+        self.assertFalse(self.article.has_processed())
+
+    def test_observers_are_told_about_deleted_articles(self):
+        self.run_pipeline()
+        self.article.remove_raw()
+        observer = RemovalRecorder()
+        self.run_pipeline(observer)
+        self.assertEqual([-2001], observer.removed)
+
+    def test_raw_text_is_not_read_whole(self):
+        manifest = ProcessingManifest(self.manifest_path)
+        with mock.patch.object(Article, 'get_raw_text', side_effect=AssertionError('raw text is read whole')):
+            manifest.is_up_to_date(self.article)
+
+    def test_manifest_is_saved_periodically(self):
+        manifest = ProcessingManifest(self.manifest_path, save_interval=2)
+        for _ in range(2):
+            manifest.is_up_to_date(self.article)
+            manifest.update(-2001)
+        with open(self.manifest_path, encoding='utf-8') as file:
+            self.assertIn('-2001', json.load(file)['articles'],
+                          msg="Manifest should be saved once save_interval articles are processed")
+
+
+if __name__ == "__main__":
+    unittest.main()
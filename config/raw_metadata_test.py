@@ -2,8 +2,8 @@ import re
 import os
 import json
 import unittest
-import requests
 from constants import ASSETS_PATH, CRAWLER_CONFIG_PATH
+from http_cache import cached_get
 from bs4 import BeautifulSoup
 
 
@@ -45,11 +45,12 @@ class RawDataValidator(unittest.TestCase):
     def test_validate_metadata(self):
         # can i open this URL?
         for metadata in self.metadata:
-            self.assertTrue(requests.get(metadata[1]['url']),
+            response = cached_get(metadata[1]['url'])
+            self.assertTrue(response,
                             msg="Can not open URL: <{}>. Check how you collect URLs".format(
                                 metadata[1]['url']))
 
-            html_source = BeautifulSoup(requests.get(metadata[1]['url']).content, features='lxml').text
+            html_source = BeautifulSoup(response.content, features='lxml').text
 
             self.assertTrue(metadata[1]['title'] in
                             html_source,
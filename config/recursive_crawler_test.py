@@ -0,0 +1,80 @@
+import os
+import shutil
+import threading
+import unittest
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from scrapper import CrawlerRecursive, CrawlState, HTTPFetcher
+from config.test_params import TEST_PATH
+
+# section-N pages link to deeper sections and to two articles each
+SECTIONS = 6
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    hits = Counter()
+
+    def do_GET(self):
+        SiteHandler.hits[self.path] += 1
+        section = int(self.path.strip('/').split('-')[-1]) if 'section' in self.path else 0
+        links = [f'/news-{section}-1.htm', f'news-{section}-2.htm', 'https://other.example/section-9']
+        if section + 1 < SECTIONS:
+            links.append(f'/section-{section + 1}')
+        body = ''.join(f'<a href="{link}">link</a>' for link in links).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class RecursiveCrawlerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), SiteHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.seed = f'http://127.0.0.1:{cls.server.server_port}/'
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self) -> None:
+        SiteHandler.hits.clear()
+        os.makedirs(TEST_PATH, exist_ok=True)
+        self.state_path = os.path.join(TEST_PATH, 'crawler_state.sqlite')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(TEST_PATH, ignore_errors=True)
+
+    def crawl(self, max_articles, max_depth):
+        state = CrawlState(self.state_path, max_depth)
+        crawler = CrawlerRecursive([self.seed], max_articles, fetcher=HTTPFetcher(max_workers=2), state=state)
+        crawler.find_articles()
+        metrics = crawler.get_metrics()
+        state.close()
+        return crawler, metrics
+
+    def test_depth_limit(self):
+        crawler, metrics = self.crawl(max_articles=100, max_depth=2)
+        self.assertEqual(6, len(crawler.get_search_urls()))
+        self.assertEqual({'/', '/section-1', '/section-2'}, set(SiteHandler.hits))
+        self.assertEqual(0, metrics['frontier_size'])
+
+    def test_resume_does_not_fetch_twice(self):
+        first, _ = self.crawl(max_articles=3, max_depth=10)
+        self.assertEqual(3, len(first.get_search_urls()))
+        second, metrics = self.crawl(max_articles=100, max_depth=10)
+
+        self.assertEqual(first.get_search_urls(), second.get_search_urls()[:3])
+        self.assertEqual(2 * SECTIONS, len(second.get_search_urls()))
+        self.assertEqual(1, max(SiteHandler.hits.values()),
+                         msg="Pages visited before the crawl was stopped should not be fetched again")
+        self.assertGreater(metrics['pages_per_second'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
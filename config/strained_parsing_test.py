@@ -0,0 +1,35 @@
+import unittest
+from scrapper import ARTICLE_STRAINER, LINKS_STRAINER, ArticleParser, Crawler, parse_html
+from benchmarks.pages import article_page, seed_page
+
+
+def get_article_fields(page: bytes, parse_only):
+    parser = ArticleParser(full_url='https://mordovia-news.ru/news-1-1.htm', article_id=1)
+    parser.parse_only = parse_only
+    parser._fill_article(page)  # pylint: disable=protected-access
+    article = parser.article
+    return article.title, article.author, article.topics, article.date, article.text
+
+
+class StrainedParsingTest(unittest.TestCase):
+    def test_article_fields_are_the_same(self):
+        for article_id in range(1, 31):
+            page = article_page(article_id, sentences=article_id % 7 + 1).encode('utf-8')
+            with self.subTest(article_id=article_id):
+                self.assertEqual(get_article_fields(page, None), get_article_fields(page, ARTICLE_STRAINER),
+                                 msg="Strained parsing should give the same article fields as full parsing")
+
+    def test_links_are_the_same(self):
+        # pylint: disable=protected-access
+        crawler = Crawler(seed_urls=[], max_articles=0)
+        for page_number in range(5):
+            page = seed_page(range(page_number * 20, page_number * 20 + 20), page_number).encode('utf-8')
+            links = crawler._extract_url(parse_html(page))
+            with self.subTest(page_number=page_number):
+                self.assertEqual(40, len(links))
+                self.assertEqual(links, crawler._extract_url(parse_html(page, LINKS_STRAINER)),
+                                 msg="Strained parsing should find the same links as full parsing")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import datetime
+import os
+import unittest
+from unittest import mock
+
+import pipeline
+from article import Article
+from pipeline import CorpusManager, TextProcessingPipeline
+from constants import ASSETS_PATH
+
+
+class StreamingProcessingTest(unittest.TestCase):
+    def setUp(self):
+        os.makedirs(ASSETS_PATH, exist_ok=True)
+        self.article = Article(url=None, article_id=-1013)
+        self.article.text = 'Мама мыла раму.\nКрасивая мама\n\nво второй реке'
+        self.article.date = datetime.datetime(2021, 1, 1)
+        self.article.save_raw()
+        self.pipe = TextProcessingPipeline(CorpusManager(path_to_raw_txt_data=ASSETS_PATH))
+
+    def tearDown(self):
+        self.pipe.close()
+        self.article.remove_meta()
+        self.article.remove_raw()
+        self.article.remove_processed()
+
+    def _read_processed(self):
+        return ''.join(self.article.iter_processed_chunks(4096))
+
+    def test_streaming_matches_batch_processing(self):
+        self.pipe._process_articles([self.article])
+        expected = self._read_processed()
+        with mock.patch.object(pipeline, 'MYSTEM_STREAMING_THRESHOLD', 0):
+            self.pipe._process_articles([self.article])
+        self.assertEqual(expected, self._read_processed(),
+                         msg="Streamed article should be processed as a whole one")
+
+    def test_failed_write_keeps_previous_text(self):
+        self.article.save_processed('previous')
+        with self.assertRaises(RuntimeError):
+            with self.article.open_processed_writer() as file:
+                file.write('partial')
+                raise RuntimeError
+        self.assertEqual('previous', self._read_processed())
+        self.assertEqual([], [name for name in os.listdir(ASSETS_PATH) if name.endswith('.tmp')])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+"""
+Articles saved to ASSETS_PATH by tests. Tests use negative ids, so scraped articles are never touched
+"""
+import datetime
+import os
+
+from article import Article
+from constants import ASSETS_PATH
+from pipeline import CorpusManager
+
+
+def save_test_articles(raw_texts: dict, processed_texts: dict = None) -> list:
+    """
+    Saves articles with raw texts by ids and processed texts if they are given, returns articles sorted by id
+    """
+    os.makedirs(ASSETS_PATH, exist_ok=True)
+    articles = []
+    for article_id, text in sorted(raw_texts.items()):
+        article = Article(url=None, article_id=article_id)
+        article.date = datetime.datetime(2021, 1, 1)
+        article.text = text
+        article.save_raw()
+        if processed_texts and article_id in processed_texts:
+            article.save_processed(processed_texts[article_id])
+        articles.append(article)
+    return articles
+
+
+def remove_test_articles(articles):
+    """
+    Removes all files of the articles through the storage and their images
+    """
+    for article in articles:
+        article.remove_processed()
+        article.remove_raw()
+        article.remove_meta()
+        if os.path.exists(article.get_image_path()):
+            os.remove(article.get_image_path())
+
+
+def get_test_corpus_manager(articles, **kwargs) -> CorpusManager:
+    """
+    Returns manager of the corpus selecting only the articles
+    """
+    article_ids = [article.article_id for article in articles]
+    return CorpusManager(path_to_raw_txt_data=ASSETS_PATH, id_range=(min(article_ids), max(article_ids)), **kwargs)
@@ -0,0 +1,55 @@
+import json
+import unittest
+from unittest import mock
+import scrapper
+from scrapper import Crawler, URLFrontier, NumberOfArticlesOutOfRangeError, normalize_url
+from config.config_generator import generate_config
+from config.test_params import TEST_CRAWLER_CONFIG_PATH
+
+
+class URLFrontierTest(unittest.TestCase):
+    def test_normalization(self):
+        spellings = ['https://mordovia-news.ru/news-1-2.htm',
+                     'HTTPS://Mordovia-News.RU/news-1-2.htm/',
+                     'https://mordovia-news.ru:443//news-1-2.htm#comments']
+        self.assertEqual(1, len({normalize_url(url) for url in spellings}))
+        self.assertEqual(normalize_url('https://mordovia-news.ru/?b=2&a=1'),
+                         normalize_url('https://mordovia-news.ru?a=1&b=2'))
+        self.assertNotEqual(normalize_url('https://mordovia-news.ru/news-1-2.htm'),
+                            normalize_url('http://mordovia-news.ru/news-1-2.htm'))
+
+    def test_frontier_keeps_first_spelling_in_order(self):
+        frontier = URLFrontier(['https://mordovia-news.ru/news-2-1.htm',
+                                'https://mordovia-news.ru/news-1-1.htm',
+                                'https://MORDOVIA-news.ru/news-2-1.htm/'])
+        self.assertEqual(['https://mordovia-news.ru/news-2-1.htm', 'https://mordovia-news.ru/news-1-1.htm'],
+                         list(frontier))
+        self.assertIn('https://mordovia-news.ru/news-1-1.htm/', frontier)
+        self.assertFalse(frontier.add('https://mordovia-news.ru/news-1-1.htm'))
+
+    def test_config_returns_max_articles_per_seed(self):
+        generate_config(base_urls=['https://mordovia-news.ru/'], num_articles=10)
+        with open(TEST_CRAWLER_CONFIG_PATH) as f:
+            config = json.load(f)
+
+        self.assertEqual((['https://mordovia-news.ru/'], 10, 10), scrapper.validate_config(TEST_CRAWLER_CONFIG_PATH))
+
+        config['max_number_articles_to_get_from_one_seed'] = 3
+        with open(TEST_CRAWLER_CONFIG_PATH, 'w', encoding='utf-8') as f:
+            json.dump(config, f)
+        self.assertEqual(3, scrapper.validate_config(TEST_CRAWLER_CONFIG_PATH)[2])
+
+        config['max_number_articles_to_get_from_one_seed'] = 0
+        with open(TEST_CRAWLER_CONFIG_PATH, 'w', encoding='utf-8') as f:
+            json.dump(config, f)
+        self.assertRaises(NumberOfArticlesOutOfRangeError, scrapper.validate_config, TEST_CRAWLER_CONFIG_PATH)
+
+    def test_crawler_takes_fetcher_third(self):
+        fetcher = mock.Mock()
+        crawler = Crawler(['https://mordovia-news.ru/'], 10, fetcher)
+        self.assertIs(fetcher, crawler.fetcher, msg="Positional fetcher argument should keep its place")
+        self.assertEqual(10, crawler.max_articles_per_seed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,3 +7,35 @@ import os
 PROJECT_ROOT = os.path.dirname(os.path.realpath(__file__))
 ASSETS_PATH = os.path.join(PROJECT_ROOT, 'tmp', 'articles')
 CRAWLER_CONFIG_PATH = os.path.join(PROJECT_ROOT, 'crawler_config.json')
+MORPH_CACHE_PATH = os.path.join(PROJECT_ROOT, 'tmp', 'morph_cache.json')
+MORPH_CACHE_SIZE = 100000
+PIPELINE_BATCH_SIZE = 16
+PIPELINE_WORKERS = 1
+HTTP_MAX_WORKERS = 8
+HTTP_PER_HOST_LIMIT = 4
+HTTP_MIN_INTERVAL = 0.0
+HTTP_TIMEOUT = 30
+CRAWLER_STATE_PATH = os.path.join(PROJECT_ROOT, 'tmp', 'crawler_state.sqlite')
+CRAWLER_MAX_DEPTH = 0
+ARTICLES_INDEX_PATH = os.path.join(PROJECT_ROOT, 'tmp', 'articles_index.json')
+INCREMENTAL_SCRAPING = False
+PROCESSING_MANIFEST_PATH = os.path.join(PROJECT_ROOT, 'tmp', 'processing_manifest.json')
+PROCESSING_MANIFEST_SAVE_INTERVAL = 100
+FAST_HTML_PARSING = True
+MYSTEM_STREAMING_THRESHOLD = 1024 * 1024
+PROCESSED_WRITE_BUFFER = 64 * 1024
+POS_FREQUENCIES_PATH = os.path.join(PROJECT_ROOT, 'tmp', 'pos_frequencies.json')
+POS_READ_CHUNK_SIZE = 1024 * 1024
+VISUALIZER_WORKERS = 1
+VISUALIZER_CHUNK_SIZE = 16
+PACKED_SEGMENT_SIZE = 256 * 1024 * 1024
+METRICS_ENABLED = False
+METRICS_PATH = os.path.join(PROJECT_ROOT, 'tmp', 'metrics')
+LEMMA_INDEX_PATH = os.path.join(PROJECT_ROOT, 'tmp', 'lemma_index.sqlite')
+METADATA_INDEX_PATH = os.path.join(PROJECT_ROOT, 'tmp', 'metadata_index')
+METADATA_INDEX_COMMIT_INTERVAL = 100
+ARTICLE_COMPRESSION = None
+HTTP_CACHE_MODE = 'off'
+HTTP_CACHE_PATH = os.path.join(PROJECT_ROOT, 'tmp', 'http_cache.sqlite')
+HTTP_CACHE_TTL = 24 * 3600
+HTTP_CACHE_MAX_SIZE = 512 * 1024 * 1024
@@ -0,0 +1,76 @@
+"""
+Fast parsing and formatting of article dates.
+Meta data keeps dates as '%Y-%m-%d %H:%M:%S', article pages show them as '%d.%m.%Y'
+"""
+import datetime
+import re
+
+META_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+PAGE_DATE_FORMAT = '%d.%m.%Y'
+META_DATE_PATTERN = re.compile('[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}:[0-9]{2}')
+PAGE_DATE_PATTERN = re.compile(r'[0-9]{2}\.[0-9]{2}\.[0-9]{4}')
+
+
+class DateFormatError(ValueError):
+    """
+    Date does not match the expected format
+    """
+
+
+def _matches(pattern, date_txt) -> bool:
+    return isinstance(date_txt, str) and pattern.fullmatch(date_txt) is not None
+
+
+def parse_meta_date(date_txt: str, strict: bool = False) -> datetime.datetime:
+    """
+    Converts '%Y-%m-%d %H:%M:%S' text to datetime object with fromisoformat.
+    Strict mode accepts only this exact format, otherwise other ISO dates and
+    anything strptime accepts for the format are parsed too
+    """
+    if strict and not _matches(META_DATE_PATTERN, date_txt):
+        raise DateFormatError(f'{date_txt!r} does not match {META_DATE_FORMAT}')
+    try:
+        return datetime.datetime.fromisoformat(date_txt)
+    except (TypeError, ValueError):
+        if strict:
+            raise DateFormatError(f'{date_txt!r} is not a valid date') from None
+    return datetime.datetime.strptime(date_txt, META_DATE_FORMAT)
+
+
+def parse_page_date(date_txt: str, strict: bool = False) -> datetime.datetime:
+    """
+    Converts '%d.%m.%Y' text to datetime object by reordering its slices to ISO format.
+    Strict mode accepts only this exact format, otherwise strptime parses what slicing can not
+    """
+    if _matches(PAGE_DATE_PATTERN, date_txt):
+        try:
+            return datetime.datetime.fromisoformat(f'{date_txt[6:10]}-{date_txt[3:5]}-{date_txt[0:2]}')
+        except ValueError:
+            if strict:
+                raise DateFormatError(f'{date_txt!r} is not a valid date') from None
+    elif strict:
+        raise DateFormatError(f'{date_txt!r} does not match {PAGE_DATE_FORMAT}')
+    return datetime.datetime.strptime(date_txt, PAGE_DATE_FORMAT)
+
+
+def format_meta_date(date: datetime.datetime) -> str:
+    """
+    Converts datetime object to '%Y-%m-%d %H:%M:%S' text
+    """
+    if date.tzinfo is not None or date.year < 1000:
+        return date.strftime(META_DATE_FORMAT)
+    return date.isoformat(sep=' ', timespec='seconds')
+
+
+def to_datetime64(dates_txt, date_format: str = META_DATE_FORMAT):
+    """
+    Converts texts of dates in meta or page format to numpy datetime64 array with seconds precision,
+    None becomes NaT
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    if date_format == PAGE_DATE_FORMAT:
+        dates_txt = [None if date_txt is None else f'{date_txt[6:10]}-{date_txt[3:5]}-{date_txt[0:2]}'
+                     for date_txt in dates_txt]
+    elif date_format != META_DATE_FORMAT:
+        raise DateFormatError(f'Unknown date format {date_format}')
+    return np.array(['NaT' if date_txt is None else date_txt for date_txt in dates_txt], dtype='datetime64[s]')
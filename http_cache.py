@@ -0,0 +1,280 @@
+"""
+On-disk cache of HTTP responses shared by the scrapper and dataset validators.
+In record mode fresh responses are served from the cache and downloaded ones are stored,
+in replay mode only recorded responses are served, so scraping and validation run offline
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from constants import HTTP_CACHE_MAX_SIZE, HTTP_CACHE_MODE, HTTP_CACHE_PATH, HTTP_CACHE_TTL, HTTP_TIMEOUT
+from metrics import METRICS
+
+CACHE_MODES = ('off', 'record', 'replay')
+CHARSET_PATTERN = re.compile(r'charset=([\w-]+)', re.IGNORECASE)
+
+
+class HTTPCacheError(Exception):
+    """
+    HTTP cache is misconfigured
+    """
+
+
+class CacheMissError(HTTPCacheError):
+    """
+    Response is not recorded while the cache replays them
+    """
+
+
+class CachedHeaders(dict):
+    """
+    Response headers with case-insensitive names
+    """
+    def __init__(self, headers=()):
+        super().__init__((name.lower(), value) for name, value in dict(headers).items())
+
+    def __getitem__(self, name):
+        return super().__getitem__(name.lower())
+
+    def __contains__(self, name):
+        return super().__contains__(name.lower())
+
+    def get(self, name, default=None):
+        return super().get(name.lower(), default)
+
+
+class CachedResponse:
+    """
+    Recorded response with the attributes of requests.Response used by the scrapper and validators
+    """
+    def __init__(self, url: str, status_code: int, headers: dict, content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CachedHeaders(headers)
+        self.content = content
+
+    @property
+    def ok(self) -> bool:
+        """
+        Checks that the status is not an error
+        """
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        """
+        Returns content decoded with the charset of Content-Type, UTF-8 if it is not given
+        """
+        match = CHARSET_PATTERN.search(self.headers.get('Content-Type', ''))
+        return self.content.decode(match.group(1) if match else 'utf-8', errors='replace')
+
+    def __bool__(self):
+        return self.ok
+
+    def revalidate(self, headers: dict = None):
+        """
+        Answers a conditional request: returns Not Modified response if validators of the request match
+        """
+        headers = CachedHeaders(headers or {})
+        etag = self.headers.get('ETag')
+        last_modified = self.headers.get('Last-Modified')
+        if (etag is not None and headers.get('If-None-Match') == etag) or \
+                (last_modified is not None and headers.get('If-Modified-Since') == last_modified):
+            return CachedResponse(self.url, 304, self.headers, b'')
+        return self
+
+
+class HTTPCache:
+    """
+    Keeps responses by URL in SQLite. Responses older than ttl seconds are downloaded again in record mode,
+    least recently used ones are evicted once the cache is larger than max_size bytes.
+    One cache is used by threads of a fetcher, its connection is guarded by a lock
+    """
+    def __init__(self, path: str = HTTP_CACHE_PATH, mode: str = HTTP_CACHE_MODE, ttl: float = HTTP_CACHE_TTL,
+                 max_size: int = HTTP_CACHE_MAX_SIZE):
+        if mode not in CACHE_MODES:
+            raise HTTPCacheError(f'Unknown HTTP cache mode {mode}, use one of {", ".join(CACHE_MODES)}')
+        self.path = path
+        self.mode = mode
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._connection = None
+        self._size = 0
+        if mode != 'off':
+            self._connect()
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                content BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                fetched REAL NOT NULL,
+                used REAL NOT NULL);
+            CREATE INDEX IF NOT EXISTS responses_used ON responses (used);
+        """)
+        self._size = self._connection.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def fetch(self, url: str, send, headers: dict = None):
+        """
+        Returns response of the URL according to the mode, send is called to download it.
+        Conditional requests are always sent in record mode and revalidated by the recorded response in replay mode
+        """
+        if self.mode == 'off':
+            return send()
+        if self.mode == 'replay':
+            response = self.lookup(url, fresh_only=False)
+            if response is None:
+                raise CacheMissError(f'Response of {url} is not recorded')
+            METRICS.increment('http_cache_hits')
+            return response.revalidate(headers)
+        if not headers:
+            response = self.lookup(url)
+            if response is not None:
+                METRICS.increment('http_cache_hits')
+                return response
+        response = send()
+        if response.status_code == 200:
+            self.store(url, response)
+        return response
+
+    def lookup(self, url: str, fresh_only: bool = True):
+        """
+        Returns recorded response of the URL, None if it is missing or older than ttl
+        """
+        with self._lock:
+            row = self._connection.execute('SELECT status, headers, content, fetched FROM responses WHERE url = ?',
+                                           (url,)).fetchone()
+            if row is None or (fresh_only and time.time() - row[3] > self.ttl):
+                return None
+            self._connection.execute('UPDATE responses SET used = ? WHERE url = ?', (time.time(), url))
+            self._connection.commit()
+        return CachedResponse(url, row[0], json.loads(row[1]), row[2])
+
+    def store(self, url: str, response):
+        """
+        Records the response, evicts least recently used responses if the cache gets too large
+        """
+        content = response.content
+        if len(content) > self.max_size:
+            return
+        now = time.time()
+        with self._lock:
+            previous = self._connection.execute('SELECT size FROM responses WHERE url = ?', (url,)).fetchone()
+            self._connection.execute('INSERT OR REPLACE INTO responses (url, status, headers, content, size, '
+                                     'fetched, used) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                     (url, response.status_code, json.dumps(dict(response.headers)), content,
+                                      len(content), now, now))
+            self._size += len(content) - (previous[0] if previous else 0)
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self):
+        while self._size > self.max_size:
+            rows = self._connection.execute('SELECT url, size FROM responses ORDER BY used LIMIT 64').fetchall()
+            if not rows:
+                self._size = 0
+                return
+            for url, size in rows:
+                self._connection.execute('DELETE FROM responses WHERE url = ?', (url,))
+                self._size -= size
+                if self._size <= self.max_size:
+                    return
+
+    def purge_expired(self) -> int:
+        """
+        Removes responses older than ttl, returns their number
+        """
+        with self._lock:
+            expired = self._connection.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses '
+                                               'WHERE fetched < ?', (time.time() - self.ttl,)).fetchone()
+            self._connection.execute('DELETE FROM responses WHERE fetched < ?', (time.time() - self.ttl,))
+            self._connection.commit()
+            self._size -= expired[1]
+        return expired[0]
+
+    def clear(self):
+        """
+        Removes all responses
+        """
+        with self._lock:
+            self._connection.execute('DELETE FROM responses')
+            self._connection.commit()
+            self._size = 0
+
+    def stats(self) -> dict:
+        """
+        Returns number of recorded responses and their size in bytes
+        """
+        with self._lock:
+            count = self._connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        return {'responses': count, 'size': self._size}
+
+    def close(self):
+        """
+        Closes cache database
+        """
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+_CACHES = {}
+
+
+def open_http_cache(path: str = HTTP_CACHE_PATH, mode: str = HTTP_CACHE_MODE) -> HTTPCache:
+    """
+    Returns the cache shared by fetchers and validators of this process
+    """
+    key = (path, mode, os.getpid())
+    cache = _CACHES.get(key)
+    if cache is None:
+        cache = _CACHES[key] = HTTPCache(path, mode)
+    return cache
+
+
+def close_http_cache(path: str = HTTP_CACHE_PATH, mode: str = HTTP_CACHE_MODE):
+    """
+    Closes the shared cache opened by this process
+    """
+    cache = _CACHES.pop((path, mode, os.getpid()), None)
+    if cache is not None:
+        cache.close()
+
+
+def cached_get(url: str, cache: HTTPCache = None):
+    """
+    Sends GET request through the shared cache as requests.get does
+    """
+    def send():
+        import requests  # pylint: disable=import-outside-toplevel
+        return requests.get(url, timeout=HTTP_TIMEOUT)
+    return (cache if cache is not None else open_http_cache()).fetch(url, send)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Shows, purges or clears the HTTP response cache')
+    parser.add_argument('command', choices=('stats', 'purge', 'clear'))
+    parser.add_argument('--path', default=HTTP_CACHE_PATH)
+    args = parser.parse_args()
+    cache = HTTPCache(args.path, mode='record')
+    if args.command == 'stats':
+        print(cache.stats())
+    elif args.command == 'purge':
+        print(f'Removed {cache.purge_expired()} expired responses')
+    else:
+        cache.clear()
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Inverted index of lemmas of processed articles.
+Postings keep positions of a lemma with a POS in an article as a typed array,
+so articles with lemmas, POS and phrases are found without reading processed texts.
+The update command runs the pipeline and updates the index with articles it processes and removes
+"""
+import argparse
+import os
+import re
+import sqlite3
+from array import array
+
+from constants import ASSETS_PATH, LEMMA_INDEX_PATH, POS_READ_CHUNK_SIZE
+from pipeline import CorpusManager, MorphologicalToken, PipelineObserver, run_pipeline
+
+PROCESSED_TOKEN_PATTERN = re.compile(r'([^\s<>]+)<([^>]*)>\(([^)]*)\)')
+POS_PREFIX_PATTERN = re.compile('[^,=]*')
+
+
+def get_pos(tags: str) -> str:
+    """
+    Returns POS of mystem tags
+    """
+    return POS_PREFIX_PATTERN.match(tags).group()
+
+
+def iter_processed_tokens(text: str):
+    """
+    Yields lemma and POS of every token of processed text
+    """
+    for match in PROCESSED_TOKEN_PATTERN.finditer(text):
+        yield match.group(1), get_pos(match.group(2))
+
+
+def _to_postings(tokens) -> dict:
+    """
+    Groups positions of tokens by lemma and POS
+    """
+    postings = {}
+    for position, key in enumerate(tokens):
+        positions = postings.get(key)
+        if positions is None:
+            positions = postings[key] = array('I')
+        positions.append(position)
+    return postings
+
+
+class LemmaIndex:
+    """
+    Keeps a posting of every lemma and POS of an article: its id and positions of the lemma in the article
+    """
+    def __init__(self, path: str = LEMMA_INDEX_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=30)
+        self._connection.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS postings (
+                lemma TEXT NOT NULL,
+                pos TEXT NOT NULL,
+                article_id INTEGER NOT NULL,
+                positions BLOB NOT NULL,
+                PRIMARY KEY (lemma, pos, article_id)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_article ON postings (article_id, lemma);
+        """)
+
+    def update(self, article_id: int, tokens, commit: bool = True):
+        """
+        Replaces postings of the article with positions of (lemma, POS) pairs of tokens
+        """
+        self._connection.execute('DELETE FROM postings WHERE article_id = ?', (article_id,))
+        self._connection.executemany('INSERT INTO postings (lemma, pos, article_id, positions) VALUES (?, ?, ?, ?)',
+                                     ((lemma, pos, article_id, positions.tobytes())
+                                      for (lemma, pos), positions in _to_postings(tokens).items()))
+        if commit:
+            self._connection.commit()
+
+    def remove(self, article_id: int):
+        """
+        Forgets the article
+        """
+        self._connection.execute('DELETE FROM postings WHERE article_id = ?', (article_id,))
+        self._connection.commit()
+
+    def rebuild(self, corpus_manager: CorpusManager) -> int:
+        """
+        Indexes processed texts of all articles again, returns number of indexed articles
+        """
+        self._connection.execute('DELETE FROM postings')
+        indexed = 0
+        for article in corpus_manager.iter_articles():
+            if article.has_processed():
+                text = ''.join(article.iter_processed_chunks(POS_READ_CHUNK_SIZE))
+                self.update(article.article_id, iter_processed_tokens(text), commit=False)
+                indexed += 1
+        self._connection.commit()
+        return indexed
+
+    def find(self, lemma: str, pos: str = None) -> list:
+        """
+        Returns sorted ids of articles having the lemma, with the POS if it is given
+        """
+        if pos is None:
+            rows = self._connection.execute('SELECT DISTINCT article_id FROM postings WHERE lemma = ? '
+                                            'ORDER BY article_id', (lemma,))
+        else:
+            rows = self._connection.execute('SELECT article_id FROM postings WHERE lemma = ? AND pos = ? '
+                                            'ORDER BY article_id', (lemma, pos))
+        return [article_id for (article_id,) in rows]
+
+    def find_all(self, terms) -> list:
+        """
+        Returns sorted ids of articles having all terms, a term is a lemma or a (lemma, POS) pair
+        """
+        queries = []
+        params = []
+        for term in terms:
+            lemma, pos = (term, None) if isinstance(term, str) else term
+            if pos is None:
+                queries.append('SELECT article_id FROM postings WHERE lemma = ?')
+                params.append(lemma)
+            else:
+                queries.append('SELECT article_id FROM postings WHERE lemma = ? AND pos = ?')
+                params.extend((lemma, pos))
+        if not queries:
+            return []
+        rows = self._connection.execute(f'{" INTERSECT ".join(queries)} ORDER BY article_id', params)
+        return [article_id for (article_id,) in rows]
+
+    def find_phrase(self, lemmas) -> list:
+        """
+        Returns sorted ids of articles where lemmas follow each other in this order
+        """
+        lemmas = list(lemmas)
+        found = []
+        for article_id in self.find_all(set(lemmas)):
+            starts = None
+            for offset, lemma in enumerate(lemmas):
+                positions = {position - offset for position in self.get_positions(article_id, lemma)}
+                starts = positions if starts is None else starts & positions
+                if not starts:
+                    break
+            if starts:
+                found.append(article_id)
+        return found
+
+    def get_positions(self, article_id: int, lemma: str, pos: str = None) -> list:
+        """
+        Returns sorted positions of the lemma in the article
+        """
+        query = 'SELECT positions FROM postings WHERE lemma = ? AND article_id = ?'
+        params = (lemma, article_id)
+        if pos is not None:
+            query += ' AND pos = ?'
+            params += (pos,)
+        positions = array('I')
+        for (data,) in self._connection.execute(query, params):
+            positions.frombytes(data)
+        return sorted(positions)
+
+    def close(self):
+        """
+        Closes index database
+        """
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class LemmaIndexObserver(PipelineObserver):
+    """
+    Updates postings of articles while TextProcessingPipeline processes them
+    """
+    def __init__(self, index: LemmaIndex):
+        self.index = index
+        self._tokens = []
+
+    @staticmethod
+    def extract(token: MorphologicalToken):
+        return token.normalized_form, get_pos(token.tags)
+
+    def start_article(self, article):
+        self._tokens = []
+
+    def consume(self, token):
+        self._tokens.append(token)
+
+    def finish_article(self, article):
+        self.index.update(article.article_id, self._tokens)
+        self._tokens = []
+
+    def remove_article(self, article_id):
+        self.index.remove(article_id)
+
+
+def _parse_term(term: str):
+    """
+    Converts 'lemma' or 'lemma/POS' text to a query term
+    """
+    lemma, _, pos = term.partition('/')
+    return (lemma, pos) if pos else lemma
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Builds, updates or queries the inverted index of lemmas')
+    parser.add_argument('command', choices=('build', 'update', 'find', 'phrase'))
+    parser.add_argument('terms', nargs='*', help='lemmas, find also accepts lemma/POS terms')
+    parser.add_argument('--index', default=LEMMA_INDEX_PATH)
+    args = parser.parse_args()
+    with LemmaIndex(args.index) as index:
+        if args.command == 'build':
+            print(f'Indexed {index.rebuild(CorpusManager(path_to_raw_txt_data=ASSETS_PATH, lazy=True))} articles')
+            return
+        if args.command == 'update':
+            run_pipeline(observers=[LemmaIndexObserver(index)])
+            return
+        if args.command == 'find':
+            found = index.find_all([_parse_term(term) for term in args.terms])
+        else:
+            found = index.find_phrase(args.terms)
+    print(' '.join(map(str, found)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+SQLite index of article meta data.
+Indexes of assets folders are kept in METADATA_INDEX_PATH, outside of the folders themselves
+"""
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import closing
+
+from constants import ASSETS_PATH, METADATA_INDEX_COMMIT_INTERVAL, METADATA_INDEX_PATH
+from dates import META_DATE_FORMAT
+from storage import open_storage
+
+META_SUFFIX = '_meta.json'
+FILTER_FIELDS = ('date_from', 'date_to', 'topic', 'author', 'url')
+
+
+class UnknownFilterError(Exception):
+    """
+    Articles are filtered by a field that is not indexed
+    """
+
+
+def _date_to_text(date) -> str:
+    return date.strftime(META_DATE_FORMAT) if hasattr(date, 'strftime') else date
+
+
+def get_index_path(assets_path: str) -> str:
+    """
+    Returns path of the index of the assets folder, indexes are named by digests of absolute folder paths
+    """
+    digest = hashlib.blake2b(os.path.abspath(assets_path).encode('utf-8'), digest_size=8).hexdigest()
+    return os.path.join(METADATA_INDEX_PATH, f'{digest}.sqlite')
+
+
+class MetadataIndex:
+    """
+    Keeps url, title, date, author and topics of every saved article in SQLite
+    to find articles without reading their meta files.
+    Changes are committed after every commit_interval updates and on close, articles indexed
+    by an interrupted process are added again by sync when the index is opened next time
+    """
+    def __init__(self, path: str, assets_path: str = None, commit_interval: int = METADATA_INDEX_COMMIT_INTERVAL):
+        self.path = path
+        self.commit_interval = commit_interval
+        self._uncommitted = 0
+        self._connection = sqlite3.connect(path, timeout=30)
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY,
+                url TEXT,
+                title TEXT,
+                date TEXT,
+                author TEXT);
+            CREATE INDEX IF NOT EXISTS articles_date ON articles (date);
+            CREATE INDEX IF NOT EXISTS articles_author ON articles (author);
+            CREATE INDEX IF NOT EXISTS articles_url ON articles (url);
+            CREATE TABLE IF NOT EXISTS topics (
+                article_id INTEGER NOT NULL,
+                topic TEXT NOT NULL,
+                PRIMARY KEY (topic, article_id)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS topics_article ON topics (article_id);
+            CREATE TABLE IF NOT EXISTS folder (path TEXT NOT NULL);
+        """)
+        if assets_path is not None and self.get_folder() != os.path.abspath(assets_path):
+            self._connection.execute('DELETE FROM folder')
+            self._connection.execute('INSERT INTO folder (path) VALUES (?)', (os.path.abspath(assets_path),))
+            self._connection.commit()
+
+    def get_folder(self):
+        """
+        Returns absolute path of the indexed assets folder or None if it is not recorded
+        """
+        row = self._connection.execute('SELECT path FROM folder').fetchone()
+        return row[0] if row else None
+
+    def update(self, meta: dict, commit: bool = True):
+        """
+        Adds or replaces meta data of the article, the change is committed with the next batch
+        unless commit is False and the caller commits it
+        """
+        article_id = meta['id']
+        self._connection.execute('INSERT OR REPLACE INTO articles (id, url, title, date, author) '
+                                 'VALUES (?, ?, ?, ?, ?)',
+                                 (article_id, meta.get('url'), meta.get('title'), meta.get('date'),
+                                  meta.get('author')))
+        topics = meta.get('topics') or ()
+        if isinstance(topics, str):
+            topics = [topics]
+        self._connection.execute('DELETE FROM topics WHERE article_id = ?', (article_id,))
+        self._connection.executemany('INSERT OR IGNORE INTO topics (article_id, topic) VALUES (?, ?)',
+                                     ((article_id, topic) for topic in topics))
+        if commit:
+            self._count_change()
+
+    def remove(self, article_id: int):
+        """
+        Forgets the article, the change is committed with the next batch
+        """
+        self._connection.execute('DELETE FROM articles WHERE id = ?', (article_id,))
+        self._connection.execute('DELETE FROM topics WHERE article_id = ?', (article_id,))
+        self._count_change()
+
+    def _count_change(self):
+        self._uncommitted += 1
+        if self._uncommitted >= self.commit_interval:
+            self.commit()
+
+    def commit(self):
+        """
+        Commits all changes, so other processes see them
+        """
+        self._connection.commit()
+        self._uncommitted = 0
+
+    def rebuild(self, assets_path: str) -> int:
+        """
+        Indexes all meta files of the folder again, returns number of indexed articles
+        """
+        self._connection.execute('DELETE FROM articles')
+        self._connection.execute('DELETE FROM topics')
+        return self.sync(assets_path)[1]
+
+    def sync(self, assets_path: str) -> tuple:
+        """
+        Forgets articles which meta files are not in the folder anymore and indexes meta files
+        that are not indexed yet, returns numbers of removed and added articles
+        """
+        storage = open_storage(assets_path)
+        saved = {int(name[:-len(META_SUFFIX)]): name for name in storage.list_names()
+                 if name.endswith(META_SUFFIX) and name[:-len(META_SUFFIX)].lstrip('-').isdigit()}
+        indexed = {article_id for (article_id,) in self._connection.execute('SELECT id FROM articles')}
+        removed = indexed - saved.keys()
+        self._connection.executemany('DELETE FROM articles WHERE id = ?', ((article_id,) for article_id in removed))
+        self._connection.executemany('DELETE FROM topics WHERE article_id = ?',
+                                     ((article_id,) for article_id in removed))
+        added = 0
+        for article_id in saved.keys() - indexed:
+            try:
+                meta = json.loads(storage.read_text(saved[article_id]))
+            except ValueError:
+                continue
+            self.update({**meta, 'id': article_id}, commit=False)
+            added += 1
+        self.commit()
+        return len(removed), added
+
+    def query(self, date_from=None, date_to=None, topic: str = None, author: str = None, url: str = None) -> list:
+        """
+        Returns sorted ids of articles published from date_from inclusive to date_to exclusive,
+        having the topic, the author and the url. Missing conditions are not checked
+        """
+        conditions = []
+        params = []
+        for condition, value in (('a.date >= ?', _date_to_text(date_from)), ('a.date < ?', _date_to_text(date_to)),
+                                 ('a.author = ?', author), ('a.url = ?', url), ('t.topic = ?', topic)):
+            if value is not None:
+                conditions.append(condition)
+                params.append(value)
+        join = ' JOIN topics t ON t.article_id = a.id' if topic is not None else ''
+        where = f' WHERE {" AND ".join(conditions)}' if conditions else ''
+        return [article_id for (article_id,) in
+                self._connection.execute(f'SELECT a.id FROM articles a{join}{where} ORDER BY a.id', params)]
+
+    def close(self):
+        """
+        Commits changes and closes index database
+        """
+        self.commit()
+        self._connection.close()
+
+
+def _get_indexed_folder(index_path: str):
+    """
+    Returns assets folder recorded in the index file or None if it is not recorded
+    """
+    try:
+        with closing(sqlite3.connect(index_path, timeout=30)) as connection:
+            row = connection.execute('SELECT path FROM folder').fetchone()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+def remove_stale_metadata_indexes() -> int:
+    """
+    Deletes indexes of assets folders that do not exist anymore and indexes that do not record their folder,
+    indexes opened by this process are kept. Returns number of deleted indexes
+    """
+    if not os.path.isdir(METADATA_INDEX_PATH):
+        return 0
+    opened = {index.path for index in _INDEXES.values()}
+    removed = 0
+    for name in os.listdir(METADATA_INDEX_PATH):
+        path = os.path.join(METADATA_INDEX_PATH, name)
+        if not name.endswith('.sqlite') or path in opened:
+            continue
+        folder = _get_indexed_folder(path)
+        if folder is None or not os.path.isdir(folder):
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+_INDEXES = {}
+
+
+@atexit.register
+def _commit_indexes():
+    """
+    Commits changes of indexes opened by this process when it exits
+    """
+    for (_, pid), index in _INDEXES.items():
+        if pid == os.getpid():
+            index.commit()
+
+
+def open_metadata_index(assets_path: str) -> MetadataIndex:
+    """
+    Returns index of the assets folder synchronized with its meta files when it is opened,
+    so a missing index is built and articles removed meanwhile are forgotten.
+    Connections are kept per process as SQLite connections must not be shared by forked processes.
+    Indexes of removed folders are deleted when an index of a new folder is created
+    """
+    key = (assets_path, os.getpid())
+    index = _INDEXES.get(key)
+    if index is None:
+        os.makedirs(METADATA_INDEX_PATH, exist_ok=True)
+        index_path = get_index_path(assets_path)
+        if not os.path.exists(index_path):
+            remove_stale_metadata_indexes()
+        index = _INDEXES[key] = MetadataIndex(index_path, assets_path)
+        if os.path.isdir(assets_path):
+            index.sync(assets_path)
+    return index
+
+
+def close_metadata_index(assets_path: str):
+    """
+    Closes index of the assets folder opened by this process
+    """
+    index = _INDEXES.pop((assets_path, os.getpid()), None)
+    if index is not None:
+        index.close()
+
+
+def remove_metadata_index(assets_path: str):
+    """
+    Closes and deletes index of the assets folder, e.g. once the folder is removed
+    """
+    close_metadata_index(assets_path)
+    path = get_index_path(assets_path)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def filter_articles(assets_path: str, filters: dict) -> list:
+    """
+    Returns sorted ids of articles matching filters, see MetadataIndex.query
+    """
+    unknown = set(filters) - set(FILTER_FIELDS)
+    if unknown:
+        raise UnknownFilterError(f'Articles can not be filtered by {", ".join(sorted(unknown))}')
+    return open_metadata_index(assets_path).query(**filters)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuilds or queries the index of article meta data')
+    parser.add_argument('command', choices=('rebuild', 'query'))
+    parser.add_argument('--path', default=ASSETS_PATH)
+    for field in FILTER_FIELDS:
+        parser.add_argument(f'--{field.replace("_", "-")}', dest=field)
+    args = parser.parse_args()
+    if args.command == 'rebuild':
+        print(f'Indexed {open_metadata_index(args.path).rebuild(args.path)} articles')
+        return
+    filters = {field: getattr(args, field) for field in FILTER_FIELDS if getattr(args, field) is not None}
+    print(' '.join(map(str, filter_articles(args.path, filters))))
+
+
+if __name__ == "__main__":
+    main()
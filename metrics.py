@@ -0,0 +1,209 @@
+"""
+Per-stage counters and latency histograms of scrapper and pipeline runs
+with JSON and Prometheus textfile reports.
+Disabled metrics record nothing, their timers are a shared object doing nothing
+"""
+import json
+import os
+import time
+
+from constants import METRICS_ENABLED, METRICS_PATH
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+PROMETHEUS_PREFIX = 'corpus'
+
+
+class Histogram:
+    """
+    Counts observed durations by cumulative upper bounds of LATENCY_BUCKETS
+    """
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """
+        Adds the value to every bucket it fits into
+        """
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+    def merge(self, data: dict):
+        """
+        Adds counts of a histogram exported by to_dict
+        """
+        self.count += data['count']
+        self.sum += data['sum']
+        self.counts = [count + other for count, other in zip(self.counts, data['counts'])]
+
+    def to_dict(self) -> dict:
+        """
+        Returns count, sum and cumulative bucket counts
+        """
+        return {'count': self.count, 'sum': self.sum, 'buckets': list(self.buckets), 'counts': list(self.counts)}
+
+
+class _Timer:
+    """
+    Observes duration of the with block in the stage histogram
+    """
+    def __init__(self, metrics, stage: str):
+        self.metrics = metrics
+        self.stage = stage
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+
+
+class _NullTimer:
+    """
+    Timer of disabled metrics
+    """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """
+    Counters and stage latency histograms of one process
+    """
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self.counters = {}
+        self.histograms = {}
+        self.started = time.perf_counter()
+
+    def enable(self, enabled: bool = True):
+        """
+        Turns recording on or off
+        """
+        self.enabled = enabled
+
+    def reset(self):
+        """
+        Forgets everything recorded and starts measuring rates again
+        """
+        self.counters = {}
+        self.histograms = {}
+        self.started = time.perf_counter()
+
+    def increment(self, name: str, value: int = 1):
+        """
+        Adds value to the counter
+        """
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, stage: str, seconds: float):
+        """
+        Records duration of the stage
+        """
+        if not self.enabled:
+            return
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = Histogram()
+        histogram.observe(seconds)
+
+    def timer(self, stage: str):
+        """
+        Returns context manager recording duration of its block as the stage
+        """
+        if self.enabled:
+            return _Timer(self, stage)
+        return _NULL_TIMER
+
+    def collect(self):
+        """
+        Returns counters and histograms recorded since the last collect and forgets them,
+        None if metrics are disabled. Worker processes send them to the main process this way
+        """
+        if not self.enabled:
+            return None
+        data = {'counters': self.counters,
+                'histograms': {stage: histogram.to_dict() for stage, histogram in self.histograms.items()}}
+        self.counters = {}
+        self.histograms = {}
+        return data
+
+    def merge(self, data: dict):
+        """
+        Adds counters and histograms returned by collect of another process
+        """
+        if not data:
+            return
+        for name, value in data['counters'].items():
+            self.counters[name] = self.counters.get(name, 0) + value
+        for stage, histogram in data['histograms'].items():
+            self.histograms.setdefault(stage, Histogram(tuple(histogram['buckets']))).merge(histogram)
+
+    def report(self) -> dict:
+        """
+        Returns counters, their rates per second of the run and stage histograms
+        """
+        elapsed = time.perf_counter() - self.started
+        return {
+            'elapsed_seconds': elapsed,
+            'counters': dict(self.counters),
+            'rates': {f'{name}_per_second': value / elapsed if elapsed else 0.0
+                      for name, value in self.counters.items()},
+            'stages': {stage: histogram.to_dict() for stage, histogram in self.histograms.items()}
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Returns the report in Prometheus text exposition format
+        """
+        report = self.report()
+        lines = [f'# TYPE {PROMETHEUS_PREFIX}_elapsed_seconds gauge',
+                 f'{PROMETHEUS_PREFIX}_elapsed_seconds {report["elapsed_seconds"]}']
+        for name, value in sorted(report['counters'].items()):
+            lines.append(f'# TYPE {PROMETHEUS_PREFIX}_{name}_total counter')
+            lines.append(f'{PROMETHEUS_PREFIX}_{name}_total {value}')
+        for name, value in sorted(report['rates'].items()):
+            lines.append(f'# TYPE {PROMETHEUS_PREFIX}_{name} gauge')
+            lines.append(f'{PROMETHEUS_PREFIX}_{name} {value}')
+        histogram_name = f'{PROMETHEUS_PREFIX}_stage_duration_seconds'
+        if report['stages']:
+            lines.append(f'# TYPE {histogram_name} histogram')
+        for stage, histogram in sorted(report['stages'].items()):
+            for bound, count in zip(histogram['buckets'], histogram['counts']):
+                lines.append(f'{histogram_name}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'{histogram_name}_bucket{{stage="{stage}",le="+Inf"}} {histogram["count"]}')
+            lines.append(f'{histogram_name}_sum{{stage="{stage}"}} {histogram["sum"]}')
+            lines.append(f'{histogram_name}_count{{stage="{stage}"}} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def save(self, name: str, path: str = METRICS_PATH):
+        """
+        Writes name.json report and name.prom textfile to the folder, does nothing if metrics are disabled.
+        The textfile is replaced atomically as exporters may read it any time
+        """
+        if not self.enabled:
+            return
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, f'{name}.json'), 'w', encoding='utf-8') as file:
+            json.dump(self.report(), file, indent=4)
+        prometheus_path = os.path.join(path, f'{name}.prom')
+        with open(f'{prometheus_path}.tmp', 'w', encoding='utf-8') as file:
+            file.write(self.to_prometheus())
+        os.replace(f'{prometheus_path}.tmp', prometheus_path)
+
+
+METRICS = Metrics()
@@ -3,13 +3,25 @@ Pipeline for text processing implementation
 """
 
 import os
-from typing import List
+import json
+import hashlib
+import re
+from array import array
+from collections import Counter, OrderedDict, deque
 
-from pymystem3 import Mystem
-from pymorphy2 import MorphAnalyzer
-
-from constants import ASSETS_PATH
+from constants import ASSETS_PATH, MORPH_CACHE_PATH, MORPH_CACHE_SIZE, PIPELINE_BATCH_SIZE, PIPELINE_WORKERS, \
+    PROCESSING_MANIFEST_PATH, PROCESSING_MANIFEST_SAVE_INTERVAL, MYSTEM_STREAMING_THRESHOLD, POS_FREQUENCIES_PATH
 from article import Article
+from metadata_index import filter_articles
+from metrics import METRICS
+from storage import open_storage
+
+# bump when the format of N_processed.txt changes
+PROCESSING_FORMAT_VERSION = 1
+POS_TAGS = ('A', 'ADV', 'ADVPRO', 'ANUM', 'APRO', 'COM', 'CONJ',
+            'INTJ', 'NUM', 'PART', 'PR', 'S', 'SPRO', 'V')
+POS_INDEX = {tag: index for index, tag in enumerate(POS_TAGS)}
+POS_PREFIX_PATTERN = re.compile('[^,=]*')
 
 
 class EmptyDirectoryError(Exception):
@@ -34,6 +46,8 @@ class MorphologicalToken:
     """
     Stores language params for each processed token
     """
+    __slots__ = ('normalized_form', 'original_word', 'tags', 'morphy_tags')
+
     def __init__(self, original_word, normalized_form):
         self.normalized_form = normalized_form
         self.original_word = original_word
@@ -44,65 +58,870 @@ class MorphologicalToken:
         return f'{self.normalized_form}<{self.tags}>({self.morphy_tags})'
 
 
+class ArticleTokens:
+    """
+    Stores tokens of an article column-wise: every word form, lemma and tag string
+    is interned once per article and tokens keep its ids in typed arrays
+    """
+    def __init__(self):
+        self._strings = []
+        self._string_ids = {}
+        self._columns = (array('I'), array('I'), array('I'), array('I'))
+
+    def append(self, original_word: str, normalized_form: str, tags: str, morphy_tags: str):
+        """
+        Adds a token to the end of the article
+        """
+        for column, string in zip(self._columns, (original_word, normalized_form, tags, morphy_tags)):
+            column.append(self._intern(string))
+
+    def _intern(self, string: str) -> int:
+        string_id = self._string_ids.get(string)
+        if string_id is None:
+            string_id = self._string_ids[string] = len(self._strings)
+            self._strings.append(string)
+        return string_id
+
+    def __len__(self):
+        return len(self._columns[0])
+
+    def __getitem__(self, index: int) -> MorphologicalToken:
+        original_word, normalized_form, tags, morphy_tags = (self._strings[column[index]]
+                                                             for column in self._columns)
+        token = MorphologicalToken(original_word, normalized_form)
+        token.tags = tags
+        token.morphy_tags = morphy_tags
+        return token
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __str__(self):
+        strings = self._strings
+        return ' '.join(f'{strings[lemma]}<{strings[tags]}>({strings[morphy_tags]})'
+                        for lemma, tags, morphy_tags in zip(*self._columns[1:]))
+
+
+class MorphTagCache:
+    """
+    Bounded LRU cache of word form to pymorphy2 tag.
+    Saved tags are kept with analyzer versions and are not loaded after an upgrade.
+    A cache keeping parsed word forms remembers them until pop_parsed, worker processes
+    send them to the cache of the main process this way, so only one process saves the file
+    """
+    def __init__(self, max_size: int = MORPH_CACHE_SIZE, path: str = None, keep_parsed: bool = False):
+        self.max_size = max_size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._tags = OrderedDict()
+        self._parsed = [] if keep_parsed else None
+        self._added = 0
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def get_tag(self, word, morph):
+        """
+        Returns tag of the most probable parse, asks morph only on a cache miss
+        """
+        tag = self._tags.get(word)
+        if tag is not None:
+            self.hits += 1
+            self._tags.move_to_end(word)
+            return tag
+        self.misses += 1
+        with METRICS.timer('morph_parse'):
+            tag = str(morph.parse(word)[0].tag)
+        self._put(word, tag)
+        if self._parsed is not None:
+            self._parsed.append((word, tag))
+        return tag
+
+    def _put(self, word, tag):
+        self._tags[word] = tag
+        self._tags.move_to_end(word)
+        if len(self._tags) > self.max_size:
+            self._tags.popitem(last=False)
+
+    def pop_parsed(self) -> list:
+        """
+        Returns word forms parsed since the last call with their tags and forgets them
+        """
+        parsed, self._parsed = self._parsed, []
+        return parsed
+
+    def add_parsed(self, parsed):
+        """
+        Adds word forms and tags parsed by another process, they are saved with the cache
+        """
+        for word, tag in parsed:
+            self._put(word, tag)
+        self._added += len(parsed)
+
+    def stats(self):
+        """
+        Returns hit and miss statistics
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._tags),
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def load(self, path: str):
+        """
+        Loads word forms saved by a previous run with the same analyzers, least recently used first.
+        Unreadable or malformed caches are ignored
+        """
+        try:
+            with open(path, encoding='utf-8') as file:
+                saved = json.load(file)
+        except ValueError:
+            return
+        if not isinstance(saved, dict) or saved.get('versions') != get_analyzer_versions() or self.max_size <= 0:
+            return
+        tags = saved.get('tags')
+        if not isinstance(tags, list):
+            return
+        loaded = OrderedDict()
+        for entry in tags[-self.max_size:]:
+            if not (isinstance(entry, list) and len(entry) == 2 and all(isinstance(item, str) for item in entry)):
+                return
+            loaded[entry[0]] = entry[1]
+        self._tags = loaded
+
+    def save(self, path: str = None):
+        """
+        Saves cached word forms so that later runs start warm.
+        Nothing is written if no word form was parsed or added
+        """
+        path = path or self.path
+        if path is None or not (self.misses or self._added):
+            return
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({'versions': get_analyzer_versions(), 'tags': list(self._tags.items())}, file,
+                      ensure_ascii=False)
+        os.replace(temp_path, path)
+
+
+class MorphAnalyzers:
+    """
+    Owns Mystem and MorphAnalyzer instances shared by all processed articles,
+    pymystem3 and pymorphy2 are imported only when the analyzers are started
+    """
+    def __init__(self, cache_size: int = MORPH_CACHE_SIZE, cache_path: str = None):
+        self._mystem = None
+        self._morph = None
+        self.startups = {'mystem': 0, 'morph': 0}
+        self.morph_cache = MorphTagCache(cache_size, cache_path)
+
+    @property
+    def mystem(self):
+        """
+        Returns Mystem instance, starts mystem subprocess on first use
+        """
+        if self._mystem is None:
+            from pymystem3 import Mystem  # pylint: disable=import-outside-toplevel
+            self._mystem = Mystem()
+            self.startups['mystem'] += 1
+        return self._mystem
+
+    @property
+    def morph(self):
+        """
+        Returns MorphAnalyzer instance, loads pymorphy2 dictionaries on first use
+        """
+        if self._morph is None:
+            from pymorphy2 import MorphAnalyzer  # pylint: disable=import-outside-toplevel
+            self._morph = MorphAnalyzer()
+            self.startups['morph'] += 1
+        return self._morph
+
+    def get_morphy_tag(self, word):
+        """
+        Returns pymorphy2 tag of a word form through the shared cache
+        """
+        return self.morph_cache.get_tag(word, self.morph)
+
+    def close(self):
+        """
+        Stops mystem subprocess, releases dictionaries and persists the cache
+        """
+        self.morph_cache.save()
+        if self._mystem is not None:
+            self._mystem.close()
+            self._mystem = None
+        self._morph = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
 class CorpusManager:
     """
-    Works with articles and stores them
+    Works with articles and stores them.
+    Lazy manager keeps only sorted ids and creates articles while iterating.
+    id_range (first, last) and shard (k, n) select a part of the corpus:
+    ids from first to last inclusive and ids giving k modulo n.
+    filters select articles by meta data through the metadata index,
+    e.g. {'date_from': '2021-03-01', 'date_to': '2021-04-01', 'topic': 'Спорт'}
     """
-    def __init__(self, path_to_raw_txt_data: str):
-        self._storage = dict()
+    def __init__(self, path_to_raw_txt_data: str, lazy: bool = False, id_range: tuple = None,
+                 shard: tuple = None, filters: dict = None):
+        self._storage = {}
+        self._ids = array('q')
         self._path = path_to_raw_txt_data
+        self._lazy = lazy
+        self._selection = (id_range, shard)
+        self._filtered_ids = set(filter_articles(path_to_raw_txt_data, filters)) if filters else None
         self._scan_dataset()
 
     def _scan_dataset(self):
         """
         Register each dataset entry
         """
-        for file in os.listdir(self._path):
-            if file.endswith('_raw.txt'):
-                self._storage[int(file[:-8])] = Article(url=None, article_id=int(file[:-8]))
+        ids = [int(name[:-8]) for name in open_storage(self._path).list_names()
+               if name.endswith('_raw.txt') and name[:-8].lstrip('-').isdigit()]
+        ids = sorted(article_id for article_id in ids if self.is_selected(article_id))
+        if self._lazy:
+            self._ids = array('q', ids)
+            return
+        for article_id in ids:
+            self._storage[article_id] = Article(url=None, article_id=article_id)
+
+    def is_selected(self, article_id: int) -> bool:
+        """
+        Checks that article id belongs to the selected range and shard and matches filters
+        """
+        id_range, shard = self._selection
+        if self._filtered_ids is not None and article_id not in self._filtered_ids:
+            return False
+        if id_range is not None and not id_range[0] <= article_id <= id_range[1]:
+            return False
+        return shard is None or article_id % shard[1] == shard[0]
+
+    def get_article_ids(self):
+        """
+        Returns sorted ids of selected articles
+        """
+        return self._ids if self._lazy else list(self._storage)
+
+    def iter_articles(self):
+        """
+        Yields selected articles in id order
+        """
+        if not self._lazy:
+            yield from self._storage.values()
+            return
+        for article_id in self._ids:
+            yield Article(url=None, article_id=article_id)
 
     def get_articles(self):
         """
         Returns storage params
         """
+        if self._lazy:
+            return {article.article_id: article for article in self.iter_articles()}
         return self._storage
 
 
-class TextProcessingPipeline:
+def get_analyzer_versions():
+    """
+    Returns versions of everything that affects processed texts
+    """
+    from importlib import metadata  # pylint: disable=import-outside-toplevel
+    versions = {'format': PROCESSING_FORMAT_VERSION}
+    for package in ('pymystem3', 'pymorphy2', 'pymorphy2-dicts-ru'):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+class ProcessingManifest:
+    """
+    Remembers raw text hashes and analyzer versions of processed articles.
+    The manifest is saved after every save_interval updates, so an interrupted run keeps most of its work
+    """
+    def __init__(self, path: str = PROCESSING_MANIFEST_PATH, save_interval: int = PROCESSING_MANIFEST_SAVE_INTERVAL):
+        self.path = path
+        self.versions = get_analyzer_versions()
+        self.save_interval = save_interval
+        self._entries = {}
+        self._pending_hashes = {}
+        self._unsaved = 0
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as file:
+                manifest = json.load(file)
+            if manifest.get('versions') == self.versions:
+                self._entries = manifest['articles']
+
+    def is_up_to_date(self, article: Article) -> bool:
+        """
+        Checks that processed text exists and was built from the current raw text,
+        the raw text is hashed line by line without reading it whole
+        """
+        hasher = hashlib.blake2b(digest_size=16)
+        try:
+            for line in article.iter_raw_lines():
+                hasher.update(line.encode('utf-8'))
+        except (OSError, ValueError):
+            return False
+        raw_hash = hasher.hexdigest()
+        self._pending_hashes[article.article_id] = raw_hash
+        return self._entries.get(str(article.article_id)) == raw_hash and article.has_processed()
+
+    def update(self, article_id: int):
+        """
+        Marks article as processed from the raw text checked last
+        """
+        if article_id not in self._pending_hashes:
+            return
+        self._entries[str(article_id)] = self._pending_hashes.pop(article_id)
+        self._unsaved += 1
+        if self._unsaved >= self.save_interval:
+            self.save()
+
+    def remove_deleted(self, corpus_manager: CorpusManager) -> list:
+        """
+        Removes outputs and entries of selected articles that are not in the corpus anymore,
+        returns sorted ids of removed articles
+        """
+        deleted = set(self._entries) - {str(article_id) for article_id in corpus_manager.get_article_ids()}
+        removed = []
+        for key in deleted:
+            if corpus_manager.is_selected(int(key)):
+                Article(url=None, article_id=int(key)).remove_processed()
+                del self._entries[key]
+                removed.append(int(key))
+        return sorted(removed)
+
+    def save(self):
+        """
+        Atomically writes manifest to disk
+        """
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({'versions': self.versions, 'articles': self._entries}, file)
+        os.replace(temp_path, self.path)
+        self._unsaved = 0
+
+
+class PipelineObserver:
+    """
+    Receives token stream of every processed article.
+    start_article is called before the first token of an article, finish_article
+    only after the article has been saved, so an article that failed is started again.
+    consume receives what extract returns for every token, worker processes send
+    only these values to the main process. remove_article is called for articles
+    deleted from the corpus since the previous run with a manifest
+    """
+    @staticmethod
+    def extract(token: MorphologicalToken):
+        """
+        Returns the part of the token consume needs, observers needing less than
+        the whole token override it with another static method
+        """
+        return token
+
+    def start_article(self, article: Article):
+        """
+        Starts a new article
+        """
+
+    def consume(self, token):
+        """
+        Receives what extract returned for the next token of the current article
+        """
+
+    def finish_article(self, article: Article):
+        """
+        Finishes the current article
+        """
+
+    def remove_article(self, article_id: int):
+        """
+        Forgets an article deleted from the corpus
+        """
+
+
+class LemmaFrequencyObserver(PipelineObserver):
+    """
+    Counts lemma frequencies of processed articles
+    """
+    def __init__(self):
+        self.frequencies = Counter()
+        self._lemmas = []
+
+    @staticmethod
+    def extract(token: MorphologicalToken):
+        return token.normalized_form
+
+    def start_article(self, article: Article):
+        self._lemmas = []
+
+    def consume(self, token):
+        self._lemmas.append(token)
+
+    def finish_article(self, article: Article):
+        self.frequencies.update(self._lemmas)
+        self._lemmas = []
+
+
+def get_zero_counts():
+    """
+    Returns numpy array of zero counts of POS_TAGS, numpy is imported on first use to keep module import fast
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    return np.zeros(len(POS_TAGS), dtype=np.int64)
+
+
+def to_frequencies(counts) -> dict:
     """
-    Process articles from corpus manager
+    Converts POS counts to a dictionary without zero frequencies
     """
-    def __init__(self, corpus_manager: CorpusManager):
+    return {tag: int(count) for tag, count in zip(POS_TAGS, counts) if count}
+
+
+def save_frequencies(article, counts):
+    """
+    Saves POS frequencies to meta data of the article, articles without meta data are skipped
+    """
+    try:
+        article.update_meta({'pos_frequencies': to_frequencies(counts)})
+    except FileNotFoundError:
+        print(f'Meta data of article {article.article_id} is missing, its POS frequencies are not saved')
+
+
+def save_corpus_frequencies(frequencies: dict, path: str = POS_FREQUENCIES_PATH):
+    """
+    Writes POS frequencies of the corpus
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(frequencies, file, indent=4)
+
+
+class POSFrequencyObserver(PipelineObserver):
+    """
+    Counts POS frequencies of articles while TextProcessingPipeline processes them,
+    saves them to meta data of every article and sums them for the corpus
+    """
+    def __init__(self):
+        self.total = get_zero_counts()
+        self.finished = set()
+        self._indices = []
+
+    def start_article(self, article):
+        self._indices = []
+
+    @staticmethod
+    def extract(token: MorphologicalToken):
+        return POS_INDEX.get(POS_PREFIX_PATTERN.match(token.tags).group())
+
+    def consume(self, token):
+        if token is not None:
+            self._indices.append(token)
+
+    def finish_article(self, article):
+        import numpy as np  # pylint: disable=import-outside-toplevel
+        counts = np.bincount(np.array(self._indices, dtype=np.intp), minlength=len(POS_TAGS))
+        save_frequencies(article, counts)
+        self.total += counts
+        self.finished.add(article.article_id)
+        self._indices = []
+
+    def get_frequencies(self) -> dict:
+        """
+        Returns POS frequencies of all finished articles
+        """
+        return to_frequencies(self.total)
+
+    def get_corpus_frequencies(self, corpus_manager: CorpusManager) -> dict:
+        """
+        Returns POS frequencies of all processed articles of the corpus. Frequencies of articles
+        processed in earlier runs are read from their meta data, so processed texts are not read again
+        """
+        total = self.total.copy()
+        missing = 0
+        for article in corpus_manager.iter_articles():
+            if article.article_id in self.finished or not article.has_processed():
+                continue
+            try:
+                frequencies = article.read_meta().get('pos_frequencies')
+            except FileNotFoundError:
+                frequencies = None
+            if frequencies is None:
+                missing += 1
+                continue
+            for tag, count in frequencies.items():
+                total[POS_INDEX[tag]] += count
+        if missing:
+            print(f'POS frequencies of {missing} processed articles are not saved, '
+                  f'count them with python pos_frequency_pipeline.py rebuild')
+        return to_frequencies(total)
+
+
+class TokenRecorder(PipelineObserver):
+    """
+    Keeps what extractors of observers of another process return for tokens of finished articles
+    to replay it to them. Whole tokens are kept column-wise in ArticleTokens
+    """
+    def __init__(self, extractors):
+        self.extractors = extractors
+        self.finished = []
+        self._values = []
+
+    def start_article(self, article: Article):
+        self._values = [ArticleTokens() if extractor is PipelineObserver.extract else []
+                         for extractor in self.extractors]
+
+    def consume(self, token: MorphologicalToken):
+        for extractor, values in zip(self.extractors, self._values):
+            if extractor is PipelineObserver.extract:
+                values.append(token.original_word, token.normalized_form, token.tags, token.morphy_tags)
+            else:
+                values.append(extractor(token))
+
+    def finish_article(self, article: Article):
+        self.finished.append((article.article_id, self._values))
+        self._values = []
+
+    def pop_finished(self):
+        """
+        Returns recorded articles and forgets them
+        """
+        finished, self.finished = self.finished, []
+        return finished
+
+
+class TextProcessingPipeline:  # pylint: disable=too-many-instance-attributes
+    """
+    Process articles from corpus manager.
+    Observers added with add_observer receive tokens of every article while it is processed
+    """
+    def __init__(self, corpus_manager: CorpusManager, analyzers: MorphAnalyzers = None,
+                 batch_size: int = PIPELINE_BATCH_SIZE, workers: int = 1, manifest: ProcessingManifest = None):
         self.corpus_manager = corpus_manager
+        self._owns_analyzers = analyzers is None
+        self.analyzers = analyzers if analyzers is not None else MorphAnalyzers()
+        self.batch_size = max(batch_size, 1)
+        self.workers = max(workers, 1)
+        self.manifest = manifest
+        self.failed_articles = {}
+        self.observers = []
+
+    def add_observer(self, observer: PipelineObserver):
+        """
+        Subscribes observer to token streams of processed articles
+        """
+        self.observers.append(observer)
 
     def run(self):
         """
-        Runs pipeline process scenario
+        Runs pipeline process scenario, with manifest only new and changed articles are processed.
+        Returns number of processed articles
         """
-        for article in self.corpus_manager.get_articles().values():
-            original_text = article.get_raw_text().lower()
-            processed_text = self._process(original_text)
-            article.save_processed(' '.join([str(token) for token in processed_text]))
+        try:
+            if self.workers == 1:
+                return self._report_results(map(self._process_articles_safely, self._get_batches()))
+            return self._report_results(self._replay(self._run_in_workers()))
+        finally:
+            if self.manifest is not None:
+                self.manifest.save()
 
-    @staticmethod
-    def _process(text) -> List[type(MorphologicalToken)]:
+    def _get_articles_to_process(self):
         """
-        Performs processing of each text
+        Returns articles which processed texts are missing or outdated
+        """
+        articles = self.corpus_manager.iter_articles()
+        if self.manifest is None:
+            return articles
+        for article_id in self.manifest.remove_deleted(self.corpus_manager):
+            for observer in self.observers:
+                observer.remove_article(article_id)
+        return (article for article in articles if not self.manifest.is_up_to_date(article))
+
+    def _get_batches(self):
+        """
+        Splits articles to process into batches of batch_size in their order
+        """
+        batch = []
+        for article in self._get_articles_to_process():
+            batch.append(article)
+            if len(batch) == self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _run_in_workers(self):
+        """
+        Processes batches in worker processes keeping at most two batches per worker in flight,
+        yields worker results in order of batches.
+        If a worker crashes, batches in flight are reported failed and a new pool processes the rest
+        """
+        from concurrent.futures.process import BrokenProcessPool  # pylint: disable=import-outside-toplevel
+        batches = self._get_batches()
+        pending = deque()
+        executor = None
+        try:
+            while True:
+                if executor is None:
+                    executor = self._start_workers()
+                for batch in batches:
+                    pending.append((batch, _submit(executor, batch)))
+                    if len(pending) >= 2 * self.workers:
+                        break
+                if not pending:
+                    return
+                batch, future = pending.popleft()
+                try:
+                    yield future.result()
+                except BrokenProcessPool as error:
+                    print(f'Worker process crashed: {error!r}')
+                    yield _failed_batch(batch, error)
+                    while pending:
+                        yield _failed_batch(pending.popleft()[0], error)
+                    executor.shutdown()
+                    executor = None
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    def _start_workers(self):
+        """
+        Starts a pool of worker processes with analyzers loading tags from the file of the pipeline analyzers,
+        workers record what extractors of observers return for tokens
+        """
+        from concurrent.futures import ProcessPoolExecutor  # pylint: disable=import-outside-toplevel
+        extractors = [type(observer).extract for observer in self.observers]
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                   initargs=(self.batch_size, extractors, METRICS.enabled,
+                                             self.analyzers.morph_cache.path))
+
+    def _replay(self, worker_results):
+        """
+        Passes values recorded by workers to observers, adds their metrics and parsed word forms
+        and yields results of batches
+        """
+        for results, finished, metrics, parsed in worker_results:
+            METRICS.merge(metrics)
+            self.analyzers.morph_cache.add_parsed(parsed)
+            for article_id, values in finished:
+                article = Article(url=None, article_id=article_id)
+                self._notify(article, values)
+            yield results
+
+    def _notify(self, article, values):
+        """
+        Passes values extracted from all tokens of an article to every observer
+        """
+        for observer, observer_values in zip(self.observers, values):
+            observer.start_article(article)
+            for value in observer_values:
+                observer.consume(value)
+            observer.finish_article(article)
+
+    def _report_results(self, results):
+        """
+        Records processed articles and collects the failed ones, returns number of processed articles
+        """
+        processed = 0
+        for batch_results in results:
+            for article_id, error in batch_results:
+                if error is not None:
+                    self.failed_articles[article_id] = error
+                    print(f'Failed to process article {article_id}: {error}')
+                    continue
+                processed += 1
+                if self.manifest is not None:
+                    self.manifest.update(article_id)
+        return processed
+
+    def _process_articles_safely(self, articles):
+        """
+        Processes a batch of articles, returns ids of articles with errors or None for processed ones.
+        Any error of an article only fails the article, KeyboardInterrupt is not an Exception and stops the run
+        """
+        saved = []
+        try:
+            self._process_articles(articles, saved)
+            return [(article.article_id, None) for article in articles]
+        except Exception:  # pylint: disable=broad-exception-caught
+            pass
+        results = [(article_id, None) for article_id in saved]
+        for article in articles:
+            if article.article_id in saved:
+                continue
+            try:
+                self._process_articles([article], saved)
+                results.append((article.article_id, None))
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                results.append((article.article_id, repr(error)))
+        return results
+
+    def _process_articles(self, articles, saved=None):
+        """
+        Processes a batch of articles and saves their processed texts, ids of saved articles are added to saved.
+        Articles larger than MYSTEM_STREAMING_THRESHOLD are streamed line by line
+        """
+        saved = [] if saved is None else saved
+        for article in articles:
+            if article.get_raw_size() > MYSTEM_STREAMING_THRESHOLD:
+                with METRICS.timer('process_streamed'):
+                    self._save_tokens(article, self._iter_tokens(self._iter_analysis(article.iter_raw_lines())))
+            else:
+                tokens = self._process(article.get_raw_text().lower())
+                with METRICS.timer('save_processed'):
+                    self._save_tokens(article, tokens)
+            saved.append(article.article_id)
+
+    def _save_tokens(self, article, tokens):
+        """
+        Writes tokens to processed text and passes them to observers as they come
+        """
+        observers = self.observers
+        for observer in observers:
+            observer.start_article(article)
+        number_of_tokens = 0
+        with article.open_processed_writer() as file:
+            separator = ''
+            for token in tokens:
+                file.write(separator)
+                file.write(str(token))
+                separator = ' '
+                number_of_tokens += 1
+                for observer in observers:
+                    observer.consume(observer.extract(token))
+        for observer in observers:
+            observer.finish_article(article)
+        METRICS.increment('articles_processed')
+        METRICS.increment('tokens', number_of_tokens)
+
+    def _iter_analysis(self, lines):
+        """
+        Analyzes text line by line as Mystem.analyze does, without holding the whole analysis
+        """
+        for line in lines:
+            for text in line.lower().splitlines():
+                with METRICS.timer('mystem_analyze'):
+                    analysis = self.analyzers.mystem.analyze(text)
+                yield from analysis
+
+    def _iter_tokens(self, analyze):
+        """
+        Yields tokens from mystem analysis
         """
-        analyze = Mystem().analyze(text)
-        morph = MorphAnalyzer()
-        tokens = []
         for feature in analyze:
             if 'analysis' not in feature or not feature['analysis']:
                 continue
-            token = MorphologicalToken(feature['text'],
-                                       feature['analysis'][0]['lex'])
+            token = MorphologicalToken(feature['text'], feature['analysis'][0]['lex'])
             token.tags = feature['analysis'][0]['gr']
-            token.morphy_tags = morph.parse(token.original_word)[0].tag
-            tokens.append(token)
+            token.morphy_tags = self.analyzers.get_morphy_tag(feature['text'])
+            yield token
+
+    def close(self):
+        """
+        Closes analyzers created by the pipeline itself
+        """
+        if self._owns_analyzers:
+            self.analyzers.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _process(self, text) -> ArticleTokens:
+        """
+        Performs processing of each text
+        """
+        with METRICS.timer('mystem_analyze'):
+            analysis = self.analyzers.mystem.analyze(text)
+        return self._collect_tokens(analysis)
+
+    def _collect_tokens(self, analyze) -> ArticleTokens:
+        """
+        Builds tokens from mystem analysis
+        """
+        tokens = ArticleTokens()
+        for feature in analyze:
+            if 'analysis' not in feature or not feature['analysis']:
+                continue
+            tokens.append(feature['text'],
+                          feature['analysis'][0]['lex'],
+                          feature['analysis'][0]['gr'],
+                          self.analyzers.get_morphy_tag(feature['text']))
         return tokens
 
 
+_WORKER_PIPELINE = None
+
+
+def _init_worker(batch_size, extractors, metrics_enabled=False, cache_path=None):
+    """
+    Creates a long-lived pipeline with its own analyzers in a worker process,
+    values of tokens are recorded with extractors of observers of the main process if there are any.
+    The tag cache is loaded from cache_path, but only the main process saves it with word forms parsed by workers.
+    Analyzers are closed when the worker exits, so mystem is stopped
+    """
+    global _WORKER_PIPELINE  # pylint: disable=global-statement
+    from multiprocessing.util import Finalize  # pylint: disable=import-outside-toplevel
+    METRICS.enable(metrics_enabled)
+    METRICS.reset()
+    analyzers = MorphAnalyzers()
+    analyzers.morph_cache = MorphTagCache(keep_parsed=True)
+    if cache_path is not None and os.path.exists(cache_path):
+        analyzers.morph_cache.load(cache_path)
+    Finalize(analyzers, analyzers.close, exitpriority=10)
+    _WORKER_PIPELINE = TextProcessingPipeline(corpus_manager=None, analyzers=analyzers, batch_size=batch_size)
+    if extractors:
+        _WORKER_PIPELINE.add_observer(TokenRecorder(extractors))
+
+
+def _process_in_worker(articles):
+    """
+    Processes a batch of articles in a worker process,
+    returns its results, tokens of processed articles, metrics recorded and word forms parsed meanwhile
+    """
+    results = _WORKER_PIPELINE._process_articles_safely(articles)  # pylint: disable=protected-access
+    finished = [item for observer in _WORKER_PIPELINE.observers for item in observer.pop_finished()]
+    return results, finished, METRICS.collect(), _WORKER_PIPELINE.analyzers.morph_cache.pop_parsed()
+
+
+def _submit(executor, batch):
+    """
+    Submits a batch to worker processes, a pool broken meanwhile gives a failed future
+    """
+    from concurrent.futures import Future  # pylint: disable=import-outside-toplevel
+    from concurrent.futures.process import BrokenProcessPool  # pylint: disable=import-outside-toplevel
+    try:
+        return executor.submit(_process_in_worker, batch)
+    except BrokenProcessPool as error:
+        future = Future()
+        future.set_exception(error)
+        return future
+
+
+def _failed_batch(batch, error):
+    """
+    Returns worker result of a batch lost with a crashed worker
+    """
+    return [(article.article_id, repr(error)) for article in batch], [], None, []
+
+
 def validate_dataset(path_to_validate):
     """
     Validates folder with assets
@@ -115,11 +934,30 @@ def validate_dataset(path_to_validate):
         raise EmptyDirectoryError
 
 
-def main():
+def run_pipeline(observers=()):
+    """
+    Processes new and changed articles of ASSETS_PATH, saves POS frequencies of every article
+    and of the corpus in the same pass. Other observers receive tokens of the articles too
+    """
     validate_dataset(ASSETS_PATH)
-    corpus_manager = CorpusManager(path_to_raw_txt_data=ASSETS_PATH)
-    pipeline = TextProcessingPipeline(corpus_manager)
-    pipeline.run()
+    corpus_manager = CorpusManager(path_to_raw_txt_data=ASSETS_PATH, lazy=True)
+    pos_observer = POSFrequencyObserver()
+    with MorphAnalyzers(cache_path=MORPH_CACHE_PATH) as analyzers:
+        pipeline = TextProcessingPipeline(corpus_manager, analyzers, workers=PIPELINE_WORKERS,
+                                          manifest=ProcessingManifest(PROCESSING_MANIFEST_PATH))
+        for observer in (pos_observer, *observers):
+            pipeline.add_observer(observer)
+        processed = pipeline.run()
+        print(f'Processed {processed} new or changed articles')
+        print(f'Morphological cache stats: {analyzers.morph_cache.stats()}')
+    frequencies = pos_observer.get_corpus_frequencies(corpus_manager)
+    save_corpus_frequencies(frequencies)
+    print(f'Corpus POS frequencies: {frequencies}')
+    METRICS.save('pipeline')
+
+
+def main():
+    run_pipeline()
     print('Text processing pipeline has just finished')
 
 
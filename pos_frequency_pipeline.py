@@ -1,8 +1,76 @@
 """
 Implementation of POSFrequencyPipeline for score ten only.
+TextProcessingPipeline saves POS frequencies while it processes articles,
+this pipeline rebuilds them from processed texts
 """
+import argparse
+import re
+from collections import Counter
+
+from constants import ASSETS_PATH, POS_READ_CHUNK_SIZE
+from pipeline import POS_INDEX, POS_TAGS, CorpusManager, get_zero_counts, save_corpus_frequencies, \
+    save_frequencies, to_frequencies
+
+POS_PATTERN = re.compile(f"<({'|'.join(sorted(POS_TAGS, key=len, reverse=True))})[,=>]")
+
+
+def count_pos(text: str):
+    """
+    Counts POS tags of processed text, returns numpy array of counts in POS_TAGS order.
+    Tags are counted by Counter, only distinct tags are looked up in POS_INDEX
+    """
+    counts = get_zero_counts()
+    for tag, count in Counter(POS_PATTERN.findall(text)).items():
+        counts[POS_INDEX[tag]] = count
+    return counts
 
 
 class POSFrequencyPipeline:
-    def __init__(self, assets):
-        pass
+    """
+    Counts POS frequencies of processed articles
+    """
+    def __init__(self, assets: CorpusManager, chunk_size: int = POS_READ_CHUNK_SIZE):
+        self.assets = assets
+        self.chunk_size = chunk_size
+
+    def run(self) -> dict:
+        """
+        Saves POS frequencies of every processed article to its meta data
+        and returns frequencies of the whole corpus
+        """
+        total = get_zero_counts()
+        for article in self.assets.iter_articles():
+            if not article.has_processed():
+                continue
+            counts = self._count_article(article)
+            save_frequencies(article, counts)
+            total += counts
+        return to_frequencies(total)
+
+    def _count_article(self, article):
+        """
+        Reads processed text by chunks, splitting them between tokens
+        """
+        counts = get_zero_counts()
+        rest = ''
+        for chunk in article.iter_processed_chunks(self.chunk_size):
+            chunk = rest + chunk
+            boundary = chunk.rfind(' ') + 1
+            counts += count_pos(chunk[:boundary])
+            rest = chunk[boundary:]
+        counts += count_pos(rest)
+        return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Counts POS frequencies again from processed texts of all articles, '
+                                                 'the text processing pipeline counts them as it processes articles')
+    parser.add_argument('command', choices=('rebuild',))
+    parser.parse_args()
+    frequencies = POSFrequencyPipeline(CorpusManager(path_to_raw_txt_data=ASSETS_PATH, lazy=True)).run()
+    save_corpus_frequencies(frequencies)
+    print(f'Corpus POS frequencies: {frequencies}')
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,20 @@ Crawler implementation
 import re
 import os
 import json
-import datetime
-import requests
-from bs4 import BeautifulSoup
+import time
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit, parse_qsl, urlencode
 from article import Article
-from constants import CRAWLER_CONFIG_PATH, ASSETS_PATH
+from dates import parse_page_date
+from http_cache import HTTPCache, cached_get, open_http_cache
+from metrics import METRICS
+from storage import open_storage
+from constants import CRAWLER_CONFIG_PATH, ASSETS_PATH, CRAWLER_STATE_PATH, CRAWLER_MAX_DEPTH, \
+    HTTP_MAX_WORKERS, HTTP_PER_HOST_LIMIT, HTTP_MIN_INTERVAL, HTTP_TIMEOUT, \
+    ARTICLES_INDEX_PATH, INCREMENTAL_SCRAPING, FAST_HTML_PARSING
 
 
 class IncorrectURLError(Exception):
@@ -36,15 +45,203 @@ class UnknownConfigError(Exception):
     """
 
 
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+ARTICLE_CLASSES = {'text', 'title', 'title_text', 'title_data'}
+
+
+def _has_article_class(css_class):
+    if css_class is None:
+        return False
+    classes = css_class.split() if isinstance(css_class, str) else css_class
+    return not ARTICLE_CLASSES.isdisjoint(classes)
+
+
+# strainers keep only elements (with their subtrees) that parsers look for,
+# they are named here and built on first use together with the bs4 import
+ARTICLE_STRAINER = 'article'
+LINKS_STRAINER = 'links'
+
+
+@lru_cache(maxsize=None)
+def _get_strainer(name: str):
+    from bs4 import SoupStrainer  # pylint: disable=import-outside-toplevel
+    if name == ARTICLE_STRAINER:
+        return SoupStrainer(['dd', 'span'], class_=_has_article_class)
+    return SoupStrainer('a', href=True)
+
+
+def parse_html(page: bytes, parse_only: str = None):
+    """
+    Builds soup of the page, only of elements kept by strainer named parse_only if it is given
+    """
+    from bs4 import BeautifulSoup  # pylint: disable=import-outside-toplevel
+    strainer = _get_strainer(parse_only) if parse_only is not None else None
+    with METRICS.timer('html_parse'):
+        return BeautifulSoup(page, features='lxml', parse_only=strainer)
+
+
+def normalize_url(url: str) -> str:
+    """
+    Brings different spellings of the same URL to a single form
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or '').lower()
+    if parts.port is not None and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f'{netloc}:{parts.port}'
+    path = re.sub(r'/{2,}', '/', parts.path).rstrip('/') or '/'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+class URLFrontier:
+    """
+    Keeps URLs in insertion order with constant time duplicate checks
+    """
+    def __init__(self, initial_urls=()):
+        self._urls = {}
+        for url in initial_urls:
+            self.add(url)
+
+    def add(self, url: str) -> bool:
+        """
+        Adds URL unless its normalized form is already known
+        """
+        key = normalize_url(url)
+        if key in self._urls:
+            return False
+        self._urls[key] = url
+        return True
+
+    def __contains__(self, url):
+        return normalize_url(url) in self._urls
+
+    def __len__(self):
+        return len(self._urls)
+
+    def __iter__(self):
+        return iter(self._urls.values())
+
+
+class HTTPFetcher:  # pylint: disable=too-many-instance-attributes
+    """
+    Downloads pages concurrently through a pooled keep-alive session.
+    Responses go through the HTTP cache, the shared one of HTTP_CACHE_MODE by default
+    """
+    def __init__(self, max_workers: int = HTTP_MAX_WORKERS, per_host_limit: int = HTTP_PER_HOST_LIMIT,
+                 min_interval: float = HTTP_MIN_INTERVAL, timeout: float = HTTP_TIMEOUT, cache: HTTPCache = None):
+        # pylint: disable=too-many-arguments
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.min_interval = min_interval
+        self.timeout = timeout
+        self.cache = cache if cache is not None else open_http_cache()
+        # requests is imported when the first fetcher is created to keep module import fast
+        import requests  # pylint: disable=import-outside-toplevel
+        from requests.adapters import HTTPAdapter  # pylint: disable=import-outside-toplevel
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def get(self, url: str) -> bytes:
+        """
+        Downloads a single page respecting per-host limits
+        """
+        return self.get_response(url).content
+
+    def get_response(self, url: str, headers: dict = None):
+        """
+        Returns response of GET request from the cache or sends it respecting per-host limits
+        """
+        return self.cache.fetch(url, lambda: self._send(url, headers), headers)
+
+    def _send(self, url: str, headers: dict = None):
+        host = urlparse(url).netloc.lower()
+        host_state = self._get_host_state(host)
+        with host_state['slots']:
+            self._wait_for_turn(host_state)
+            METRICS.increment('http_requests')
+            with METRICS.timer('http_get'):
+                return self.session.get(url, headers=headers, timeout=self.timeout)
+
+    def fetch_all(self, page_urls):
+        """
+        Downloads pages concurrently, yields their content in the order of page_urls
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            yield from executor.map(self.get, page_urls)
+
+    def fetch_all_responses(self, page_urls, page_headers):
+        """
+        Sends requests with per-page headers concurrently, yields responses in the order of page_urls
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            yield from executor.map(self.get_response, page_urls, page_headers)
+
+    def close(self):
+        """
+        Closes pooled connections
+        """
+        self.session.close()
+
+    def _get_host_state(self, host):
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = {'slots': threading.BoundedSemaphore(self.per_host_limit),
+                                     'next_request': 0.0}
+            return self._hosts[host]
+
+    def _wait_for_turn(self, host_state):
+        if self.min_interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            turn = max(now, host_state['next_request'])
+            host_state['next_request'] = turn + self.min_interval
+        time.sleep(turn - now)
+
+
 class Crawler:
     """
     Crawler implementation
     """
-    def __init__(self, seed_urls: list, max_articles: int):
+    parse_only = LINKS_STRAINER if FAST_HTML_PARSING else None
+
+    def __init__(self, seed_urls: list, max_articles: int, fetcher: HTTPFetcher = None,
+                 max_articles_per_seed: int = None):
         self.search_urls = seed_urls
         self.max_articles = max_articles
-        self.found_urls = []
+        self.max_articles_per_seed = max_articles_per_seed if max_articles_per_seed is not None else max_articles
+        self.found_urls = URLFrontier()
         self.link_pattern = r'/?news-\d+-\d+\.htm'
+        self._fetcher = fetcher
+        self._owns_fetcher = fetcher is None
+
+    @property
+    def fetcher(self) -> HTTPFetcher:
+        """
+        Returns fetcher of the crawler, its own one is created on first use if none was given
+        """
+        if self._fetcher is None:
+            self._fetcher = HTTPFetcher()
+        return self._fetcher
+
+    def close(self):
+        """
+        Closes fetcher created by the crawler itself
+        """
+        if self._owns_fetcher and self._fetcher is not None:
+            self._fetcher.close()
+            self._fetcher = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def _extract_url(self, article_bs):
         links = []
@@ -58,29 +255,183 @@ class Crawler:
         """
         Finds articles
         """
-        for url in self.search_urls:
-            request = requests.get(url).content
-            soup = BeautifulSoup(request,
-                                 features='lxml')
+        for url, request in zip(self.search_urls, self.fetcher.fetch_all(self.search_urls)):
+            soup = parse_html(request, self.parse_only)
+            found_on_seed = 0
             for article_url in self._extract_url(soup):
-                if len(self.found_urls) != self.max_articles \
-                        and url+article_url not in self.found_urls:
-                    self.found_urls.append(url+article_url)
+                if len(self.found_urls) >= self.max_articles or found_on_seed >= self.max_articles_per_seed:
+                    break
+                if self.found_urls.add(url+article_url):
+                    found_on_seed += 1
         print(f'Found {len(self.found_urls)} links to articles to process')
 
     def get_search_urls(self):
         """
         Returns seed_urls param
         """
-        return self.found_urls
+        return list(self.found_urls)
+
+
+class CrawlState:
+    """
+    Keeps frontier, visited pages and found articles of a recursive crawl in SQLite,
+    so an interrupted crawl resumes without fetching visited pages again
+    """
+    def __init__(self, path: str = CRAWLER_STATE_PATH, max_depth: int = CRAWLER_MAX_DEPTH):
+        self.max_depth = max_depth
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT UNIQUE NOT NULL,
+                url TEXT NOT NULL,
+                depth INTEGER NOT NULL,
+                visited INTEGER NOT NULL DEFAULT 0);
+            CREATE INDEX IF NOT EXISTS pages_frontier ON pages (visited, id);
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT UNIQUE NOT NULL,
+                url TEXT NOT NULL);
+        """)
+
+    def get_articles(self):
+        """
+        Returns article URLs found so far in the order they were found
+        """
+        return [url for (url,) in self._connection.execute('SELECT url FROM articles ORDER BY id')]
+
+    def add_article(self, url: str) -> bool:
+        """
+        Remembers a found article URL unless it is already known
+        """
+        cursor = self._connection.execute('INSERT OR IGNORE INTO articles (key, url) VALUES (?, ?)',
+                                          (normalize_url(url), url))
+        return cursor.rowcount == 1
+
+    def enqueue(self, page_urls, depth: int):
+        """
+        Adds pages to the frontier unless they are already known
+        """
+        self._connection.executemany('INSERT OR IGNORE INTO pages (key, url, depth) VALUES (?, ?, ?)',
+                                     ((normalize_url(url), url, depth) for url in page_urls
+                                      if urlparse(url).scheme in DEFAULT_PORTS))
+        self._connection.commit()
+
+    def get_next_pages(self, limit: int):
+        """
+        Returns up to limit unvisited pages as (id, url, depth) in breadth-first order
+        """
+        return self._connection.execute('SELECT id, url, depth FROM pages WHERE visited = 0 ORDER BY id LIMIT ?',
+                                        (limit,)).fetchall()
+
+    def mark_visited(self, page_id: int):
+        """
+        Marks page as visited and saves everything found on it
+        """
+        self._connection.execute('UPDATE pages SET visited = 1 WHERE id = ?', (page_id,))
+        self._connection.commit()
+
+    def get_frontier_size(self):
+        """
+        Returns number of pages waiting to be visited
+        """
+        return self._connection.execute('SELECT COUNT(*) FROM pages WHERE visited = 0').fetchone()[0]
+
+    def close(self):
+        """
+        Closes state database
+        """
+        self._connection.close()
+
+
+class CrawlerRecursive(Crawler):
+    """
+    Breadth-first crawler that follows links of the seed sites up to state.max_depth.
+    max_articles_per_seed limits new articles taken from every crawled page,
+    articles beyond max_articles stay in the state for the next run
+    """
+    def __init__(self, seed_urls: list, max_articles: int, fetcher: HTTPFetcher = None,
+                 max_articles_per_seed: int = None, state: CrawlState = None):
+        super().__init__(seed_urls, max_articles, fetcher, max_articles_per_seed)
+        self._owns_state = state is None
+        self.state = state if state is not None else CrawlState()
+        self.metrics = {'pages_visited': 0, 'seconds': 0.0}
+        for url in self.state.get_articles():
+            if len(self.found_urls) >= self.max_articles:
+                break
+            self.found_urls.add(url)
+        self.state.enqueue(seed_urls, depth=0)
+
+    def find_articles(self):
+        """
+        Visits frontier pages in breadth-first order until enough articles are found
+        """
+        start = time.perf_counter()
+        while len(self.found_urls) < self.max_articles:
+            pages = self.state.get_next_pages(self.fetcher.max_workers)
+            if not pages:
+                break
+            for (page_id, url, depth), request in zip(pages, self.fetcher.fetch_all([page[1] for page in pages])):
+                self._visit(url, depth, parse_html(request, self.parse_only))
+                self.state.mark_visited(page_id)
+                self.metrics['pages_visited'] += 1
+                if len(self.found_urls) >= self.max_articles:
+                    break
+        self.metrics['seconds'] += time.perf_counter() - start
+        metrics = self.get_metrics()
+        print(f'Found {len(self.found_urls)} links to articles to process, '
+              f'{metrics["pages_per_second"]:.2f} pages/s, frontier size {metrics["frontier_size"]}')
+
+    def close(self):
+        """
+        Closes fetcher and state created by the crawler itself
+        """
+        super().close()
+        if self._owns_state:
+            self.state.close()
+
+    def get_metrics(self):
+        """
+        Returns crawl speed and frontier size
+        """
+        seconds = self.metrics['seconds']
+        return {
+            'pages_visited': self.metrics['pages_visited'],
+            'pages_per_second': self.metrics['pages_visited'] / seconds if seconds else 0.0,
+            'frontier_size': self.state.get_frontier_size(),
+            'articles_found': len(self.found_urls)
+        }
+
+    def _visit(self, url, depth, soup):
+        found_on_page = URLFrontier()
+        for article_url in self._extract_url(soup):
+            if len(found_on_page) >= self.max_articles_per_seed:
+                break
+            full_url = urljoin(url, article_url)
+            if full_url not in self.found_urls and self.state.add_article(full_url):
+                found_on_page.add(full_url)
+        for full_url in found_on_page:
+            if len(self.found_urls) >= self.max_articles:
+                break
+            self.found_urls.add(full_url)
+        if depth < self.state.max_depth:
+            host = urlparse(url).netloc.lower()
+            links = (urljoin(url, link['href']) for link in soup.find_all('a', href=True))
+            self.state.enqueue((link for link in links
+                                if urlparse(link).netloc.lower() == host and not re.search(self.link_pattern, link)),
+                               depth + 1)
 
 
 class ArticleParser:
     """
     ArticleParser implementation
     """
-    def __init__(self, full_url: str, article_id: int):
+    parse_only = ARTICLE_STRAINER if FAST_HTML_PARSING else None
+
+    def __init__(self, full_url: str, article_id: int, fetcher: HTTPFetcher = None):
         self.article = Article(url=full_url, article_id=article_id)
+        self.fetcher = fetcher
 
     def _fill_article_with_text(self, article_soup):
         self.article.text = article_soup.find('dd', class_='text').text
@@ -96,17 +447,147 @@ class ArticleParser:
         """
         Unifies date format
         """
-        return datetime.datetime.strptime(date_str, "%d.%m.%Y")
+        return parse_page_date(date_str)
 
-    def parse(self):
+    def parse(self, page: bytes = None):
         """
-        Parses each article
+        Parses each article, downloads it unless the page is already fetched
         """
-        request = requests.get(self.article.url).content
-        soup = BeautifulSoup(request, features='lxml')
+        if page is not None:
+            request = page
+        elif self.fetcher is not None:
+            request = self.fetcher.get(self.article.url)
+        else:
+            METRICS.increment('http_requests')
+            with METRICS.timer('http_get'):
+                request = cached_get(self.article.url).content
+        self._fill_article(request)
+        self.article.save_raw()
+
+    def _fill_article(self, page: bytes):
+        soup = parse_html(page, self.parse_only)
         self._fill_article_with_meta_information(soup)
         self._fill_article_with_text(soup)
-        self.article.save_raw()
+
+
+class ArticlesIndex:
+    """
+    Maps URLs of already scraped articles to their ids and HTTP validators.
+    Entries without files in the assets folder are dropped on load,
+    missing index is rebuilt from meta files found in the assets folder.
+    New articles get ids after both indexed ones and files in the assets folder
+    """
+    def __init__(self, index_path: str = ARTICLES_INDEX_PATH, assets_path: str = ASSETS_PATH):
+        self.index_path = index_path
+        self.assets_path = assets_path
+        self._entries = {}
+        if os.path.exists(index_path):
+            with open(index_path, encoding='utf-8') as file:
+                self._entries = json.load(file)
+            self._entries = {key: entry for key, entry in self._entries.items() if self.is_saved(entry['url'])}
+        elif os.path.isdir(assets_path):
+            self._rebuild()
+        self._next_id = max(max((entry['id'] for entry in self._entries.values()), default=0),
+                            self._get_last_saved_id()) + 1
+
+    def get_id(self, url: str):
+        """
+        Returns id of a known article or the next free id for a new one
+        """
+        entry = self._entries.get(normalize_url(url))
+        if entry is not None:
+            return entry['id']
+        self._next_id += 1
+        return self._next_id - 1
+
+    def is_saved(self, url: str) -> bool:
+        """
+        Checks that the article is known and its files are in the assets folder
+        """
+        entry = self._entries.get(normalize_url(url))
+        storage = open_storage(self.assets_path)
+        return entry is not None and all(storage.exists(f'{entry["id"]}{suffix}')
+                                         for suffix in ('_raw.txt', '_meta.json'))
+
+    def get_conditional_headers(self, url: str) -> dict:
+        """
+        Returns If-None-Match and If-Modified-Since headers for a saved article
+        """
+        if not self.is_saved(url):
+            return {}
+        entry = self._entries[normalize_url(url)]
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def update(self, url: str, article_id: int, headers=None):
+        """
+        Remembers article id and validators of the downloaded page
+        """
+        headers = headers or {}
+        self._entries[normalize_url(url)] = {
+            'id': article_id,
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified')
+        }
+
+    def save(self):
+        """
+        Atomically writes index to disk
+        """
+        os.makedirs(os.path.dirname(self.index_path) or '.', exist_ok=True)
+        temp_path = f'{self.index_path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(self._entries, file, ensure_ascii=False, indent=4)
+        os.replace(temp_path, self.index_path)
+
+    def _get_last_saved_id(self) -> int:
+        """
+        Returns the largest id of article files in the assets folder, 0 if there are none
+        """
+        if not os.path.isdir(self.assets_path):
+            return 0
+        prefixes = (name.partition('_')[0] for name in open_storage(self.assets_path).list_names())
+        return max((int(prefix) for prefix in prefixes if prefix.isdigit()), default=0)
+
+    def _rebuild(self):
+        storage = open_storage(self.assets_path)
+        for file_name in storage.list_names():
+            if not file_name.endswith('_meta.json'):
+                continue
+            meta = json.loads(storage.read_text(file_name))
+            if meta.get('url'):
+                self.update(meta['url'], meta['id'])
+
+
+def scrape_articles(article_links, fetcher: HTTPFetcher, index: ArticlesIndex = None):
+    """
+    Downloads and saves articles. With index, saved articles are requested conditionally,
+    unchanged ones are skipped and only new articles get the next ids
+    """
+    if index is None:
+        pages = fetcher.fetch_all(article_links)
+        for article_id, (article_link, page) in enumerate(zip(article_links, pages), 1):
+            ArticleParser(article_link, article_id, fetcher).parse(page)
+        return len(article_links)
+
+    article_links = [link for link in article_links if not index.is_saved(link) or index.get_conditional_headers(link)]
+    responses = fetcher.fetch_all_responses(article_links, [index.get_conditional_headers(link)
+                                                            for link in article_links])
+    saved = 0
+    for article_link, response in zip(article_links, responses):
+        if response.status_code == 304:
+            continue
+        article_id = index.get_id(article_link)
+        ArticleParser(article_link, article_id, fetcher).parse(response.content)
+        index.update(article_link, article_id, response.headers)
+        saved += 1
+    index.save()
+    return saved
 
 
 def prepare_environment(base_path):
@@ -134,16 +615,33 @@ def validate_config(crawler_path):
 
     if settings['total_articles_to_find_and_parse'] > 100:
         raise NumberOfArticlesOutOfRangeError
-    return settings['base_urls'], settings['total_articles_to_find_and_parse']
+
+    max_per_seed = settings.get('max_number_articles_to_get_from_one_seed',
+                                settings['total_articles_to_find_and_parse'])
+    if not isinstance(max_per_seed, int):
+        raise IncorrectNumberOfArticlesError
+
+    if not 0 < max_per_seed <= 100:
+        raise NumberOfArticlesOutOfRangeError
+    return settings['base_urls'], settings['total_articles_to_find_and_parse'], max_per_seed
 
 
 if __name__ == '__main__':
-    urls, num_articles = validate_config(CRAWLER_CONFIG_PATH)
+    urls, num_articles, num_articles_per_seed = validate_config(CRAWLER_CONFIG_PATH)
     prepare_environment(ASSETS_PATH)
 
-    crawler = Crawler(seed_urls=urls, max_articles=num_articles)
+    http_fetcher = HTTPFetcher()
+    if CRAWLER_MAX_DEPTH > 0:
+        crawler = CrawlerRecursive(seed_urls=urls, max_articles=num_articles, fetcher=http_fetcher,
+                                   max_articles_per_seed=num_articles_per_seed,
+                                   state=CrawlState(CRAWLER_STATE_PATH, CRAWLER_MAX_DEPTH))
+    else:
+        crawler = Crawler(seed_urls=urls, max_articles=num_articles, fetcher=http_fetcher,
+                          max_articles_per_seed=num_articles_per_seed)
     crawler.find_articles()
 
-    for _article_id, _article_link in enumerate(crawler.get_search_urls()):
-        parser = ArticleParser(_article_link, _article_id+1)
-        parser.parse()
+    articles_index = ArticlesIndex(ARTICLES_INDEX_PATH, ASSETS_PATH) if INCREMENTAL_SCRAPING else None
+    number_of_saved = scrape_articles(crawler.get_search_urls(), http_fetcher, articles_index)
+    print(f'Saved {number_of_saved} new or changed articles')
+    http_fetcher.close()
+    METRICS.save('scrapper')
@@ -0,0 +1,625 @@
+"""
+Storages of article files.
+DirectoryStorage keeps every file in the folder, PackedStorage appends them
+to large segment files and finds them by an offset index.
+CompressedStorage keeps raw and processed texts of either of them compressed
+"""
+import argparse
+import gzip
+import io
+import mmap
+import os
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+from constants import ARTICLE_COMPRESSION, PACKED_SEGMENT_SIZE, PROCESSED_WRITE_BUFFER
+
+PACKED_INDEX_NAME = 'packed_index.log'
+SEGMENT_NAME = 'segment_{:05d}.bin'
+ARTICLE_SUFFIXES = ('_raw.txt', '_meta.json', '_processed.txt')
+COMPRESSED_SUFFIXES = ('_raw.txt', '_processed.txt')
+COMPRESSION_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+COMPRESSION_LEVELS = {'gzip': 6, 'zstd': 3}
+ZSTD_FRAME_HEADER_MAX_SIZE = 18
+SIZE_READ_CHUNK = 1024 * 1024
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class StorageError(Exception):
+    """
+    Storage is broken or misused
+    """
+
+
+class Storage(ABC):
+    """
+    Named text files of articles
+    """
+    @abstractmethod
+    def read_bytes(self, name: str) -> bytes:
+        """
+        Returns content of the file
+        """
+
+    @abstractmethod
+    def write_bytes(self, name: str, data: bytes):
+        """
+        Replaces content of the file
+        """
+
+    def read_text(self, name: str) -> str:
+        """
+        Returns text of the file
+        """
+        with self.open_reader(name) as file:
+            return file.read()
+
+    def write_text(self, name: str, text: str):
+        """
+        Replaces text of the file
+        """
+        with self.open_writer(name) as file:
+            file.write(text)
+
+    def open_reader(self, name: str):
+        """
+        Opens the file for reading text
+        """
+        return io.TextIOWrapper(io.BytesIO(self.read_bytes(name)), encoding='utf-8')
+
+    def open_binary_reader(self, name: str):
+        """
+        Opens the file for reading bytes
+        """
+        return io.BytesIO(self.read_bytes(name))
+
+    @contextmanager
+    def open_binary_writer(self, name: str):
+        """
+        Opens the file for writing bytes, they replace
+        the previous version atomically once the writer is closed
+        """
+        buffer = io.BytesIO()
+        yield buffer
+        self.write_bytes(name, buffer.getvalue())
+
+    @contextmanager
+    def open_writer(self, name: str):
+        """
+        Opens the file for writing text, the text replaces
+        the previous version atomically once the writer is closed
+        """
+        buffer = io.StringIO()
+        yield buffer
+        self.write_bytes(name, buffer.getvalue().encode('utf-8'))
+
+    @abstractmethod
+    def exists(self, name: str) -> bool:
+        """
+        Checks that the file is saved
+        """
+
+    @abstractmethod
+    def get_size(self, name: str) -> int:
+        """
+        Returns size of the file in bytes
+        """
+
+    @abstractmethod
+    def remove(self, name: str):
+        """
+        Removes the file
+        """
+
+    @abstractmethod
+    def list_names(self) -> list:
+        """
+        Returns names of all files
+        """
+
+    def close(self):
+        """
+        Releases resources of the storage
+        """
+
+
+class DirectoryStorage(Storage):
+    """
+    Keeps every file in the folder as is
+    """
+    def __init__(self, path: str):
+        self.path = path
+
+    def read_bytes(self, name: str) -> bytes:
+        with open(os.path.join(self.path, name), 'rb') as file:
+            return file.read()
+
+    def write_bytes(self, name: str, data: bytes):
+        path = os.path.join(self.path, name)
+        with open(f'{path}.tmp', 'wb') as file:
+            file.write(data)
+        os.replace(f'{path}.tmp', path)
+
+    def open_reader(self, name: str):
+        return open(os.path.join(self.path, name), encoding='utf-8')
+
+    def open_binary_reader(self, name: str):
+        return open(os.path.join(self.path, name), 'rb')
+
+    @contextmanager
+    def open_writer(self, name: str):
+        with self._open_temp_file(name, 'w', encoding='utf-8') as file:
+            yield file
+
+    @contextmanager
+    def open_binary_writer(self, name: str):
+        with self._open_temp_file(name, 'wb') as file:
+            yield file
+
+    @contextmanager
+    def _open_temp_file(self, name: str, mode: str, encoding: str = None):
+        """
+        Opens a temporary file replacing the file once it is closed
+        """
+        path = os.path.join(self.path, name)
+        temp_path = f'{path}.tmp'
+        try:
+            with open(temp_path, mode, encoding=encoding, buffering=PROCESSED_WRITE_BUFFER) as file:
+                yield file
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(os.path.join(self.path, name))
+
+    def get_size(self, name: str) -> int:
+        return os.path.getsize(os.path.join(self.path, name))
+
+    def remove(self, name: str):
+        os.remove(os.path.join(self.path, name))
+
+    def list_names(self) -> list:
+        with os.scandir(self.path) as entries:
+            return [entry.name for entry in entries if not entry.name.endswith('.tmp')]
+
+
+class PackedStorage(Storage):
+    """
+    Appends files to segment files of up to segment_size bytes, a new version of a file
+    is appended too and the previous one is left unused.
+    Index log keeps a "segment offset length name" line per write and length -1 for removed files,
+    so it is only appended as well. Segments are read through memory maps.
+    Writes of several processes are serialized by a lock of the index log, writers append
+    to the segment as data is written and hold the lock until they are closed
+    """
+    def __init__(self, path: str, segment_size: int = PACKED_SEGMENT_SIZE):
+        self.path = path
+        self.segment_size = segment_size
+        self._index = {}
+        self._index_position = 0
+        self._last_segment = 0
+        self._maps = {}
+        os.makedirs(path, exist_ok=True)
+        self._index_path = os.path.join(path, PACKED_INDEX_NAME)
+        with open(self._index_path, 'ab'):
+            pass
+        self._refresh()
+
+    def _refresh(self):
+        """
+        Reads lines appended to the index log since the last refresh
+        """
+        if os.path.getsize(self._index_path) == self._index_position:
+            return
+        with open(self._index_path, 'rb') as file:
+            file.seek(self._index_position)
+            data = file.read()
+        complete = data.rfind(b'\n') + 1
+        for line in data[:complete].decode('utf-8').splitlines():
+            segment, offset, length, name = line.split(' ', 3)
+            if int(length) < 0:
+                self._index.pop(name, None)
+                continue
+            self._index[name] = (int(segment), int(offset), int(length))
+            self._last_segment = max(self._last_segment, int(segment))
+        self._index_position += complete
+
+    def _get_segment_path(self, segment: int) -> str:
+        return os.path.join(self.path, SEGMENT_NAME.format(segment))
+
+    def _get_entry(self, name: str):
+        self._refresh()
+        entry = self._index.get(name)
+        if entry is None:
+            raise FileNotFoundError(f'{name} is not in packed storage {self.path}')
+        return entry
+
+    def read_bytes(self, name: str) -> bytes:
+        segment, offset, length = self._get_entry(name)
+        if not length:
+            return b''
+        segment_map = self._maps.get(segment)
+        if segment_map is None or len(segment_map) < offset + length:
+            if segment_map is not None:
+                segment_map.close()
+            with open(self._get_segment_path(segment), 'rb') as file:
+                segment_map = self._maps[segment] = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return segment_map[offset:offset + length]
+
+    def _open_segment(self, length: int = 0):
+        """
+        Opens the last segment for appending, a new one is started if the last one can not take length bytes.
+        Writes of unknown length start a new segment only once the last one is full. Called under the lock
+        """
+        self._refresh()
+        segment = self._last_segment
+        segment_path = self._get_segment_path(segment)
+        offset = os.path.getsize(segment_path) if os.path.exists(segment_path) else 0
+        if offset and (offset + length > self.segment_size or offset >= self.segment_size):
+            segment += 1
+        return segment, open(self._get_segment_path(segment), 'ab', buffering=PROCESSED_WRITE_BUFFER)
+
+    def _add_to_index(self, index_file, name: str, entry: tuple):
+        segment, offset, length = entry
+        self._append_to_index(index_file, f'{segment} {offset} {length} {name}')
+        self._index[name] = entry
+        self._last_segment = segment
+
+    def write_bytes(self, name: str, data: bytes):
+        with self._lock() as index_file:
+            segment, file = self._open_segment(len(data))
+            with file:
+                offset = file.tell()
+                file.write(data)
+            self._add_to_index(index_file, name, (segment, offset, len(data)))
+
+    @contextmanager
+    def open_binary_writer(self, name: str):
+        """
+        Appends bytes to the segment as they are written, the file is added to the index
+        once the writer is closed, so a failed writer leaves the previous version
+        """
+        with self._lock() as index_file:
+            segment, file = self._open_segment()
+            try:
+                offset = file.tell()
+                yield file
+                length = file.tell() - offset
+            finally:
+                file.close()
+            self._add_to_index(index_file, name, (segment, offset, length))
+
+    @contextmanager
+    def open_writer(self, name: str):
+        with self.open_binary_writer(name) as binary_file:
+            file = io.TextIOWrapper(binary_file, encoding='utf-8')
+            try:
+                yield file
+            finally:
+                file.detach()
+
+    def remove(self, name: str):
+        with self._lock() as index_file:
+            self._get_entry(name)
+            self._append_to_index(index_file, f'0 0 -1 {name}')
+            del self._index[name]
+
+    def _append_to_index(self, index_file, line: str):
+        data = f'{line}\n'.encode('utf-8')
+        index_file.write(data)
+        index_file.flush()
+        self._index_position += len(data)
+
+    @contextmanager
+    def _lock(self):
+        """
+        Opens the index log for appending and locks it for other processes,
+        the index is opened every time as forked processes share opened files with their locks
+        """
+        with open(self._index_path, 'ab') as index_file:
+            if fcntl is not None:
+                fcntl.flock(index_file, fcntl.LOCK_EX)
+            try:
+                yield index_file
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(index_file, fcntl.LOCK_UN)
+
+    def exists(self, name: str) -> bool:
+        self._refresh()
+        return name in self._index
+
+    def get_size(self, name: str) -> int:
+        return self._get_entry(name)[2]
+
+    def list_names(self) -> list:
+        self._refresh()
+        return list(self._index)
+
+    def close(self):
+        """
+        Closes memory maps of segments
+        """
+        for segment_map in self._maps.values():
+            segment_map.close()
+        self._maps = {}
+
+
+def _get_zstandard():
+    try:
+        import zstandard  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        raise StorageError('zstd compression needs the zstandard package') from None
+    return zstandard
+
+
+def compress(data: bytes, compression: str = None) -> bytes:
+    """
+    Compresses data with gzip or zstd, None keeps it as is
+    """
+    if compression is None:
+        return data
+    if compression == 'gzip':
+        return gzip.compress(data, compresslevel=COMPRESSION_LEVELS['gzip'], mtime=0)
+    return _get_zstandard().ZstdCompressor(level=COMPRESSION_LEVELS['zstd']).compress(data)
+
+
+def decompress(data: bytes, compression: str = None) -> bytes:
+    """
+    Restores data compressed with gzip or zstd
+    """
+    if compression is None:
+        return data
+    if compression == 'gzip':
+        return gzip.decompress(data)
+    return _get_zstandard().ZstdDecompressor().stream_reader(data).read()
+
+
+def _open_decompressing_reader(binary_file, compression: str):
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=binary_file, mode='rb')
+    return io.BufferedReader(_get_zstandard().ZstdDecompressor().stream_reader(binary_file, closefd=False))
+
+
+def _get_uncompressed_size(binary_file, compression: str) -> int:
+    """
+    Returns size of data of the seekable compressed file: ISIZE trailer of gzip or content size
+    of zstd frame header. Streamed zstd frames do not keep it, their data is decompressed and counted
+    """
+    if compression == 'gzip':
+        binary_file.seek(-4, io.SEEK_END)
+        return int.from_bytes(binary_file.read(4), 'little')
+    zstandard = _get_zstandard()
+    size = zstandard.frame_content_size(binary_file.read(ZSTD_FRAME_HEADER_MAX_SIZE))
+    if size >= 0:
+        return size
+    binary_file.seek(0)
+    size = 0
+    with zstandard.ZstdDecompressor().stream_reader(binary_file, closefd=False) as reader:
+        for chunk in iter(lambda: reader.read(SIZE_READ_CHUNK), b''):
+            size += len(chunk)
+    return size
+
+
+def _open_compressing_writer(binary_file, compression: str):
+    if compression == 'gzip':
+        return gzip.GzipFile(fileobj=binary_file, mode='wb', compresslevel=COMPRESSION_LEVELS['gzip'], mtime=0)
+    compressor = _get_zstandard().ZstdCompressor(level=COMPRESSION_LEVELS['zstd'])
+    return io.BufferedWriter(compressor.stream_writer(binary_file, closefd=False))
+
+
+def split_compression(name: str) -> tuple:
+    """
+    Returns name of the file without compression suffix and its compression
+    """
+    for compression, suffix in COMPRESSION_SUFFIXES.items():
+        if name.endswith(suffix):
+            return name[:-len(suffix)], compression
+    return name, None
+
+
+class CompressedStorage(Storage):
+    """
+    Keeps raw and processed texts of another storage as N_raw.txt.gz or N_raw.txt.zst files
+    and shows them under plain names. Files of any compression are read,
+    new versions are written with the given one and replace the others
+    """
+    def __init__(self, storage: Storage, compression: str = ARTICLE_COMPRESSION):
+        if compression is not None and compression not in COMPRESSION_SUFFIXES:
+            raise StorageError(f'Unknown compression {compression}')
+        self.storage = storage
+        self.path = storage.path
+        self.compression = compression
+        self._lookup_order = (compression,) + tuple(other for other in (None, *COMPRESSION_SUFFIXES)
+                                                    if other != compression)
+
+    def _get_stored_names(self, name: str) -> list:
+        """
+        Returns names the file may be stored under with their compressions, the written one first
+        """
+        if not name.endswith(COMPRESSED_SUFFIXES):
+            return [(name, None)]
+        return [(name + COMPRESSION_SUFFIXES.get(compression, ''), compression) for compression in self._lookup_order]
+
+    def _find(self, name: str, open_file):
+        """
+        Opens the file under the first name it is stored under, returns the result and its compression
+        """
+        for stored_name, compression in self._get_stored_names(name):
+            try:
+                return open_file(stored_name), compression
+            except FileNotFoundError:
+                continue
+        raise FileNotFoundError(f'{name} is not in storage {self.path}')
+
+    def _remove_other_versions(self, name: str):
+        for stored_name, _ in self._get_stored_names(name)[1:]:
+            if self.storage.exists(stored_name):
+                self.storage.remove(stored_name)
+
+    def read_bytes(self, name: str) -> bytes:
+        data, compression = self._find(name, self.storage.read_bytes)
+        return decompress(data, compression)
+
+    def write_bytes(self, name: str, data: bytes):
+        stored_name, compression = self._get_stored_names(name)[0]
+        self.storage.write_bytes(stored_name, compress(data, compression))
+        self._remove_other_versions(name)
+
+    @contextmanager
+    def open_reader(self, name: str):
+        binary_file, compression = self._find(name, self.storage.open_binary_reader)
+        with binary_file:
+            if compression is not None:
+                binary_file = _open_decompressing_reader(binary_file, compression)
+            with io.TextIOWrapper(binary_file, encoding='utf-8') as file:
+                yield file
+
+    @contextmanager
+    def open_writer(self, name: str):
+        stored_name, compression = self._get_stored_names(name)[0]
+        if compression is None:
+            with self.storage.open_writer(stored_name) as file:
+                yield file
+        else:
+            with self.storage.open_binary_writer(stored_name) as binary_file, \
+                    io.TextIOWrapper(_open_compressing_writer(binary_file, compression), encoding='utf-8') as file:
+                yield file
+        self._remove_other_versions(name)
+
+    def exists(self, name: str) -> bool:
+        return any(self.storage.exists(stored_name) for stored_name, _ in self._get_stored_names(name))
+
+    def get_size(self, name: str) -> int:
+        """
+        Returns size of the file in bytes as it is read, compressed files are measured uncompressed
+        """
+        size, compression = self._find(name, self.storage.get_size)
+        if compression is None:
+            return size
+        binary_file, compression = self._find(name, self.storage.open_binary_reader)
+        with binary_file:
+            return _get_uncompressed_size(binary_file, compression)
+
+    def remove(self, name: str):
+        removed = False
+        for stored_name, _ in self._get_stored_names(name):
+            if self.storage.exists(stored_name):
+                self.storage.remove(stored_name)
+                removed = True
+        if not removed:
+            raise FileNotFoundError(f'{name} is not in storage {self.path}')
+
+    def list_names(self) -> list:
+        return list(dict.fromkeys(split_compression(name)[0] for name in self.storage.list_names()))
+
+    def close(self):
+        self.storage.close()
+
+
+_STORAGES = {}
+
+
+def is_packed(path: str) -> bool:
+    """
+    Checks that the folder keeps a packed storage
+    """
+    return os.path.exists(os.path.join(path, PACKED_INDEX_NAME))
+
+
+def open_storage(path: str) -> Storage:
+    """
+    Returns storage of the folder, packed if the folder has the packed index.
+    Texts are written with ARTICLE_COMPRESSION, texts of any compression are read
+    """
+    storage = _STORAGES.get(path)
+    if storage is None:
+        stored = PackedStorage(path) if is_packed(path) else DirectoryStorage(path)
+        storage = _STORAGES[path] = CompressedStorage(stored)
+    return storage
+
+
+def close_storage(path: str):
+    """
+    Forgets opened storage of the folder, it is opened again on next use
+    """
+    storage = _STORAGES.pop(path, None)
+    if storage is not None:
+        storage.close()
+
+
+def copy_articles(source: Storage, target: Storage) -> int:
+    """
+    Copies article files from one storage to another as they are stored, returns number of copied files
+    """
+    copied = 0
+    for name in source.list_names():
+        if split_compression(name)[0].endswith(ARTICLE_SUFFIXES):
+            target.write_bytes(name, source.read_bytes(name))
+            copied += 1
+    return copied
+
+
+def import_directory(directory_path: str, packed_path: str) -> int:
+    """
+    Packs article files of the folder into a packed storage
+    """
+    if is_packed(directory_path):
+        raise StorageError(f'{directory_path} is already packed')
+    close_storage(packed_path)
+    packed = PackedStorage(packed_path)
+    copied = copy_articles(DirectoryStorage(directory_path), packed)
+    packed.close()
+    return copied
+
+
+def export_directory(packed_path: str, directory_path: str) -> int:
+    """
+    Writes article files of a packed storage to the folder as separate files
+    """
+    if not is_packed(packed_path):
+        raise StorageError(f'{packed_path} is not a packed storage')
+    os.makedirs(directory_path, exist_ok=True)
+    return copy_articles(open_storage(packed_path).storage, DirectoryStorage(directory_path))
+
+
+def compress_articles(path: str, compression: str = None) -> int:
+    """
+    Rewrites raw and processed texts of the folder with the compression, None decompresses them.
+    Returns number of converted files. Packed storages keep previous versions in their segments
+    """
+    stored = open_storage(path).storage
+    target = CompressedStorage(stored, compression)
+    converted = 0
+    for stored_name in stored.list_names():
+        name, current = split_compression(stored_name)
+        if not name.endswith(COMPRESSED_SUFFIXES) or current == compression:
+            continue
+        target.write_bytes(name, decompress(stored.read_bytes(stored_name), current))
+        converted += 1
+    return converted
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Converts articles between folder and packed storage '
+                                                 'or compresses their texts in place')
+    parser.add_argument('command', choices=('import', 'export', 'compress'))
+    parser.add_argument('source')
+    parser.add_argument('target', help='folder to import or export to, gzip, zstd or none to compress with')
+    args = parser.parse_args()
+    if args.command == 'compress':
+        compression = None if args.target == 'none' else args.target
+        print(f'Converted {compress_articles(args.source, compression)} files')
+        return
+    convert = import_directory if args.command == 'import' else export_directory
+    print(f'Copied {convert(args.source, args.target)} files')
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,141 @@
 """
 Visualizer module for visualizing PosFrequencyPipeline results
 """
-import numpy as np
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+
+from constants import ASSETS_PATH, VISUALIZER_WORKERS, VISUALIZER_CHUNK_SIZE
+from pipeline import CorpusManager
+
+COLORS = ('b', 'g', 'r', 'c')
+
+
+def _draw(axis, statistics: dict):
+    """
+    Draws bars of all tags sorted by frequency in one call, returns their container
+    """
+    sorted_tags = sorted(statistics, key=statistics.get, reverse=True)
+    sorted_frequencies = [statistics[tag] for tag in sorted_tags]
+
+    x = range(len(sorted_tags))
+    colors = [COLORS[i % len(COLORS)] for i in range(len(sorted_tags))]
+    bars = axis.bar(x, sorted_frequencies, align='center', width=0.5, color=colors)
+
+    axis.set_xticks(x)
+    axis.set_xticklabels(sorted_tags, rotation=20)
+    y_max = max(sorted_frequencies, default=0) + 1
+    axis.set_ylim(0, y_max)
+    return bars
+
+
+class BatchVisualizer:
+    """
+    Renders many images reusing one figure with the Agg canvas,
+    only bars are replaced between images so axis ticks are not created again.
+    matplotlib is imported when the first visualizer is created
+    """
+    def __init__(self):
+        # pylint: disable=import-outside-toplevel
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        self.figure = Figure()
+        FigureCanvasAgg(self.figure)
+        self.axis = self.figure.add_subplot(1, 1, 1)
+        self._bars = None
+
+    def render(self, statistics: dict, path_to_save: str):
+        """
+        Renders statistics to the image file
+        """
+        if self._bars is not None:
+            self._bars.remove()
+        self._bars = _draw(self.axis, statistics)
+        self.axis.relim()
+        self.axis.autoscale_view()
+        self.figure.savefig(path_to_save)
+
+    def close(self):
+        """
+        Releases the figure
+        """
+        self.figure.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
 
 def visualize(statistics: dict, path_to_save: str):
     """
     param: statistics is a dictionary with keys:POS tags, values:frequencies
     """
-    number_of_tags = len(statistics)
-    sorted_frequencies = sorted(statistics.values(), reverse=True)
-    sorted_tags = sorted(statistics, key=statistics.get, reverse=True)
+    with BatchVisualizer() as visualizer:
+        visualizer.render(statistics, path_to_save)
 
-    x = np.arange(number_of_tags)
-    colors = ('b', 'g', 'r', 'c')
 
-    figure = plt.figure()
-    axis = figure.add_subplot(1, 1, 1)
-    for i in range(0, number_of_tags):
-        axis.bar(x[i], sorted_frequencies[i],
-                 align='center', width=0.5,
-                 color=colors[i % len(colors)])
+_WORKER_VISUALIZER = None
+
+
+def _init_worker():
+    """
+    Creates a visualizer reused by all images of a worker process
+    """
+    global _WORKER_VISUALIZER  # pylint: disable=global-statement
+    _WORKER_VISUALIZER = BatchVisualizer()
+
+
+def _render_in_worker(item):
+    """
+    Renders one image in a worker process
+    """
+    _WORKER_VISUALIZER.render(*item)
+
+
+def visualize_batch(items, workers: int = 1) -> int:
+    """
+    param: items is an iterable of (statistics, path_to_save) pairs
+    Renders all of them, in parallel processes if workers > 1, returns number of images
+    """
+    number_of_images = 0
+    if workers <= 1:
+        with BatchVisualizer() as visualizer:
+            for statistics, path_to_save in items:
+                visualizer.render(statistics, path_to_save)
+                number_of_images += 1
+        return number_of_images
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        for _ in executor.map(_render_in_worker, items, chunksize=VISUALIZER_CHUNK_SIZE):
+            number_of_images += 1
+    return number_of_images
+
+
+def _iter_article_statistics(corpus_manager: CorpusManager):
+    """
+    Yields POS frequencies and image path of every article having them in meta data,
+    articles without meta data are skipped
+    """
+    for article in corpus_manager.iter_articles():
+        try:
+            meta = article.read_meta()
+        except FileNotFoundError:
+            print(f'Meta data of article {article.article_id} is missing, its image is not rendered')
+            continue
+        if 'pos_frequencies' in meta:
+            yield meta['pos_frequencies'], article.get_image_path()
+
+
+def visualize_articles(corpus_manager: CorpusManager, workers: int = VISUALIZER_WORKERS) -> int:
+    """
+    Renders N_image.png with POS frequencies for every article having them in meta data
+    """
+    return visualize_batch(_iter_article_statistics(corpus_manager), workers)
 
-    axis.set_xticks(x)
-    axis.set_xticklabels(sorted_tags)
-    plt.setp(sorted_tags)
-    plt.xticks(rotation=20)
-    y_max = max(sorted_frequencies) + 1
-    plt.ylim(0, y_max)
 
-    plt.savefig(path_to_save)
+def main():
+    number_of_images = visualize_articles(CorpusManager(path_to_raw_txt_data=ASSETS_PATH, lazy=True))
+    print(f'Rendered {number_of_images} images')
 
 
 if __name__ == "__main__":
-    pass
+    main()